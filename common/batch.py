@@ -0,0 +1,247 @@
+"""Batch runner: solves every instance matching a glob, in parallel.
+
+    python -m common.batch day5 "instances/day5/*.txt" --time-limit 60 --output day5.jsonl
+
+Each instance runs in its own task of a ProcessPoolExecutor with the
+per-instance time limit, and gives one JSON line with the problem, the
+instance, the status ("ok" or the error), the objective, the solution and
+the wall time of each phase:
+
+- parse: reading the instance (through the instance cache);
+- build: the model, or the bounds and structures the solver starts from;
+- solve: the solver run;
+- extract: turning the solver output into plain data.
+
+Where a solver builds its model internally (day5 Benders, the day6
+Lagrangian heuristic) there is no build phase and its time counts as solve.
+
+The problem adapters import their day modules when they run, and this
+module imports nothing heavy, so `import common.batch` is cheap and every
+worker only loads the solver it needs (no pyomo, and pandas only where a
+DataFrame is built). The day4 instances come in pairs: the glob matches
+the *_req.txt files and the *_note.txt file next to each one is used.
+"""
+import argparse
+import glob
+import json
+import math
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+
+
+class PhaseTimer:
+    """Accumulates wall time per phase: `with timer("solve"): ...`."""
+
+    def __init__(self):
+        self.timings = {}
+
+    @contextmanager
+    def __call__(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[phase] = self.timings.get(phase, 0.0) + time.perf_counter() - start
+
+
+# ---------------------------------------------------------------- problem adapters
+# adapter(path, time_limit, phase) -> (objective, solution as JSON values)
+
+def _day1(path, time_limit, phase):
+    from ortools.sat.python import cp_model
+
+    from day1.coloring import color_bounds
+    from day1.day1_ortools import build_ortools_model, load_instance, rooms_from_solver
+    from day1.symmetry import align_coloring
+
+    with phase("parse"):
+        num_events, conflicts, _ = load_instance(path)
+    with phase("build"):
+        lower_bound, upper_bound, colors, clique = color_bounds(num_events, conflicts)
+        rooms = align_coloring(colors, clique)
+        if lower_bound < upper_bound:
+            model, x, _ = build_ortools_model(num_events, conflicts, upper_bound, symmetry_breaking=True,
+                                              fixed_clique=clique, hint=rooms)
+    if lower_bound < upper_bound:
+        with phase("solve"):
+            solver = cp_model.CpSolver()
+            solver.parameters.max_time_in_seconds = time_limit
+            solver.parameters.num_workers = 1  # the pool already uses every core
+            status = solver.solve(model)
+        with phase("extract"):
+            if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                rooms = rooms_from_solver(solver, x)
+                lower_bound = max(lower_bound, math.ceil(solver.best_objective_bound - 1e-6))
+    return len(set(rooms.values())), {"rooms": rooms, "lower_bound": lower_bound}
+
+
+def _day2(path, time_limit, phase):
+    from day2.day2_mathopt import parse_input
+    from day2.rcsp import build_graph, solve_rcsp
+
+    with phase("parse"):
+        num_cities, _, budget, connections = parse_input(path)
+    with phase("build"):
+        graph = build_graph(num_cities, connections)
+    with phase("solve"):
+        solution = solve_rcsp(graph, budget)
+    if solution is None:
+        raise RuntimeError("No path fits in the budget")
+    ordered_path, distance, fuel = solution
+    return distance, {"path": list(ordered_path), "fuel": fuel, "budget": budget}
+
+
+def _day3(path, time_limit, phase):
+    from day3.assignment import check_certificate, read_cost_matrix, solve_assignment
+
+    with phase("parse"):
+        costs = read_cost_matrix(path)
+    with phase("solve"):
+        result = solve_assignment(costs, "jv")
+    with phase("extract"):
+        if not check_certificate(costs, result):
+            raise RuntimeError("The dual potentials do not certify the assignment as optimal.")
+        solution = {"employee_for_task": result.col_for_row.tolist()}
+    return result.cost, solution
+
+
+def _day4(path, time_limit, phase):
+    from datetime import timedelta
+
+    import numpy as np
+    from ortools.math_opt.python import mathopt
+
+    from common.results import chosen_indices
+    from day4.day4 import read_instance_files
+    from day4.timetable import N_DAYS, PERIODS_PER_DAY, build_sparse_model, requirement_triples
+
+    with phase("parse"):
+        matrix, dimensions = read_instance_files(path, path.replace("_req", "_note"))
+    with phase("build"):
+        triples = requirement_triples(matrix, dimensions)
+        model, x = build_sparse_model(triples)
+    with phase("solve"):
+        params = mathopt.SolveParameters(time_limit=timedelta(seconds=time_limit))
+        result = mathopt.solve(model, mathopt.SolverType.HIGHS, params=params)
+    if result.termination.reason != mathopt.TerminationReason.OPTIMAL:
+        raise RuntimeError(f"Model failed to solve: {result.termination}")
+    with phase("extract"):
+        k, period = np.divmod(chosen_indices(result, [var for row in x for var in row]), N_DAYS * PERIODS_PER_DAY)
+        teacher, room, i_class = np.asarray(triples, dtype=np.int64).reshape(-1, 4)[k, :3].T
+        lessons = np.column_stack([period // PERIODS_PER_DAY, period % PERIODS_PER_DAY, room, teacher, i_class])
+    # A feasibility problem: no objective. Rows are the columns of day4.timetable.lessons_frame
+    return None, {"columns": ["Day", "Period", "Room", "Teacher", "Class"], "lessons": lessons.tolist()}
+
+
+def _day5(path, time_limit, phase):
+    from day5.facility import read_instance, solve_benders
+
+    with phase("parse"):
+        instance = read_instance(path)
+    with phase("solve"):
+        result = solve_benders(instance, time_limit=time_limit, output=False)
+    with phase("extract"):
+        solution = {"open": result.open.tolist(), "lower_bound": result.lower_bound,
+                    "assignment": {warehouse: result.assignment[warehouse].tolist()
+                                   for warehouse in result.open.tolist()}}
+    return result.cost, solution
+
+
+def _day6(path, time_limit, phase):
+    from day6.set_cover import read_cover_instance, solve_lagrangian
+
+    with phase("parse"):
+        instance = read_cover_instance(path)
+    with phase("solve"):
+        result = solve_lagrangian(instance, time_limit=time_limit, output=False)
+    return result.cost, {"columns": result.columns.tolist(), "lower_bound": result.lower_bound}
+
+
+def _day7(path, time_limit, phase):
+    from day7.presolve import presolve
+    from day7.set_partition import read_set_family, solve_partition_highs
+
+    with phase("parse"):
+        family = read_set_family(path)
+    with phase("build"):
+        reduction = presolve(family)
+    chosen, lower_bound = [], 0.0
+    if reduction.family.n_products:
+        with phase("solve"):
+            result = solve_partition_highs(reduction.family, time_limit=time_limit, output=False)
+        chosen, lower_bound = result.chosen, result.lower_bound
+    with phase("extract"):
+        subsets = reduction.restore(chosen)
+    return int(family.costs[subsets].sum()), {"subsets": subsets.tolist(),
+                                              "lower_bound": reduction.fixed_cost + lower_bound}
+
+
+PROBLEMS = {"day1": _day1, "day2": _day2, "day3": _day3, "day4": _day4, "day5": _day5, "day6": _day6,
+            "day7": _day7}
+
+
+def solve_instance(problem, path, time_limit=60.0, include_solution=True):
+    """Solves one instance with the adapter of `problem`; returns its JSON record (never raises)."""
+    timer = PhaseTimer()
+    start = time.perf_counter()
+    record = {"problem": problem, "instance": path}
+    try:
+        objective, solution = PROBLEMS[problem](path, time_limit, timer)
+        record.update(status="ok", objective=objective)
+        if include_solution:
+            record["solution"] = solution
+    except Exception as error:  # one failing instance must not stop the batch
+        record.update(status=f"error: {error!r}", objective=None, traceback=traceback.format_exc())
+    record["timings"] = timer.timings
+    record["elapsed"] = time.perf_counter() - start
+    return record
+
+
+def run_batch(problem, pattern, time_limit=60.0, workers=None, output=None, include_solution=True):
+    """Solves the instances matching `pattern` in a process pool; returns their records in path order.
+
+    output is an open file that gets each record as a JSON line as soon as
+    it finishes.
+    """
+    if problem not in PROBLEMS:
+        raise ValueError(f"Unknown problem: {problem}")
+    paths = sorted(glob.glob(pattern))
+    records = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(solve_instance, problem, path, time_limit, include_solution) for path in paths]
+        for future in as_completed(futures):
+            record = future.result()
+            records.append(record)
+            if output is not None:
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+    return sorted(records, key=lambda record: record["instance"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("problem", choices=sorted(PROBLEMS))
+    parser.add_argument("pattern", help="glob of instance files (quote it)")
+    parser.add_argument("--time-limit", type=float, default=60.0, help="seconds per instance")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument("--output", default=None, help="JSONL file (appended; default stdout)")
+    parser.add_argument("--no-solution", action="store_true", help="leave the solutions out of the records")
+    args = parser.parse_args()
+
+    output = open(args.output, "a") if args.output else sys.stdout
+    try:
+        records = run_batch(args.problem, args.pattern, args.time_limit, args.workers, output,
+                            not args.no_solution)
+    finally:
+        if args.output:
+            output.close()
+    failed = [record["instance"] for record in records if record["status"] != "ok"]
+    print(f"{len(records) - len(failed)}/{len(records)} instances solved", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Benchmark of the instance cache: cold parses against warm cache hits.
+
+Times the instance reader of every day three ways: with the cache off
+(the text is parsed), on the first run with an empty cache (parsed and
+stored) and on later runs (memory-mapped hits, median of --repeat runs).
+The cache lives in a temporary directory.
+
+Usage (from the repository root):
+    python -m common.benchmark_cache --repeat 5
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+from common import cache
+from day1.day1_highs import load_instance
+from day2.day2_mathopt import parse_input
+from day3.day3 import read_task_assignment
+from day4.day4 import read_instance_files
+from day5.facility import read_instance
+from day6.set_cover import read_cover_instance
+from day7.day7 import read_and_parse_instance
+from day7.set_partition import read_set_family
+
+READERS = [
+    ("day1", load_instance, ["day1/instance.txt"]),
+    ("day2", parse_input, ["day2/instance.txt"]),
+    ("day3", read_task_assignment, ["day3/instance.txt"]),
+    ("day4", read_instance_files, ["day4/instance_req.txt", "day4/instance_note.txt"]),
+    ("day5", read_instance, ["day5/instance.txt"]),
+    ("day6", read_cover_instance, ["day6/instance.txt"]),
+    ("day7 dicts", read_and_parse_instance, ["day7/instance.txt"]),
+    ("day7 csr", read_set_family, ["day7/instance.txt"]),
+]
+
+
+def timed(function, arguments, repeat=1):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*arguments)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'reader':>12} {'no cache[ms]':>13} {'cold[ms]':>9} {'warm[ms]':>9} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, function, arguments in READERS:
+            cache.configure(enabled=False)
+            parse = timed(function, arguments, args.repeat)
+            cache.configure(directory=directory).clear()
+            cold = timed(function, arguments)
+            warm = timed(function, arguments, args.repeat)
+            print(f"{name:>12} {1000 * parse:>13.2f} {1000 * cold:>9.2f} {1000 * warm:>9.2f} {parse / warm:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Latency of the resident solver service against cold script runs.
+
+For small generated instances (common.generators) of day1, day2, day3 and
+day7, times:
+
+- cold: `python -m common.batch <problem> <instance>` in a fresh process,
+  the way a script run pays for the interpreter, the solver imports and the
+  instance parse every time (the instance cache is off unless
+  ADVENTORCODE_CACHE=1, as for a script);
+- service: a POST /solve round trip to a SolverService started here (on a
+  free localhost port), whose workers have imported the solvers already.
+
+Both run the same adapter of common.batch, so the difference is the
+per-run overhead.
+
+Usage (from the repository root):
+    python -m common.benchmark_service --repeat 20 --cold-repeat 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from common.generators import write_instance
+from common.service import ServiceClient, SolverService, make_server
+
+CASES = [("day1", 60), ("day2", 500), ("day3", 100), ("day7", 10)]
+
+
+def percentiles(latencies):
+    p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+    return p50, p95
+
+
+def cold_run(problem, file_path, time_limit):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "common.batch", problem, file_path, "--time-limit", str(time_limit),
+                    "--workers", "1", "--no-solution"], check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="service requests per problem")
+    parser.add_argument("--cold-repeat", type=int, default=5, help="cold script runs per problem")
+    parser.add_argument("--time-limit", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--directory", default=os.path.join(tempfile.gettempdir(), "adventORCode-instances"))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    service = SolverService(args.workers)
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = ServiceClient(f"http://127.0.0.1:{server.server_address[1]}")
+    client.wait_ready()
+    print(f"service started in {time.perf_counter() - start:.2f}s ({args.workers} workers)")
+
+    print(f"{'problem':>8} {'size':>6} {'cold p50[ms]':>13} {'cold p95[ms]':>13} {'service p50[ms]':>16} "
+          f"{'service p95[ms]':>16} {'solve p50[ms]':>14} {'speedup':>8}")
+    try:
+        for problem, size in CASES:
+            file_path = write_instance(problem, args.directory, size)
+            cold = [cold_run(problem, file_path, args.time_limit) for _ in range(args.cold_repeat)]
+            warm, solve = [], []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                job = client.solve(problem, file_path, time_limit=args.time_limit, solution=True)
+                warm.append(time.perf_counter() - start)
+                if job["state"] != "done" or job["record"]["status"] != "ok":
+                    raise RuntimeError(f"{problem}: {job['state']} {job['record']}")
+                solve.append(job["record"]["elapsed"])
+            (cold_50, cold_95), (warm_50, warm_95) = percentiles(cold), percentiles(warm)
+            print(f"{problem:>8} {size:>6} {cold_50:>13.1f} {cold_95:>13.1f} {warm_50:>16.1f} {warm_95:>16.1f} "
+                  f"{1000 * np.median(solve):>14.1f} {cold_50 / warm_50:>7.1f}x")
+    finally:
+        server.shutdown()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
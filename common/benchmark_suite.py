@@ -0,0 +1,140 @@
+"""Benchmark suite: size sweeps of generated instances against JSON baselines.
+
+For every problem and size of the sweep, the instance of common.generators
+(written once into --directory) is solved --repeat times through
+common.batch.solve_instance, and the median wall time of each phase (parse,
+build, solve, extract) is kept with the objective. The instance cache is
+off, so parse times the text parser.
+
+With --update, the measurements are merged into the baseline file (one
+entry per "problem/size"). Otherwise every phase is compared with the
+baseline, and regresses when it is slower by more than --tolerance
+(relative) and --slack seconds (absolute, for the noise of short phases); a
+worse objective is a regression too. A run that reaches the time limit
+measures the limit, not the solver: only its objective is compared. Any
+regression makes the exit status 1.
+
+Usage (from the repository root):
+    python -m common.benchmark_suite --update
+    python -m common.benchmark_suite --problems day3 day7 --tolerance 0.2
+    python -m common.benchmark_suite --problems day3 --sizes 1000 2000 4000 --baseline day3.json --update
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from common import cache
+from common.batch import solve_instance
+from common.generators import WRITERS, write_instance
+
+SWEEPS = {"day1": [100, 200, 400], "day2": [1000, 2000, 4000], "day3": [250, 500, 1000], "day4": [3, 4, 5],
+          "day5": [50, 100, 200], "day6": [100, 200, 400], "day7": [10, 20, 30]}
+PHASES = ["parse", "build", "solve", "extract"]
+
+
+def measure(problem, file_path, time_limit, repeat):
+    """{status, objective, timings (median per phase), elapsed, limit}; stops at the first failed run."""
+    records = []
+    for _ in range(repeat):
+        record = solve_instance(problem, file_path, time_limit, include_solution=False)
+        if record["status"] != "ok":
+            return {"status": record["status"], "objective": None, "timings": {}, "elapsed": record["elapsed"],
+                    "limit": False}
+        records.append(record)
+    timings = {phase: statistics.median(record["timings"].get(phase, 0.0) for record in records)
+               for phase in PHASES if any(phase in record["timings"] for record in records)}
+    return {"status": "ok", "objective": records[-1]["objective"], "timings": timings,
+            "elapsed": statistics.median(record["elapsed"] for record in records),
+            "limit": timings.get("solve", 0.0) >= 0.95 * time_limit}
+
+
+def compare(baseline, current, tolerance, slack):
+    """(phase or "objective", baseline value, current value, regressed) for one case."""
+    rows = []
+    for phase in PHASES:
+        if phase not in current["timings"] or phase not in baseline["timings"]:
+            continue
+        if phase == "solve" and (current["limit"] or baseline["limit"]):
+            continue
+        old, new = baseline["timings"][phase], current["timings"][phase]
+        rows.append((phase, old, new, new > old * (1 + tolerance) and new - old > slack))
+    if baseline["objective"] is not None and current["objective"] is not None:
+        old, new = baseline["objective"], current["objective"]
+        rows.append(("objective", old, new, new > old + 1e-6 * max(1.0, abs(old))))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--problems", nargs="*", default=sorted(WRITERS), choices=sorted(WRITERS))
+    parser.add_argument("--sizes", type=int, nargs="*", default=None, help="sweep for every problem (default SWEEPS)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--time-limit", type=float, default=10.0, help="seconds per solve")
+    parser.add_argument("--directory", default=os.path.join(tempfile.gettempdir(), "adventORCode-instances"))
+    parser.add_argument("--baseline", default="benchmarks/baseline.json")
+    parser.add_argument("--update", action="store_true", help="record the measurements as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="relative slowdown allowed per phase")
+    parser.add_argument("--slack", type=float, default=0.05, help="absolute slowdown allowed per phase [s]")
+    args = parser.parse_args()
+
+    baseline = {"meta": {}, "results": {}}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)
+    elif not args.update:
+        parser.error(f"No baseline at {args.baseline}: record one with --update first.")
+
+    cache.configure(enabled=False)
+    results = {}
+    print(f"{'case':>12} {'phase':>9} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    regressions = []
+    for problem in args.problems:
+        for size in args.sizes or SWEEPS[problem]:
+            case = f"{problem}/{size}"
+            file_path = write_instance(problem, args.directory, size, args.seed)
+            results[case] = measure(problem, file_path, args.time_limit, args.repeat)
+            results[case]["seed"] = args.seed
+            if results[case]["status"] != "ok":
+                # A case that fails is a regression, and is never recorded as a baseline
+                print(f"{case:>12} FAILED: {results[case].pop('status')}")
+                del results[case]
+                regressions.append(f"{case} failed")
+                continue
+            if args.update or case not in baseline["results"]:
+                timings = " ".join(f"{phase} {seconds:.3f}s" for phase, seconds in results[case]["timings"].items())
+                limit = " (time limit)" if results[case]["limit"] else ""
+                print(f"{case:>12} {'':>9} {'':>12} {'':>12} {'':>7}  {timings}, objective "
+                      f"{results[case]['objective']}{limit}")
+                continue
+            for phase, old, new, regressed in compare(baseline["results"][case], results[case],
+                                                      args.tolerance, args.slack):
+                ratio = f"{new / old:.2f}x" if old else "-"
+                print(f"{case:>12} {phase:>9} {old:>12.4g} {new:>12.4g} {ratio:>7}"
+                      f"{'  REGRESSION' if regressed else ''}")
+                if regressed:
+                    regressions.append(f"{case} {phase}")
+
+    if args.update:
+        baseline["results"].update(results)
+        baseline["meta"] = {"created": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+                            "machine": platform.machine(), "processor": platform.processor(),
+                            "cpus": os.cpu_count(), "repeat": args.repeat, "time_limit": args.time_limit}
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as file:
+            json.dump(baseline, file, indent=1, sort_keys=True)
+        print(f"Baseline written to {args.baseline} ({len(results)} cases)")
+        return 1 if regressions else 0
+    if regressions:
+        print(f"{len(regressions)} regressions: " + ", ".join(regressions), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
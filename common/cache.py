@@ -0,0 +1,143 @@
+"""On-disk cache of parsed instances.
+
+Parsing the text instances is a large part of a batch run on the bigger
+files (day6, day7). cached(name, sources, parse) returns what parse()
+returns, a dict of NumPy arrays and JSON values, and keeps it on disk keyed
+by `name` and a hash of the content of the source files:
+
+- each entry is a directory with one .npy file per array and a meta.json
+  with the other values; a hit loads the arrays with mmap_mode="r", so no
+  data is copied (the arrays are read-only views of the files);
+- entries are written to a temporary directory and renamed into place, so
+  concurrent runs never see half-written entries;
+- the cache is bounded in size: after each store, the least recently used
+  entries (by the time of their last hit) are deleted until it fits.
+
+The default cache is off, so a plain run always parses the files it is
+given. ADVENTORCODE_CACHE=1 turns it on: it then lives in
+$ADVENTORCODE_CACHE_DIR (~/.cache/adventORCode otherwise) and holds at most
+$ADVENTORCODE_CACHE_MB megabytes (1024). configure() changes it in code.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser("~"), ".cache", "adventORCode")
+DEFAULT_MAX_MB = 1024
+
+
+class InstanceCache:
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_bytes=DEFAULT_MAX_MB * 2 ** 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(self, name, sources):
+        """Entry name: `name` (made file-safe) and the blake2b hash of the sources' content."""
+        digest = hashlib.blake2b(name.encode(), digest_size=16)
+        for source in sources:
+            with open(source, "rb") as file:
+                digest.update(hashlib.file_digest(file, "blake2b").digest())
+        return f"{name.replace('/', '_').replace(os.sep, '_')}-{digest.hexdigest()}"
+
+    def load(self, key):
+        """The entry as a dict (arrays memory-mapped), or None on a miss. A hit marks it as recently used."""
+        path = os.path.join(self.directory, key)
+        try:
+            with open(os.path.join(path, "meta.json"), "r") as file:
+                meta = json.load(file)
+        except FileNotFoundError:
+            return None
+        os.utime(os.path.join(path, "meta.json"))
+        values = meta["values"]
+        for name in meta["arrays"]:
+            values[name] = _load_array(os.path.join(path, f"{name}.npy"))
+        return values
+
+    def store(self, key, values):
+        """Writes an entry atomically, evicts to fit and returns it as load() would."""
+        os.makedirs(self.directory, exist_ok=True)
+        arrays = {name: value for name, value in values.items() if isinstance(value, np.ndarray)}
+        meta = {"values": {name: value for name, value in values.items() if name not in arrays},
+                "arrays": sorted(arrays), "created": time.time()}
+        temporary = tempfile.mkdtemp(prefix=".tmp-", dir=self.directory)
+        try:
+            for name, array in arrays.items():
+                np.save(os.path.join(temporary, f"{name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+            with open(os.path.join(temporary, "meta.json"), "w") as file:
+                json.dump(meta, file)
+            os.rename(temporary, os.path.join(self.directory, key))
+        except OSError:
+            shutil.rmtree(temporary, ignore_errors=True)  # another run stored the same entry first
+        self.evict(keep=key)
+        return self.load(key)
+
+    def get(self, name, sources, parse):
+        key = self.key(name, sources)
+        values = self.load(key)
+        return values if values is not None else self.store(key, parse())
+
+    def entries(self):
+        """[(last use, bytes, key)] of the stored entries, least recently used first."""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for key in os.listdir(self.directory):
+            path = os.path.join(self.directory, key)
+            if key.startswith(".") or not os.path.isfile(os.path.join(path, "meta.json")):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(path))
+            entries.append((os.path.getmtime(os.path.join(path, "meta.json")), size, key))
+        return sorted(entries)
+
+    def evict(self, keep=None):
+        """Deletes least recently used entries (never `keep`) until the cache holds at most max_bytes."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            if key != keep:
+                shutil.rmtree(os.path.join(self.directory, key), ignore_errors=True)
+                total -= size
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _load_array(path):
+    try:
+        return np.load(path, mmap_mode="r", allow_pickle=False).view(np.ndarray)
+    except ValueError:
+        return np.load(path, allow_pickle=False)  # empty arrays cannot be mapped
+
+
+_default = None
+
+
+def configure(directory=None, max_bytes=None, enabled=True):
+    """Replaces the default cache (enabled=False parses every time). Returns the new cache or None."""
+    global _default
+    if not enabled:
+        _default = False
+        return None
+    _default = InstanceCache(directory or os.environ.get("ADVENTORCODE_CACHE_DIR", DEFAULT_DIRECTORY),
+                             max_bytes or int(os.environ.get("ADVENTORCODE_CACHE_MB", DEFAULT_MAX_MB)) * 2 ** 20)
+    return _default
+
+
+def cached(name, sources, parse):
+    """parse() for the current content of the files in `sources`, from the default cache when possible.
+
+    parse() must return a dict of NumPy arrays and JSON-serialisable values.
+    Change `name` (e.g. a version suffix) when the parser's output changes.
+    """
+    if _default is None:
+        configure(enabled=os.environ.get("ADVENTORCODE_CACHE", "0") != "0")
+    if not _default:
+        return parse()
+    return _default.get(name, sources, parse)
@@ -0,0 +1,117 @@
+"""Seeded instance generators, written in each day's file format.
+
+write_instance(problem, directory, size, seed) writes one instance and
+returns the path the day's reader (and common.batch) takes. `size` is the
+dimension that scales:
+
+- day1: events of an Erdős–Rényi conflict graph (average degree 10);
+- day2: cities of a layered graph where short connections burn more fuel
+  (day2.benchmark.generate_instance, budget between the cheapest-fuel and
+  the shortest path);
+- day3: tasks (and employees) of a uniform cost matrix in [0, 1000);
+- day4: teachers, classes and rooms of a requirement matrix counted from a
+  random timetable (day4.benchmark.generate_instance, always feasible); the
+  path is the *_req.txt file, the *_note.txt file is written next to it;
+- day5: clients of a Cornuejols-style facility location instance
+  (day5.facility.generate_instance) with size // 4 warehouses;
+- day6: segments of a set cover with 20 columns of 2-8 segments per
+  segment, plus a column for every segment left uncovered;
+- day7: products of a set partitioning family with 100 subsets per
+  product (day7.benchmark.write_synthetic_instance, always feasible).
+
+The same (problem, size, seed) always gives the same file, and an existing
+file is not written again.
+"""
+import os
+
+import numpy as np
+
+
+def write_day1(file_path, size, seed):
+    from day1.benchmark import random_conflict_graph
+
+    num_events, edges, _ = random_conflict_graph(size, 10.0, seed=seed)
+    with open(file_path, 'w') as file:
+        file.write(f"{num_events} {len(edges)}\n")
+        file.writelines(f"e {i} {j}\n" for i, j in edges)
+
+
+def write_day2(file_path, size, seed):
+    from day2.benchmark import generate_instance
+
+    num_cities, num_connections, budget, connections = generate_instance(size, seed=seed)
+    with open(file_path, 'w') as file:
+        file.write(f" {num_cities} {num_connections} {budget} \n")
+        file.writelines(f" {i} {j} {distance} {fuel} \n" for i, j, distance, fuel in connections)
+
+
+def write_day3(file_path, size, seed):
+    costs = np.random.default_rng(seed).integers(0, 1000, (size, size))
+    with open(file_path, 'w') as file:
+        file.write(f"# Synthetic instance: {size} tasks and employees\n\n {size}\n")
+        np.savetxt(file, costs, fmt="%d")
+
+
+def write_day4(file_path, size, seed):
+    from day4.benchmark import generate_instance
+
+    matrix, dimensions = generate_instance(size, seed=seed)
+    with open(file_path, 'w') as file:
+        file.write(f"# Synthetic instance: {size} teachers, classes and rooms\n")
+        for room in matrix:
+            file.writelines("  ".join(map(str, row)) + "  \n" for row in room)
+    dimensions = {'NUMBER_OF_TEACHERS': size, 'NUMBER_OF_SUBJECTS': size, 'NUMBER_OF_CLASSES': size,
+                  'NUMBER_OF_ROOM_AVAILABLE': size, 'NUMBER_OF_REQUIREMENTS': dimensions['NUMBER_OF_REQUIREMENTS']}
+    with open(file_path.replace("_req", "_note"), 'w') as file:
+        file.write(f"# Synthetic instance: {size} teachers, classes and rooms\n")
+        file.writelines(f"{name} = {value:>10}\n" for name, value in dimensions.items())
+
+
+def write_day5(file_path, size, seed):
+    from day5.facility import generate_instance
+
+    instance = generate_instance(max(2, size // 4), size, seed=seed)
+    with open(file_path, 'w') as file:
+        file.write(f"# Synthetic instance: {instance.n_warehouses} warehouses and {instance.n_clients} clients\n\n")
+        file.write(f" {instance.n_warehouses} {instance.n_clients} \n")
+        file.writelines(f" {capacity:.0f} {fixed_cost:.0f}. \n"
+                        for capacity, fixed_cost in zip(instance.capacity, instance.fixed_cost))
+        for client in range(instance.n_clients):
+            file.write(f" {instance.demand[client]:.0f} \n ")
+            file.write(" ".join(f"{cost:.5f}" for cost in instance.cost[:, client]) + " \n")
+
+
+def write_day6(file_path, size, seed):
+    rng = np.random.default_rng(seed)
+    columns = [np.sort(rng.choice(np.arange(1, size + 1), rng.integers(2, 9), replace=False))
+               for _ in range(20 * size)]
+    covered = np.zeros(size + 1, dtype=bool)
+    for segments in columns:
+        covered[segments] = True
+    columns += [np.array([segment]) for segment in np.flatnonzero(~covered[1:]) + 1]
+    costs = rng.integers(1, 4, len(columns))
+    with open(file_path, 'w') as file:
+        file.write(f"# Synthetic instance: {size} segments and {len(columns)} sets\n\n")
+        file.write(f" {size} {len(columns)} \n")
+        file.writelines(f" {cost} {len(segments)} " + " ".join(map(str, segments.tolist())) + " \n"
+                        for cost, segments in zip(costs.tolist(), columns))
+
+
+def write_day7(file_path, size, seed):
+    from day7.benchmark import write_synthetic_instance
+
+    write_synthetic_instance(file_path, size, 100 * size, seed=seed)
+
+
+WRITERS = {"day1": write_day1, "day2": write_day2, "day3": write_day3, "day4": write_day4, "day5": write_day5,
+           "day6": write_day6, "day7": write_day7}
+
+
+def write_instance(problem, directory, size, seed=0):
+    """Writes (unless it exists) the instance of `problem` with this size and seed; returns its path."""
+    suffix = "_req" if problem == "day4" else ""
+    file_path = os.path.join(directory, f"{problem}-{size}-{seed}{suffix}.txt")
+    if not os.path.exists(file_path):
+        os.makedirs(directory, exist_ok=True)
+        WRITERS[problem](file_path, size, seed)
+    return file_path
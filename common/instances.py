@@ -0,0 +1,168 @@
+"""Memory-mapped, vectorised readers for the text instances.
+
+The files are mapped with mmap and tokenised in bulk with NumPy: every run
+of digits becomes one int64, tagged with the line it comes from. Text after
+a '#' is a comment, and any other character is a separator, so the "e" of
+the DIMACS edge lines needs no special case.
+
+Two formats are covered:
+
+- set families (day6, day7): a header "<n_elements> <n_sets>", then one line
+  per set with "<cost> <count> <elements...>" (counts=True) or
+  "<cost> <elements...>" (counts=False). read_set_family returns
+  (n_elements, costs, indptr, indices) in CSR form, where the elements of set
+  s are indices[indptr[s]:indptr[s + 1]] with their ids from the file.
+  iter_set_family yields the same arrays block by block, for files that do
+  not fit in memory.
+- edge lists (day1): a header "<n_vertices> <n_edges>" and "e x y" lines.
+  read_edges returns (n_vertices, edges) with edges an (m, 2) int64 array.
+
+load_set_family and load_edges return the same through the instance cache
+of common/cache.py: when it is on, a file that has not changed since it was
+last parsed is not read again, and its arrays come back as read-only memory
+maps.
+"""
+import mmap
+
+import numpy as np
+
+from common.cache import cached
+
+DIGITS = np.zeros(256, dtype=bool)
+DIGITS[ord("0"):ord("9") + 1] = True
+
+
+def mapped(file_path):
+    """The file as a read-only uint8 array backed by mmap.
+
+    The mapping lives as long as the array (and its views): it is released
+    when they are garbage collected. Empty files give an empty array.
+    """
+    with open(file_path, "rb") as file:
+        if file.seek(0, 2) == 0:
+            return np.zeros(0, dtype=np.uint8)
+        return np.frombuffer(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ), dtype=np.uint8)
+
+
+def tokenize(buffer):
+    """Integers of `buffer` and the line of each one (0-based), skipping comments.
+
+    A '-' right before a number makes it negative. Returns (values, lines).
+    """
+    newlines = np.flatnonzero(buffer == ord("\n"))
+    digit = DIGITS[buffer]
+    starts = np.flatnonzero(digit & ~np.concatenate([[False], digit[:-1]]))
+    ends = np.flatnonzero(digit & ~np.concatenate([digit[1:], [False]])) + 1
+    lines = np.searchsorted(newlines, starts)  # newlines before each number
+
+    # A number after the first '#' of its line is part of a comment
+    hashes = np.flatnonzero(buffer == ord("#"))
+    if len(hashes):
+        hash_lines, first = np.unique(np.searchsorted(newlines, hashes), return_index=True)
+        first_hash = np.full(len(newlines) + 1, len(buffer))
+        first_hash[hash_lines] = hashes[first]
+        keep = starts < first_hash[lines]
+        starts, ends, lines = starts[keep], ends[keep], lines[keep]
+
+    # Horner over the digits, one pass per digit position (at most 19 for int64)
+    lengths = ends - starts
+    values = np.zeros(len(starts), dtype=np.int64)
+    for offset in range(int(lengths.max(initial=0))):
+        active = lengths > offset
+        values[active] = values[active] * 10 + (buffer[starts[active] + offset] - ord("0"))
+    negative = (starts > 0) & (buffer[np.maximum(starts - 1, 0)] == ord("-"))
+    values[negative] *= -1
+    return values, lines
+
+
+def _split_lines(values, lines):
+    """Splits the numbers into rows, one per non-empty line: (first index, length) of each row."""
+    first = np.flatnonzero(np.concatenate([[True], lines[1:] != lines[:-1]])) if len(lines) else np.zeros(0, int)
+    return first, np.diff(np.append(first, len(lines)))
+
+
+def _set_rows(values, lines, counts):
+    """CSR arrays of the set lines in (values, lines): (costs, indptr, indices)."""
+    first, lengths = _split_lines(values, lines)
+    skip = 2 if counts else 1  # cost (and count) before the elements
+    if np.any(lengths < skip):
+        raise ValueError("A set line has no cost or no element count.")
+    sizes = lengths - skip
+    if counts and np.any(values[first + 1] != sizes):
+        bad = int(np.flatnonzero(values[first + 1] != sizes)[0])
+        raise ValueError(f"Set {bad}: the element count {values[first[bad] + 1]} does not match "
+                         f"the {sizes[bad]} elements on its line.")
+
+    indptr = np.concatenate([[0], np.cumsum(sizes)])
+    offsets = np.arange(indptr[-1]) - np.repeat(indptr[:-1], sizes)
+    indices = values[np.repeat(first + skip, sizes) + offsets]
+    return values[first], indptr, indices
+
+
+def _header_end(lines):
+    """Index of the first number after the header line."""
+    return int(np.searchsorted(lines, lines[0], side="right"))
+
+
+def read_set_family(file_path, counts=True):
+    """Reads a set-family instance into (n_elements, costs, indptr, indices)."""
+    values, lines = tokenize(mapped(file_path))
+    if len(values) < 2:
+        raise ValueError(f"{file_path}: missing '<n_elements> <n_sets>' header.")
+    header_end = _header_end(lines)
+    n_elements, n_sets = values[:2].tolist()
+    costs, indptr, indices = _set_rows(values[header_end:], lines[header_end:], counts)
+    if len(costs) != n_sets:
+        raise ValueError(f"{file_path}: the header announces {n_sets} sets but there are {len(costs)}.")
+    return n_elements, costs, indptr, indices
+
+
+def iter_set_family(file_path, counts=True, block_size=64 * 2 ** 20):
+    """Reads a set-family instance in blocks of about `block_size` bytes.
+
+    Yields (first_set, costs, indptr, indices) per block, where first_set is
+    the id of the block's first set and indptr starts at 0 in every block.
+    Blocks end on a line boundary, so only one block is tokenised at a time.
+    The header is read from the first block and skipped.
+    """
+    buffer = mapped(file_path)
+    position, first_set, header = 0, 0, True
+    while position < len(buffer):
+        end = min(position + block_size, len(buffer))
+        if end < len(buffer):
+            newline = np.flatnonzero(buffer[position:end] == ord("\n"))
+            end = position + int(newline[-1]) + 1 if len(newline) else end
+        values, lines = tokenize(buffer[position:end])
+        position = end
+        if header and len(values):
+            header_end = _header_end(lines)
+            values, lines, header = values[header_end:], lines[header_end:], False
+        if not len(values):
+            continue
+        costs, indptr, indices = _set_rows(values, lines, counts)
+        yield first_set, costs, indptr, indices
+        first_set += len(costs)
+
+
+def read_edges(file_path):
+    """Reads a DIMACS-style edge list ("e x y" lines after the header) into (n_vertices, edges)."""
+    values, lines = tokenize(mapped(file_path))
+    if len(values) < 2:
+        raise ValueError(f"{file_path}: missing '<n_vertices> <n_edges>' header.")
+    edges = values[_header_end(lines):]
+    if len(edges) % 2:
+        raise ValueError(f"{file_path}: an edge line does not have two endpoints.")
+    return int(values[0]), edges.reshape(-1, 2)
+
+
+def load_set_family(file_path, counts=True):
+    """read_set_family through the instance cache."""
+    data = cached(f"set_family-counts{int(counts)}", [file_path], lambda: dict(
+        zip(("n_elements", "costs", "indptr", "indices"), read_set_family(file_path, counts))))
+    return data["n_elements"], data["costs"], data["indptr"], data["indices"]
+
+
+def load_edges(file_path):
+    """read_edges through the instance cache."""
+    data = cached("edges", [file_path], lambda: dict(zip(("n_vertices", "edges"), read_edges(file_path))))
+    return data["n_vertices"], data["edges"]
@@ -0,0 +1,257 @@
+"""Parallel solver portfolio.
+
+run_portfolio starts several backends (exact solvers and heuristics) on the
+same minimisation problem, each in its own process of a
+ProcessPoolExecutor, under one shared deadline. A backend is a top-level
+function backend(problem, incumbent) that works on `problem` until
+incumbent.stopped() and reports through the shared Incumbent:
+
+- incumbent.offer(objective, solution): a feasible solution (a flat array
+  of `size` numbers whose meaning the problem module defines);
+- incumbent.raise_bound(bound): a proved lower bound;
+- incumbent.best(): the best (objective, solution) so far, from any
+  backend, to warm-start from (AddHint in CP-SAT, setSolution in HiGHS, the
+  starting point of a heuristic).
+
+The Incumbent lives in shared memory. As soon as the best solution of one
+backend meets the best bound of another (rounded up for integral
+objectives), the portfolio has proved optimality and every backend is told
+to stop. solve_highs and solve_cpsat wire both solvers to it: their
+callbacks offer improving solutions and bounds and poll the stop flag.
+
+The result records which backend found the final solution (winner) and
+which one proved the bound (prover). With log_path, every run is appended
+as a JSON line, and routing_table(log_path) counts the wins per problem
+type, so that the next run can start with the backends that usually win.
+"""
+import json
+import math
+import multiprocessing
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+from highspy import cb
+from ortools.sat.python import cp_model
+
+
+class Incumbent:
+    """Best solution and best bound shared by the portfolio processes."""
+
+    def __init__(self, size, time_limit, names, integral=True, typecode="d"):
+        self.size = size
+        self.started = time.time()  # wall clock: comparable across processes
+        self.deadline = self.started + time_limit
+        self.names = list(names)
+        self.integral = integral
+        self.backend = -1  # index of the backend running in this process
+        self._lock = multiprocessing.Lock()
+        self._stop = multiprocessing.Event()
+        self._solution = multiprocessing.RawArray(typecode, size)
+        # objective, bound, time of the objective, winner index, prover index
+        self._state = multiprocessing.RawArray("d", [math.inf, -math.inf, 0.0, -1, -1])
+
+    def offer(self, objective, solution):
+        """Stores `solution` if it beats the incumbent; returns whether it did."""
+        with self._lock:
+            if objective >= self._state[0] - 1e-9:
+                return False
+            self._solution[:] = np.asarray(solution).tolist()
+            self._state[0], self._state[2], self._state[3] = objective, time.time(), self.backend
+            self._check()
+            return True
+
+    def raise_bound(self, bound):
+        with self._lock:
+            if bound > self._state[1] + 1e-9:
+                self._state[1], self._state[4] = bound, self.backend
+                self._check()
+
+    def _check(self):
+        if self.proven(self._state[0], self._state[1]):
+            self._stop.set()
+
+    def proven(self, objective, bound):
+        """Whether `bound` proves `objective` optimal."""
+        if math.isinf(objective) or math.isinf(bound):
+            return False
+        if self.integral:
+            bound = math.ceil(bound - 1e-6)
+        return objective <= bound + 1e-6 * max(1.0, abs(objective))
+
+    def best(self):
+        """(objective, solution array) of the incumbent, or None if there is none yet."""
+        with self._lock:
+            if math.isinf(self._state[0]):
+                return None
+            return self._state[0], np.array(self._solution[:])
+
+    def stop(self):
+        self._stop.set()
+
+    def stopped(self):
+        return self._stop.is_set() or time.time() >= self.deadline
+
+    def remaining(self):
+        return max(self.deadline - time.time(), 0.0)
+
+    def state(self):
+        with self._lock:
+            return list(self._state)
+
+
+@dataclass
+class PortfolioResult:
+    objective: float
+    bound: float
+    solution: np.ndarray
+    winner: str  # backend that found the final solution
+    prover: str  # backend that proved the final bound
+    optimal: bool
+    elapsed: float
+    backends: list = field(default_factory=list)  # one report per backend
+
+
+_incumbent = None
+
+
+def _attach(incumbent):
+    global _incumbent
+    _incumbent = incumbent
+
+
+def _run_backend(index, name, backend, problem):
+    _incumbent.backend = index
+    start = time.perf_counter()
+    try:
+        status = backend(problem, _incumbent)
+    except Exception as error:  # a failing backend must not take the portfolio down
+        status = f"error: {error!r}"
+    return {"backend": name, "status": status, "elapsed": time.perf_counter() - start}
+
+
+def run_portfolio(problem, backends, time_limit, size, integral=True, typecode="d", workers=None,
+                  problem_type=None, log_path=None):
+    """Runs the backends ({name: function}) on `problem` in parallel; returns a PortfolioResult.
+
+    workers defaults to one process per backend. problem must be picklable.
+    """
+    start = time.perf_counter()
+    incumbent = Incumbent(size, time_limit, backends, integral, typecode)
+    with ProcessPoolExecutor(max_workers=workers or len(backends), initializer=_attach,
+                             initargs=(incumbent,)) as pool:
+        futures = [pool.submit(_run_backend, index, name, backend, problem)
+                   for index, (name, backend) in enumerate(backends.items())]
+        reports = [future.result() for future in futures]
+
+    objective, bound, found, winner, prover = incumbent.state()
+    best = incumbent.best()
+    names = incumbent.names
+    result = PortfolioResult(objective, bound, best[1] if best else None,
+                             names[int(winner)] if winner >= 0 else None,
+                             names[int(prover)] if prover >= 0 else None,
+                             incumbent.proven(objective, bound), time.perf_counter() - start, reports)
+    if log_path is not None:
+        record = {"time": time.time(), "problem": problem_type, "objective": objective, "bound": bound,
+                  "winner": result.winner, "prover": result.prover, "optimal": result.optimal,
+                  "elapsed": result.elapsed, "found_after": found - incumbent.started if best else None,
+                  "backends": reports}
+        with open(log_path, "a") as file:
+            file.write(json.dumps(record) + "\n")
+    return result
+
+
+def routing_table(log_path):
+    """{problem type: Counter of winners} over the runs logged in log_path."""
+    table = defaultdict(Counter)
+    with open(log_path, "r") as file:
+        for line in file:
+            record = json.loads(line)
+            if record["winner"] is not None:
+                table[record["problem"]][record["winner"]] += 1
+    return dict(table)
+
+
+# ---------------------------------------------------------------- solver adapters
+
+def solve_highs(highs, incumbent, decode):
+    """Runs a loaded Highs object inside the portfolio; returns its model status string.
+
+    decode(col_values) turns a HiGHS solution into the portfolio's solution
+    array. The interrupt callback publishes the dual bound and stops the run
+    when the portfolio is done.
+
+    The improving-solution callback only offers the vector when its cost
+    matches the reported objective: in highspy 1.8 data_out.mip_solution
+    does not always hold the new solution, and a mismatched pair would be
+    worse than none. The final solution is always offered after run().
+    """
+    highs.setOptionValue("time_limit", max(incumbent.remaining(), 1e-3))
+    num_col = highs.getNumCol()
+    lp = highs.getLp()
+    col_cost, offset = np.asarray(lp.col_cost_), lp.offset_
+
+    def callback(callback_type, message, data_out, data_in, user_data):
+        if callback_type == cb.HighsCallbackType.kCallbackMipImprovingSolution:
+            values = np.asarray(data_out.mip_solution.to_array(num_col))
+            objective = data_out.objective_function_value
+            tolerance = 1e-6 * max(1.0, abs(objective))
+            if np.all(np.isfinite(values)) and abs(col_cost @ values + offset - objective) <= tolerance:
+                incumbent.offer(objective, decode(values))
+        elif callback_type == cb.HighsCallbackType.kCallbackMipInterrupt:
+            if math.isfinite(data_out.mip_dual_bound):
+                incumbent.raise_bound(data_out.mip_dual_bound)
+            data_in.user_interrupt = incumbent.stopped()
+
+    highs.setCallback(callback, None)
+    highs.startCallback(cb.HighsCallbackType.kCallbackMipImprovingSolution)
+    highs.startCallback(cb.HighsCallbackType.kCallbackMipInterrupt)
+    highs.run()
+    status = highs.modelStatusToString(highs.getModelStatus())
+    info = highs.getInfo()
+    if info.primal_solution_status == 2:
+        incumbent.offer(info.objective_function_value, decode(np.asarray(highs.getSolution().col_value)))
+    if status == "Optimal":
+        incumbent.raise_bound(info.mip_dual_bound)
+    return status
+
+
+def solve_cpsat(model, incumbent, variables, decode, parameters=None):
+    """Solves a CP-SAT model inside the portfolio; returns the status name.
+
+    variables is the list of variables whose values decode() turns into the
+    portfolio's solution array. A watcher thread stops the search when the
+    portfolio is done.
+    """
+    class Callback(cp_model.CpSolverSolutionCallback):
+        def on_solution_callback(self):
+            values = np.fromiter((self.Value(var) for var in variables), dtype=np.int64, count=len(variables))
+            incumbent.offer(self.ObjectiveValue(), decode(values))
+            incumbent.raise_bound(self.BestObjectiveBound())
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = max(incumbent.remaining(), 1e-3)
+    solver.parameters.num_workers = 1
+    for name, value in (parameters or {}).items():
+        setattr(solver.parameters, name, value)
+    solver.best_bound_callback = incumbent.raise_bound
+
+    done = threading.Event()
+
+    def watch():
+        while not done.wait(0.05):
+            if incumbent.stopped():
+                solver.stop_search()
+                return
+
+    watcher = threading.Thread(target=watch, daemon=True)
+    watcher.start()
+    status = solver.solve(model, Callback())
+    done.set()
+    watcher.join()
+    if status == cp_model.OPTIMAL:
+        incumbent.raise_bound(solver.objective_value)
+    return solver.status_name(status)
@@ -0,0 +1,24 @@
+"""Vectorised extraction of mathopt solutions.
+
+result.variable_values() is a dict keyed by Variable objects. Looking
+variables up one by one inside nested loops costs a Python call and a hash
+per variable. These helpers fetch the values once, in variable order, into a
+NumPy array, so the chosen indices come out of a single comparison.
+"""
+import numpy as np
+
+
+def variable_array(result, variables):
+    """Values of `variables` (a sequence of mathopt Variables) as a float64 array in the same order."""
+    values = result.variable_values(variables)
+    return np.fromiter(values, dtype=np.float64, count=len(variables))
+
+
+def chosen_indices(result, variables, threshold=0.5):
+    """Positions in `variables` of the binaries that are set in the solution."""
+    return np.flatnonzero(variable_array(result, variables) > threshold)
+
+
+def chosen_keys(result, variables, keys, threshold=0.5):
+    """Rows of `keys` (an array aligned with `variables`) whose variable is set."""
+    return np.asarray(keys)[chosen_indices(result, variables, threshold)]
@@ -0,0 +1,376 @@
+"""Resident solver service on localhost HTTP.
+
+    python -m common.service serve --port 8765 --workers 2
+    python -m common.service solve day3 day3/instance.txt --time-limit 10
+    python -m common.service cancel <job id>
+
+Each script run pays for importing the solvers (ortools, highspy, NumPy)
+before it reads a single line. The service pays it once: its worker
+processes import the modules of PRELOAD when they start and then serve
+requests for as long as they live, so the instance cache entries they read
+(with ADVENTORCODE_CACHE=1) stay mapped in the page cache too. Requests run the adapters of
+common.batch, so a job gives the same JSON record as a batch run (status,
+objective, solution, phase timings).
+
+Endpoints (JSON bodies and answers):
+
+- POST /solve {"problem", "instance" (a path) or "text" (the file content),
+  "time_limit", "solution", "wait"}: queues a job. With "wait" (the
+  default) the answer is the finished job, otherwise {"id", "state"} right
+  away;
+- GET /jobs/<id>: the job, with its state (queued, running, done,
+  cancelled, timeout or error if its worker died), its record once done and
+  its queue and run times. The last `keep` finished jobs are kept;
+- POST /jobs/<id>/cancel: cancels a queued job, or stops a running one by
+  terminating its worker (a fresh one takes its place);
+- GET /health: workers, queued jobs and counts per state.
+
+The time limit goes to the solver; a job still running `grace` seconds
+after it is stopped like a cancelled one, with the state "timeout". The
+problems are those of common.batch.PROBLEMS (day4 text requests need a
+path, as the note file must sit next to the requirements).
+
+ServiceClient wraps the endpoints for Python callers.
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from common.batch import PROBLEMS, solve_instance
+
+PRELOAD = ["numpy", "highspy", "ortools.sat.python.cp_model", "day1.day1_ortools", "day1.coloring",
+           "day2.rcsp", "day3.assignment", "day7.presolve", "day7.set_partition"]
+DEFAULT_PORT = 8765
+
+
+def _worker_main(connection, preload):
+    """Worker process: imports `preload`, then solves the jobs sent through `connection` until it closes."""
+    import importlib
+
+    for name in preload:
+        importlib.import_module(name)
+    connection.send("ready")
+    while True:
+        try:
+            problem, path, time_limit, include_solution = connection.recv()
+        except EOFError:
+            return
+        connection.send(solve_instance(problem, path, time_limit, include_solution))
+
+
+class Worker:
+    """One resident worker process and the pipe to it."""
+
+    def __init__(self, context, preload):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, preload), daemon=True)
+        self.process.start()
+        child.close()
+        self.connection.recv()  # "ready": the imports are done
+
+    def stop(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.connection.close()
+
+
+class SolverService:
+    """Job queue served by `workers` resident processes; one dispatcher thread drives each worker."""
+
+    def __init__(self, workers=1, preload=PRELOAD, spool=None, grace=10.0, keep=1000):
+        self.preload = list(preload)
+        self.spool = spool or os.path.join(tempfile.gettempdir(), "adventORCode-service")
+        self.grace = grace
+        self.jobs = {}
+        self.queue = deque()
+        self.finished = deque()  # ids of the finished jobs still kept, oldest first
+        self.keep = keep
+        self.condition = threading.Condition()
+        self.ids = itertools.count(1)
+        self.context = multiprocessing.get_context("spawn")
+        self.workers = [Worker(self.context, self.preload) for _ in range(workers)]
+        self.closed = False
+        self.threads = [threading.Thread(target=self._dispatch, args=(index,), daemon=True)
+                        for index in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, request):
+        """Queues a job for `request` (the body of POST /solve); returns its id. Raises ValueError on bad input."""
+        if not isinstance(request, dict):
+            raise ValueError("The request must be a JSON object.")
+        problem = request.get("problem")
+        if not isinstance(problem, str) or problem not in PROBLEMS:
+            raise ValueError(f"Unknown problem: {problem}")
+        if "text" in request:
+            if not isinstance(request["text"], str):
+                raise ValueError("text must be a string.")
+            path = self._spool_text(problem, request["text"])
+        elif isinstance(request.get("instance"), str) and os.path.isfile(request["instance"]):
+            path = os.path.abspath(request["instance"])
+        else:
+            raise ValueError("Give the instance path or its text.")
+        try:
+            time_limit = float(request.get("time_limit", 60.0))
+        except (TypeError, ValueError):
+            raise ValueError("time_limit must be a number.") from None
+        if not math.isfinite(time_limit) or time_limit <= 0:
+            raise ValueError("time_limit must be a finite, positive number of seconds.")
+        with self.condition:
+            job_id = str(next(self.ids))
+            self.jobs[job_id] = {"id": job_id, "problem": problem, "instance": path, "state": "queued",
+                                 "time_limit": time_limit,
+                                 "solution": bool(request.get("solution", True)), "submitted": time.time(),
+                                 "started": None, "finished": None, "record": None}
+            self.queue.append(job_id)
+            self.condition.notify_all()
+        return job_id
+
+    def _spool_text(self, problem, text):
+        # Named by content, so the same text maps to the same file (and instance cache entry)
+        os.makedirs(self.spool, exist_ok=True)
+        digest = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+        path = os.path.join(self.spool, f"{problem}-{digest}.txt")
+        if not os.path.exists(path):
+            with tempfile.NamedTemporaryFile("w", dir=self.spool, delete=False) as file:
+                file.write(text)
+            os.replace(file.name, path)
+        return path
+
+    def job(self, job_id):
+        """A copy of the job (None if unknown)."""
+        with self.condition:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def wait(self, job_id, timeout=None):
+        """Blocks until the job leaves the queued and running states; returns it."""
+        with self.condition:
+            job = self.jobs[job_id]
+            self.condition.wait_for(lambda: job["state"] not in ("queued", "running"), timeout)
+            return dict(job)
+
+    def cancel(self, job_id):
+        """Cancels a queued or running job; returns its state afterwards (None if unknown)."""
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            if job["state"] == "queued":
+                self.queue.remove(job_id)
+                self._finish(job, "cancelled", None)
+            elif job["state"] == "running":
+                job["cancel"] = True
+                self.condition.notify_all()
+                self.condition.wait_for(lambda: job["state"] != "running")
+            return job["state"]
+
+    def _finish(self, job, state, record):
+        job["state"], job["record"], job["finished"] = state, record, time.time()
+        self.finished.append(job["id"])
+        while len(self.finished) > self.keep:
+            del self.jobs[self.finished.popleft()]
+        self.condition.notify_all()
+
+    def _dispatch(self, index):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.queue or self.closed)
+                if self.closed:
+                    return
+                job = self.jobs[self.queue.popleft()]
+                job["state"], job["started"] = "running", time.time()
+            worker = self.workers[index]
+            worker.connection.send((job["problem"], job["instance"], job["time_limit"], job["solution"]))
+            deadline = job["started"] + job["time_limit"] + self.grace
+            while not worker.connection.poll(0.05):
+                if job.get("cancel") or self.closed or time.time() > deadline or not worker.process.is_alive():
+                    state = "cancelled" if job.get("cancel") or self.closed else \
+                        "timeout" if worker.process.is_alive() else "error"
+                    with self.condition:
+                        self._finish(job, state, None)
+                    # Stopping a solver mid-run means stopping its process: start a fresh one (unless closing)
+                    worker.stop()
+                    if not self.closed:
+                        self.workers[index] = Worker(self.context, self.preload)
+                    break
+            else:
+                record = worker.connection.recv()
+                with self.condition:
+                    self._finish(job, "done", record)
+
+    def health(self):
+        with self.condition:
+            return {"workers": len(self.workers), "queued": len(self.queue),
+                    "jobs": dict(Counter(job["state"] for job in self.jobs.values()))}
+
+    def close(self):
+        """Stops the running jobs, then the dispatchers, then the workers (a respawn in progress included)."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        for thread in self.threads:
+            thread.join()
+        for worker in self.workers:
+            worker.stop()
+
+
+def _handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._reply(200, service.health())
+            elif self.path.startswith("/jobs/"):
+                job = service.job(self.path[len("/jobs/"):])
+                self._reply(200 if job else 404, job or {"error": "unknown job"})
+            else:
+                self._reply(404, {"error": "unknown endpoint"})
+
+        def do_POST(self):
+            try:
+                if self.path == "/solve":
+                    request = self._body()
+                    job_id = service.submit(request)
+                    if request.get("wait", True):
+                        self._reply(200, service.wait(job_id))
+                    else:
+                        self._reply(202, {"id": job_id, "state": "queued"})
+                elif self.path.startswith("/jobs/") and self.path.endswith("/cancel"):
+                    state = service.cancel(self.path[len("/jobs/"):-len("/cancel")])
+                    self._reply(200 if state else 404, {"state": state} if state else {"error": "unknown job"})
+                else:
+                    self._reply(404, {"error": "unknown endpoint"})
+            except ValueError as error:  # also covers malformed JSON
+                self._reply(400, {"error": str(error)})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def make_server(service, host="127.0.0.1", port=DEFAULT_PORT):
+    """The HTTP server of `service` (port 0 picks a free port: see server.server_address)."""
+    server = ThreadingHTTPServer((host, port), _handler(service))
+    server.daemon_threads = True
+    return server
+
+
+def serve(host="127.0.0.1", port=DEFAULT_PORT, workers=1, grace=10.0):
+    """Runs the service until interrupted."""
+    service = SolverService(workers, grace=grace)
+    server = make_server(service, host, port)
+    print(f"Serving {sorted(PROBLEMS)} on http://{host}:{port} with {workers} workers", file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+class ServiceClient:
+    """HTTP client of a running SolverService."""
+
+    def __init__(self, url=f"http://127.0.0.1:{DEFAULT_PORT}", timeout=None):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _call(self, method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.url + path, data=data, method=method,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as error:
+            raise RuntimeError(json.loads(error.read()).get("error", str(error))) from None
+
+    def solve(self, problem, instance=None, text=None, time_limit=60.0, solution=True, wait=True):
+        """The finished job (or {"id", "state"} with wait=False) for an instance path or its text."""
+        body = {"problem": problem, "time_limit": time_limit, "solution": solution, "wait": wait}
+        body.update({"text": text} if text is not None else {"instance": os.path.abspath(instance)})
+        return self._call("POST", "/solve", body)
+
+    def job(self, job_id):
+        return self._call("GET", f"/jobs/{job_id}")
+
+    def cancel(self, job_id):
+        return self._call("POST", f"/jobs/{job_id}/cancel", {})["state"]
+
+    def health(self):
+        return self._call("GET", "/health")
+
+    def wait_ready(self, timeout=60.0):
+        """Waits until the service answers /health (e.g. right after starting it)."""
+        deadline = time.time() + timeout
+        while True:
+            try:
+                return self.health()
+            except OSError:
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=f"http://127.0.0.1:{DEFAULT_PORT}", help="service URL (client commands)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    server = commands.add_parser("serve")
+    server.add_argument("--host", default="127.0.0.1")
+    server.add_argument("--port", type=int, default=DEFAULT_PORT)
+    server.add_argument("--workers", type=int, default=1)
+    server.add_argument("--grace", type=float, default=10.0, help="seconds past the time limit before a job is stopped")
+    solve = commands.add_parser("solve")
+    solve.add_argument("problem", choices=sorted(PROBLEMS))
+    solve.add_argument("instance")
+    solve.add_argument("--time-limit", type=float, default=60.0)
+    solve.add_argument("--no-wait", action="store_true", help="print the job id instead of waiting")
+    cancel = commands.add_parser("cancel")
+    cancel.add_argument("job")
+    commands.add_parser("health")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.host, args.port, args.workers, args.grace)
+        return 0
+    client = ServiceClient(args.url)
+    if args.command == "solve":
+        answer = client.solve(args.problem, args.instance, time_limit=args.time_limit, wait=not args.no_wait)
+    elif args.command == "cancel":
+        answer = {"state": client.cancel(args.job)}
+    else:
+        answer = client.health()
+    print(json.dumps(answer))
+    return 0 if answer.get("state") in ("done", "queued", "cancelled", None) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""Cache of solved instances in SQLite.
+
+Pipelines re-submit the same instances, often listed in another order.
+The solve entry points with a cached variant (day1
+solve_rooms_cached, day3 solve_assignment_cached, day7
+solve_partition_cached) canonicalise the parsed instance (sorted edges,
+rows or columns), hash it with fingerprint() and look it up here:
+
+- hit: an optimal solution is stored under the exact fingerprint. It is
+  re-verified against the instance (feasibility and cost, or the dual
+  certificate where there is one) and returned without solving;
+- near miss: no optimal entry for the fingerprint, but an entry with the
+  same structure key (e.g. the same subsets with other costs). Its
+  solution is passed to the solver as a warm start;
+- miss: the instance is solved from scratch.
+
+Solutions are stored in canonical order, as NumPy arrays in an .npz blob.
+After each store, entries older than max_age seconds are deleted, then the
+least recently used ones until the blobs fit in max_bytes. The hit, near
+miss and miss counters are kept in the database, so stats() adds up every
+process that shared it.
+
+There is no default cache unless ADVENTORCODE_SOLUTIONS=1: a stored
+result could hide a change to the solver, so the cached variants solve
+every time until a cache is asked for (or passed as `cache`). It is then
+$ADVENTORCODE_SOLUTIONS_DB (~/.cache/adventORCode-solutions.sqlite
+otherwise), at most $ADVENTORCODE_SOLUTIONS_MB megabytes (256) and
+$ADVENTORCODE_SOLUTIONS_DAYS days (30). configure() changes it in code.
+"""
+import hashlib
+import io
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "adventORCode-solutions.sqlite")
+DEFAULT_MAX_MB = 256
+DEFAULT_MAX_DAYS = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS solutions (
+    key TEXT PRIMARY KEY, problem TEXT, structure TEXT, objective REAL, optimal INTEGER,
+    payload BLOB, bytes INTEGER, created REAL, used REAL);
+CREATE INDEX IF NOT EXISTS solutions_structure ON solutions (problem, structure, used);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER);
+"""
+
+
+def fingerprint(*parts):
+    """blake2b hex digest of numbers, strings and arrays (dtype and shape included)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(f"{part.dtype.str}{part.shape}".encode())
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b"|")
+    return digest.hexdigest()
+
+
+class SolutionCache:
+    def __init__(self, path=DEFAULT_PATH, max_bytes=DEFAULT_MAX_MB * 2 ** 20, max_age=DEFAULT_MAX_DAYS * 86400):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._connection = None
+        self._pid = None
+
+    def _connect(self):
+        # One connection per process: a pool worker forked from a parent must not reuse the parent's
+        if self._connection is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            self._connection.executescript(_SCHEMA)
+            self._pid = os.getpid()
+        return self._connection
+
+    def lookup(self, problem, key, structure=None):
+        """("hit" | "near" | "miss", entry) for an instance; entry is None on a miss.
+
+        entry is a dict with objective, optimal and solution (a dict of
+        arrays). An exact key that is not optimal counts as a near miss.
+        The caller re-verifies a hit and calls count("hit") or
+        count("near") once it has decided; lookup only counts misses.
+        """
+        connection = self._connect()
+        row = connection.execute("SELECT key, objective, optimal, payload FROM solutions WHERE key = ?",
+                                 (key,)).fetchone()
+        if row is None and structure is not None:
+            row = connection.execute("SELECT key, objective, optimal, payload FROM solutions "
+                                     "WHERE problem = ? AND structure = ? ORDER BY used DESC LIMIT 1",
+                                     (problem, structure)).fetchone()
+        if row is None:
+            self.count("miss")
+            return "miss", None
+        connection.execute("UPDATE solutions SET used = ? WHERE key = ?", (time.time(), row[0]))
+        with np.load(io.BytesIO(row[3]), allow_pickle=False) as payload:
+            solution = {name: payload[name] for name in payload.files}
+        kind = "hit" if row[0] == key and row[2] else "near"
+        return kind, {"objective": row[1], "optimal": bool(row[2]), "solution": solution}
+
+    def store(self, problem, key, structure, objective, optimal, solution):
+        """Stores (or replaces) the solution of an instance, then evicts old and least recently used entries."""
+        buffer = io.BytesIO()
+        np.savez(buffer, **{name: np.asarray(value) for name, value in solution.items()})
+        payload = buffer.getvalue()
+        now = time.time()
+        connection = self._connect()
+        connection.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                           (key, problem, structure, float(objective), int(bool(optimal)), payload,
+                            len(payload), now, now))
+        self.evict(keep=key)
+
+    def evict(self, keep=None):
+        connection = self._connect()
+        # IS NOT, not !=: with keep=None, "key != NULL" is never true and nothing would be deleted
+        connection.execute("DELETE FROM solutions WHERE created < ? AND key IS NOT ?",
+                           (time.time() - self.max_age, keep))
+        total = connection.execute("SELECT COALESCE(SUM(bytes), 0) FROM solutions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in connection.execute("SELECT key, bytes FROM solutions ORDER BY used").fetchall():
+            if total <= self.max_bytes:
+                break
+            if key != keep:
+                connection.execute("DELETE FROM solutions WHERE key = ?", (key,))
+                total -= size
+
+    def count(self, name):
+        self._connect().execute(
+            "INSERT INTO counters VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,))
+
+    def stats(self):
+        """{"hit", "near", "miss", "entries", "bytes"} over every process that used this database."""
+        connection = self._connect()
+        stats = {"hit": 0, "near": 0, "miss": 0}
+        stats.update(connection.execute("SELECT name, value FROM counters").fetchall())
+        stats["entries"], stats["bytes"] = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM solutions").fetchone()
+        return stats
+
+    def clear(self):
+        connection = self._connect()
+        connection.execute("DELETE FROM solutions")
+        connection.execute("DELETE FROM counters")
+
+
+_default = None
+
+
+def configure(path=None, max_bytes=None, max_age=None, enabled=True):
+    """Replaces the default cache (enabled=False solves every time). Returns the new cache or None."""
+    global _default
+    if not enabled:
+        _default = False
+        return None
+    _default = SolutionCache(
+        path or os.environ.get("ADVENTORCODE_SOLUTIONS_DB", DEFAULT_PATH),
+        max_bytes or int(os.environ.get("ADVENTORCODE_SOLUTIONS_MB", DEFAULT_MAX_MB)) * 2 ** 20,
+        max_age or float(os.environ.get("ADVENTORCODE_SOLUTIONS_DAYS", DEFAULT_MAX_DAYS)) * 86400)
+    return _default
+
+
+def default():
+    """The default SolutionCache, or None when it is turned off."""
+    if _default is None:
+        configure(enabled=os.environ.get("ADVENTORCODE_SOLUTIONS", "0") != "0")
+    return _default or None
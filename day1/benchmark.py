@@ -0,0 +1,88 @@
+"""Benchmark de construcción y resolución del modelo de day1.
+
+Compara la formulación por aristas con la formulación por cliques sobre
+day1/instance.txt y sobre grafos de conflictos sintéticos, midiendo la
+construcción con Pyomo + MPS frente a la construcción directa en CSC.
+
+Uso (desde la raíz del repositorio):
+    python -m day1.benchmark --sizes 1000 2000 5000 10000 --time-limit 60
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+
+from day1.coloring import color_bounds
+from day1.day1_highs import (build_highs_model, build_optimization_model, export_model_to_mps,
+                             load_instance, solve_with_highspy)
+
+
+def random_conflict_graph(num_events, average_degree, seed=0):
+    """Genera un grafo de conflictos aleatorio (Erdős–Rényi) con el grado medio indicado."""
+    rng = random.Random(seed)
+    num_conflicts = int(num_events * average_degree / 2)
+    edges = set()
+    while len(edges) < num_conflicts:
+        i, j = rng.randint(1, num_events), rng.randint(1, num_events)
+        if i != j:
+            edges.add((min(i, j), max(i, j)))
+
+    graph = defaultdict(list)
+    for i, j in edges:
+        graph[i].append(j)
+        graph[j].append(i)
+    return num_events, sorted(edges), graph
+
+
+def run_case(name, num_events, conflicts, graph, formulation, time_limit):
+    _, rooms_upper_bound, _, _ = color_bounds(num_events, conflicts, time_limit=0)
+
+    start = time.perf_counter()
+    model = build_optimization_model(num_events, conflicts, rooms_upper_bound, formulation)
+    build_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mps_path = os.path.join(tmp, "model.mps")
+        start = time.perf_counter()
+        export_model_to_mps(model, mps_path)
+        export_time = time.perf_counter() - start
+
+    # Camino directo: matriz CSC en memoria, sin Pyomo ni MPS
+    start = time.perf_counter()
+    lp, _ = build_highs_model(num_events, conflicts, rooms_upper_bound, formulation)
+    csc_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    highs = solve_with_highspy(lp, time_limit=time_limit, output=False)
+    solve_time = time.perf_counter() - start
+
+    info = highs.getInfo()
+    print(f"{name:>14} {formulation:>8} {num_events:>7} {len(conflicts):>8} {rooms_upper_bound:>5} "
+          f"{build_time:>9.2f} {export_time:>9.2f} {csc_time:>9.2f} {solve_time:>9.2f} "
+          f"{info.objective_function_value:>8.1f} {info.mip_dual_bound:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instance", default="day1/instance.txt")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1000, 2000, 5000, 10000])
+    parser.add_argument("--average-degree", type=float, default=20.0)
+    parser.add_argument("--time-limit", type=float, default=60.0)
+    parser.add_argument("--formulations", nargs="*", default=["edges", "cliques"])
+    args = parser.parse_args()
+
+    cases = [("instance", *load_instance(args.instance))]
+    for size in args.sizes:
+        cases.append((f"random-{size}", *random_conflict_graph(size, args.average_degree, seed=size)))
+
+    print(f"{'caso':>14} {'modelo':>8} {'eventos':>7} {'aristas':>8} {'ub':>5} "
+          f"{'pyomo[s]':>9} {'mps[s]':>9} {'csc[s]':>9} {'solve[s]':>9} {'obj':>8} {'bound':>8}")
+    for name, num_events, conflicts, graph in cases:
+        for formulation in args.formulations:
+            run_case(name, num_events, conflicts, graph, formulation, args.time_limit)
+
+
+if __name__ == "__main__":
+    main()
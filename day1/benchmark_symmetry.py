@@ -0,0 +1,87 @@
+"""Benchmark de ruptura de simetría y arranque en caliente para day1.
+
+Mide el tiempo hasta el óptimo (o hasta el límite de tiempo) de HiGHS y CP-SAT
+con cada opción de ruptura de simetría, con y sin la coloración greedy como
+solución inicial (DSATUR/smallest-last, sin TabuCol por defecto).
+
+Uso (desde la raíz del repositorio):
+    python -m day1.benchmark_symmetry --time-limit 60
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from ortools.sat.python import cp_model
+
+from day1.coloring import color_bounds
+from day1.day1_highs import (build_highs_model, build_representatives_model, coloring_to_col_values,
+                             load_instance, solve_with_highspy)
+from day1.day1_ortools import solve_representatives_with_ortools, solve_with_ortools
+from day1.symmetry import align_coloring
+
+VARIANTS = ["base", "order", "clique", "order+clique", "representatives"]
+
+
+def run_highs(num_events, conflicts, rooms_upper_bound, variant, clique, rooms, time_limit):
+    if variant == "representatives":
+        lp, col_names = build_representatives_model(num_events, conflicts)
+    else:
+        lp, col_names = build_highs_model(num_events, conflicts, rooms_upper_bound,
+                                          symmetry_breaking="order" in variant,
+                                          fixed_clique=clique if "clique" in variant else None)
+    start = None if rooms is None else coloring_to_col_values(col_names, rooms)
+
+    begin = time.perf_counter()
+    highs = solve_with_highspy(lp, time_limit=time_limit, output=False, start=start)
+    elapsed = time.perf_counter() - begin
+
+    info = highs.getInfo()
+    optimal = highs.modelStatusToString(highs.getModelStatus()) == "Optimal"
+    return elapsed, optimal, info.objective_function_value, info.mip_dual_bound
+
+
+def run_cpsat(num_events, conflicts, rooms_upper_bound, variant, clique, rooms, time_limit):
+    begin = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if variant == "representatives":
+            solver, status = solve_representatives_with_ortools(num_events, conflicts, hint=rooms,
+                                                                time_limit=time_limit)
+        else:
+            solver, status = solve_with_ortools(num_events, conflicts, rooms_upper_bound,
+                                                symmetry_breaking="order" in variant,
+                                                fixed_clique=clique if "clique" in variant else None,
+                                                hint=rooms, time_limit=time_limit)
+    elapsed = time.perf_counter() - begin
+    return elapsed, status == cp_model.OPTIMAL, solver.ObjectiveValue(), solver.BestObjectiveBound()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instance", default="day1/instance.txt")
+    parser.add_argument("--time-limit", type=float, default=60.0)
+    parser.add_argument("--coloring-time", type=float, default=0.0,
+                        help="presupuesto de TabuCol para la coloración inicial")
+    parser.add_argument("--backends", nargs="*", default=["highs", "cpsat"])
+    parser.add_argument("--variants", nargs="*", default=VARIANTS)
+    args = parser.parse_args()
+
+    num_events, conflicts, graph = load_instance(args.instance)
+    _, rooms_upper_bound, colors, clique = color_bounds(num_events, conflicts, time_limit=args.coloring_time)
+    rooms = align_coloring(colors, clique)
+    print(f"eventos={num_events} aristas={len(conflicts)} cota superior={rooms_upper_bound} clique={len(clique)}")
+
+    runners = {"highs": run_highs, "cpsat": run_cpsat}
+    print(f"{'backend':>7} {'variante':>16} {'warm':>5} {'tiempo[s]':>10} {'óptimo':>7} {'obj':>6} {'bound':>6}")
+    for backend in args.backends:
+        for variant in args.variants:
+            for warm in (False, True):
+                elapsed, optimal, objective, bound = runners[backend](
+                    num_events, conflicts, rooms_upper_bound, variant, clique,
+                    rooms if warm else None, args.time_limit)
+                print(f"{backend:>7} {variant:>16} {str(warm):>5} {elapsed:>10.2f} {str(optimal):>7} "
+                      f"{objective:>6.1f} {bound:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
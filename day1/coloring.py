@@ -0,0 +1,215 @@
+"""Motor de coloración de grafos para day1.
+
+El grafo de conflictos se guarda como arrays CSR (indptr, indices) con los
+eventos en base 0. Sobre él se ofrecen:
+
+- DSATUR y smallest-last (cotas superiores rápidas),
+- una mejora TabuCol con presupuesto de tiempo,
+- un clique greedy como cota inferior.
+
+color_bounds combina todo y devuelve ambas cotas: si coinciden, el MIP no
+hace falta; si no, la cota superior es el rooms_upper_bound del modelo.
+"""
+import heapq
+import time
+
+import numpy as np
+
+
+def build_csr(num_events, conflicts):
+    """Construye la adyacencia CSR (sin duplicados ni bucles) a partir de la lista de aristas."""
+    edges = np.asarray(conflicts, dtype=np.int64).reshape(-1, 2) - 1
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    both = np.concatenate([edges, edges[:, ::-1]])
+    both = np.unique(both, axis=0)
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(both[:, 0], minlength=num_events))])
+    return indptr, both[:, 1].copy()
+
+
+def _adjacency_lists(indptr, indices):
+    return [indices[indptr[v]:indptr[v + 1]].tolist() for v in range(len(indptr) - 1)]
+
+
+def greedy_color(indptr, indices, order):
+    """Asigna a cada vértice, en el orden dado, el menor color libre."""
+    adjacency = _adjacency_lists(indptr, indices)
+    colors = [-1] * (len(indptr) - 1)
+    for v in order:
+        used = 0
+        for u in adjacency[v]:
+            if colors[u] >= 0:
+                used |= 1 << colors[u]
+        colors[v] = (~used & (used + 1)).bit_length() - 1
+    return np.asarray(colors, dtype=np.int64)
+
+
+def dsatur(indptr, indices):
+    """Coloración DSATUR: colorea primero el vértice con más colores distintos en su vecindad."""
+    n = len(indptr) - 1
+    adjacency = _adjacency_lists(indptr, indices)
+    degree = np.diff(indptr).tolist()
+    colors = [-1] * n
+    neighbor_colors = [0] * n  # bitset de colores vistos en la vecindad
+    saturation = [0] * n
+
+    heap = [(0, -degree[v], v) for v in range(n)]
+    heapq.heapify(heap)
+    while heap:
+        sat, _, v = heapq.heappop(heap)
+        if colors[v] >= 0 or -sat != saturation[v]:
+            continue  # entrada obsoleta
+        used = neighbor_colors[v]
+        color = (~used & (used + 1)).bit_length() - 1
+        colors[v] = color
+        bit = 1 << color
+        for u in adjacency[v]:
+            if colors[u] < 0 and not neighbor_colors[u] & bit:
+                neighbor_colors[u] |= bit
+                saturation[u] += 1
+                heapq.heappush(heap, (-saturation[u], -degree[u], u))
+    return np.asarray(colors, dtype=np.int64)
+
+
+def smallest_last_order(indptr, indices):
+    """Orden smallest-last: se retira repetidamente el vértice de menor grado residual."""
+    n = len(indptr) - 1
+    adjacency = _adjacency_lists(indptr, indices)
+    degree = np.diff(indptr).tolist()
+    buckets = [set() for _ in range(max(degree, default=0) + 1)]
+    for v in range(n):
+        buckets[degree[v]].add(v)
+
+    removed = [False] * n
+    order = []
+    low = 0
+    for _ in range(n):
+        low = max(low - 1, 0)
+        while not buckets[low]:
+            low += 1
+        v = buckets[low].pop()
+        removed[v] = True
+        order.append(v)
+        for u in adjacency[v]:
+            if not removed[u]:
+                buckets[degree[u]].discard(u)
+                degree[u] -= 1
+                buckets[degree[u]].add(u)
+    order.reverse()
+    return order
+
+
+def smallest_last(indptr, indices):
+    """Coloración greedy en orden smallest-last."""
+    return greedy_color(indptr, indices, smallest_last_order(indptr, indices))
+
+
+def greedy_clique(indptr, indices, max_starts=50):
+    """Clique grande greedy (cota inferior del número de salas), en base 0."""
+    n = len(indptr) - 1
+    adjacency = [set(neighbors) for neighbors in _adjacency_lists(indptr, indices)]
+    degree = np.diff(indptr)
+    best = []
+    for start in np.argsort(-degree, kind="stable")[:max_starts].tolist():
+        clique = [start]
+        candidates = set(adjacency[start])
+        while candidates:
+            # Añadir el candidato con más vecinos dentro de los candidatos restantes
+            vertex = max(candidates, key=lambda v: (len(adjacency[v] & candidates), -v))
+            clique.append(vertex)
+            candidates &= adjacency[vertex]
+        if len(clique) > len(best):
+            best = clique
+    return best if n else []
+
+
+def tabucol(indptr, indices, num_colors, colors, time_limit, seed=0):
+    """Busca una coloración válida con num_colors colores (TabuCol).
+
+    colors es la coloración de partida (puede tener conflictos y debe usar
+    colores < num_colors). Devuelve la coloración encontrada o None si se
+    agota el tiempo.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(indptr) - 1
+    colors = np.asarray(colors, dtype=np.int64).copy()
+    vertices = np.arange(n)
+    sources = np.repeat(vertices, np.diff(indptr))
+
+    # gamma[v, c] = número de vecinos de v con color c
+    gamma = np.zeros((n, num_colors), dtype=np.int64)
+    np.add.at(gamma, (sources, colors[indices]), 1)
+    conflicts = int(gamma[vertices, colors].sum()) // 2
+    best = conflicts
+    tabu = np.zeros((n, num_colors), dtype=np.int64)
+    blocked = np.iinfo(np.int64).max // 2
+
+    deadline = time.perf_counter() + time_limit
+    iteration = 0
+    while conflicts > 0 and time.perf_counter() < deadline:
+        conflicting = np.flatnonzero(gamma[vertices, colors] > 0)
+        current = colors[conflicting]
+        delta = gamma[conflicting] - gamma[conflicting, current][:, None]
+        delta[np.arange(len(conflicting)), current] = blocked
+        # Movimiento tabú permitido solo si mejora la mejor solución (aspiración)
+        allowed = (tabu[conflicting] <= iteration) | (conflicts + delta < best)
+        delta = np.where(allowed, delta, blocked)
+        best_delta = delta.min()
+        iteration += 1
+        if best_delta >= blocked:
+            continue
+
+        rows, new_colors = np.nonzero(delta == best_delta)
+        pick = rng.integers(len(rows))
+        v, new_color = int(conflicting[rows[pick]]), int(new_colors[pick])
+        old_color = int(colors[v])
+
+        neighbors = indices[indptr[v]:indptr[v + 1]]
+        gamma[neighbors, old_color] -= 1
+        gamma[neighbors, new_color] += 1
+        colors[v] = new_color
+        conflicts += int(best_delta)
+        tabu[v, old_color] = iteration + rng.integers(10) + int(0.6 * len(conflicting))
+        best = min(best, conflicts)
+
+    return colors if conflicts == 0 else None
+
+
+def improve_coloring(indptr, indices, colors, time_limit, lower_bound=1, seed=0):
+    """Reduce el número de colores con TabuCol mientras quede presupuesto de tiempo."""
+    rng = np.random.default_rng(seed)
+    colors = np.asarray(colors, dtype=np.int64)
+    deadline = time.perf_counter() + time_limit
+    while len(colors) and colors.max() + 1 > lower_bound:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            break
+        num_colors = int(colors.max())
+        # Repartir al azar los vértices del último color entre los demás
+        start = colors.copy()
+        last = start == num_colors
+        start[last] = rng.integers(num_colors, size=int(last.sum()))
+        candidate = tabucol(indptr, indices, num_colors, start, remaining, seed=int(rng.integers(1 << 31)))
+        if candidate is None:
+            break
+        colors = candidate
+    return colors
+
+
+def color_bounds(num_events, conflicts, time_limit=1.0, seed=0):
+    """Calcula cotas inferior y superior del número de salas.
+
+    Devuelve (lower_bound, upper_bound, colors, clique), con colors como
+    {evento: color} (colores desde 0) y clique como lista de eventos, ambos
+    en la numeración base 1 de la instancia.
+    """
+    indptr, indices = build_csr(num_events, conflicts)
+    clique = greedy_clique(indptr, indices)
+    lower_bound = max(len(clique), 1 if num_events else 0)
+
+    colors = min((dsatur(indptr, indices), smallest_last(indptr, indices)), key=lambda c: c.max(initial=-1))
+    if time_limit > 0:
+        colors = improve_coloring(indptr, indices, colors, time_limit, lower_bound, seed)
+
+    upper_bound = int(colors.max(initial=-1)) + 1
+    colors = {event: int(color) for event, color in enumerate(colors.tolist(), start=1)}
+    return lower_bound, upper_bound, colors, [v + 1 for v in clique]
@@ -1,49 +1,78 @@
 from collections import defaultdict
-from pyomo.environ import *
-from highspy import Highs
+import numpy as np
+from highspy import Highs, HighsLp, HighsVarType, MatrixFormat
+
+from common.instances import load_edges
+from day1.coloring import color_bounds
+from day1.symmetry import build_adjacency, representatives_from_rooms, representatives_structure
 
 # ---------------------- FUNCIONES ----------------------
 
 
 def load_instance(file_path):
     """Carga la instancia desde un archivo y construye el grafo."""
-    with open(file_path, "r") as file:
-        lines = file.readlines()
-
-    # Parsear número de eventos y conflictos
-    num_events, num_conflicts = map(int, lines[0].strip().split())
+    # Lectura vectorizada (mmap) de la cabecera y de las líneas "e x y", a través de la caché de instancias
+    num_events, edges = load_edges(file_path)
+    conflicts = list(map(tuple, edges.tolist()))
 
     # Construir grafo como lista de adyacencia
     graph = defaultdict(list)
-    conflicts = []
-    for line in lines[1:]:
-        if line.startswith("e"):  # Procesar solo líneas con conflictos
-            _, x, y = line.strip().split()
-            x, y = int(x), int(y)
-            graph[x].append(y)
-            graph[y].append(x)
-            conflicts.append((x, y))
+    for x, y in conflicts:
+        graph[x].append(y)
+        graph[y].append(x)
 
     return num_events, conflicts, graph
 
 
-def greedy_coloring(graph, num_events):
-    """Realiza una heurística de coloración greedy."""
-    colors = {}
-    for node in range(1, num_events + 1):
-        # Obtener colores usados por los vecinos
-        neighbor_colors = {colors[neighbor] for neighbor in graph[node] if neighbor in colors}
-        # Asignar el primer color disponible
-        for color in range(num_events):  # Máximo num_events colores posibles
-            if color not in neighbor_colors:
-                colors[node] = color
-                break
-
-    return max(colors.values()) + 1
+def greedy_clique_cover(num_events, conflicts):
+    """Cubre todas las aristas del grafo de conflictos con cliques maximales (greedy).
+
+    Los eventos sin conflictos quedan en un clique de un solo elemento para que
+    la formulación por cliques siga ligando x[i, r] con y[r].
+    """
+    adjacency = defaultdict(set)
+    for i, j in conflicts:
+        if i != j:
+            adjacency[i].add(j)
+            adjacency[j].add(i)
+
+    covered = set()
+    cliques = []
+    # Empezar por las aristas de los eventos con mayor grado produce cliques más grandes
+    edges = sorted({(min(i, j), max(i, j)) for i, j in conflicts if i != j},
+                   key=lambda e: -(len(adjacency[e[0]]) + len(adjacency[e[1]])))
+    for i, j in edges:
+        if (i, j) in covered:
+            continue
+        clique = [i, j]
+        candidates = adjacency[i] & adjacency[j]
+        while candidates:
+            # Preferir el candidato que cubre más aristas todavía no cubiertas
+            best = max(candidates, key=lambda v: sum((min(u, v), max(u, v)) not in covered for u in clique))
+            clique.append(best)
+            candidates &= adjacency[best]
+        for a in range(len(clique)):
+            for b in range(a + 1, len(clique)):
+                u, v = clique[a], clique[b]
+                covered.add((min(u, v), max(u, v)))
+        cliques.append(sorted(clique))
+
+    for event in range(1, num_events + 1):
+        if event not in adjacency:
+            cliques.append([event])
+
+    return cliques
+
+
+def build_optimization_model(num_events, conflicts, rooms_upper_bound, formulation="edges"):
+    """Construye el modelo de optimización en Pyomo.
+
+    formulation="edges" genera el MIP original (una fila por arista y sala más
+    x <= y); formulation="cliques" usa una fila por clique maximal y sala.
+    """
+    # Pyomo tarda casi medio segundo en importarse y solo lo usa este modelo
+    from pyomo.environ import Binary, ConcreteModel, Constraint, Objective, RangeSet, Set, Var, minimize
 
-
-def build_optimization_model(num_events, conflicts, rooms_upper_bound):
-    """Construye el modelo de optimización en Pyomo."""
     model = ConcreteModel()
 
     # Conjunto de eventos
@@ -67,17 +96,30 @@ def build_optimization_model(num_events, conflicts, rooms_upper_bound):
         return sum(model.x[i, r] for r in model.rooms) == 1
     model.one_room_per_event = Constraint(model.events, rule=one_room_per_event_rule)
 
-    # Restricción: eventos en conflicto no pueden compartir la misma sala
-    def no_conflicts_rule(model, i, j, r):
-        if (i, j) in model.conflicts or (j, i) in model.conflicts:
+    if formulation == "edges":
+        # Restricción: eventos en conflicto no pueden compartir la misma sala.
+        # Se indexa directamente sobre la lista de aristas, no sobre eventos x eventos.
+        def no_conflicts_rule(model, i, j, r):
             return model.x[i, r] + model.x[j, r] <= 1
-        return Constraint.Skip
-    model.no_conflicts = Constraint(model.events, model.events, model.rooms, rule=no_conflicts_rule)
+        model.no_conflicts = Constraint(model.conflicts, model.rooms, rule=no_conflicts_rule)
+
+        # Relación entre uso de salas y asignación de eventos
+        def room_usage_rule(model, i, r):
+            return model.x[i, r] <= model.y[r]
+        model.room_usage = Constraint(model.events, model.rooms, rule=room_usage_rule)
+
+    elif formulation == "cliques":
+        # Una fila por clique maximal y sala: sum(x[i, r] for i in C) <= y[r].
+        # Sustituye tanto a las restricciones de conflicto por pares como a x <= y.
+        cliques = greedy_clique_cover(num_events, conflicts)
+        model.cliques = RangeSet(0, len(cliques) - 1)
 
-    # Relación entre uso de salas y asignación de eventos
-    def room_usage_rule(model, i, r):
-        return model.x[i, r] <= model.y[r]
-    model.room_usage = Constraint(model.events, model.rooms, rule=room_usage_rule)
+        def clique_rule(model, c, r):
+            return sum(model.x[i, r] for i in cliques[c]) <= model.y[r]
+        model.clique_usage = Constraint(model.cliques, model.rooms, rule=clique_rule)
+
+    else:
+        raise ValueError(f"Formulación desconocida: {formulation}")
 
     # Función objetivo: minimizar el número de salas usadas
     def objective_rule(model):
@@ -87,20 +129,209 @@ def build_optimization_model(num_events, conflicts, rooms_upper_bound):
     return model
 
 
+def _assemble_lp(num_cols, col_cost, col_lower, rows, cols, vals, row_lower, row_upper):
+    """Convierte tripletas (fila, columna, valor) en un HighsLp binario en formato CSC."""
+    rows, cols, vals = np.concatenate(rows), np.concatenate(cols), np.concatenate(vals)
+    order = np.argsort(cols, kind="stable")
+
+    lp = HighsLp()
+    lp.num_col_ = num_cols
+    lp.row_lower_ = np.concatenate(row_lower)
+    lp.row_upper_ = np.concatenate(row_upper)
+    lp.num_row_ = len(lp.row_lower_)
+    lp.col_cost_ = col_cost
+    lp.col_lower_ = col_lower
+    lp.col_upper_ = np.ones(num_cols)
+    lp.integrality_ = [HighsVarType.kInteger] * num_cols
+    lp.a_matrix_.format_ = MatrixFormat.kColwise
+    lp.a_matrix_.num_col_ = num_cols
+    lp.a_matrix_.num_row_ = lp.num_row_
+    lp.a_matrix_.start_ = np.concatenate([[0], np.cumsum(np.bincount(cols, minlength=num_cols))])
+    lp.a_matrix_.index_ = rows[order]
+    lp.a_matrix_.value_ = vals[order]
+    return lp
+
+
+def build_highs_model(num_events, conflicts, rooms_upper_bound, formulation="edges",
+                      symmetry_breaking=False, fixed_clique=None):
+    """Construye el mismo MIP que build_optimization_model directamente en arrays CSC.
+
+    Columnas: x[i, r] en (i - 1) * rooms_upper_bound + (r - 1) y, a continuación,
+    y[r]. Devuelve el HighsLp listo para passModel y los nombres de las columnas.
+
+    symmetry_breaking añade y[r] >= y[r + 1]; fixed_clique (lista de eventos
+    mutuamente en conflicto) fija clique[k] en la sala k + 1.
+    """
+    n, k = num_events, rooms_upper_bound
+    rooms = np.arange(k)
+    y_col = n * k + rooms
+
+    def x_col(events):
+        # events: array de eventos (base 1) -> matriz (len(events), k) de columnas
+        return (np.asarray(events, dtype=np.int64)[:, None] - 1) * k + rooms
+
+    rows, cols, vals = [], [], []
+    row_lower, row_upper = [], []
+    num_rows = 0
+
+    def add_rows(row_cols, row_vals, lower, upper):
+        # row_cols/row_vals: (num_rows_nuevas, nnz_por_fila)
+        nonlocal num_rows
+        count = row_cols.shape[0]
+        rows.append(np.repeat(np.arange(num_rows, num_rows + count), row_cols.shape[1]))
+        cols.append(row_cols.ravel())
+        vals.append(row_vals.ravel())
+        row_lower.append(np.full(count, lower))
+        row_upper.append(np.full(count, upper))
+        num_rows += count
+
+    # Cada evento en exactamente una sala
+    one_room = x_col(np.arange(1, n + 1))
+    add_rows(one_room, np.ones_like(one_room, dtype=float), 1.0, 1.0)
+
+    if formulation == "edges":
+        edges = np.unique(np.sort(np.asarray(conflicts, dtype=np.int64).reshape(-1, 2), axis=1), axis=0)
+        # x[i, r] + x[j, r] <= 1 para cada arista y sala
+        pair = np.stack([x_col(edges[:, 0]), x_col(edges[:, 1])], axis=2).reshape(-1, 2)
+        add_rows(pair, np.ones(pair.shape), -np.inf, 1.0)
+        # x[i, r] - y[r] <= 0
+        usage = np.stack([one_room, np.broadcast_to(y_col, one_room.shape)], axis=2).reshape(-1, 2)
+        add_rows(usage, np.tile([1.0, -1.0], (usage.shape[0], 1)), -np.inf, 0.0)
+
+    elif formulation == "cliques":
+        # Agrupar los cliques por tamaño para construir cada bloque de filas de una vez
+        by_size = defaultdict(list)
+        for clique in greedy_clique_cover(num_events, conflicts):
+            by_size[len(clique)].append(clique)
+        for size, cliques in by_size.items():
+            members = x_col(np.asarray(cliques).ravel()).reshape(len(cliques), size, k)
+            members = members.transpose(0, 2, 1).reshape(-1, size)
+            y_cols = np.tile(y_col, len(cliques))[:, None]
+            row_cols = np.hstack([members, y_cols])
+            row_vals = np.hstack([np.ones(members.shape), -np.ones(y_cols.shape)])
+            add_rows(row_cols, row_vals, -np.inf, 0.0)
+
+    else:
+        raise ValueError(f"Formulación desconocida: {formulation}")
+
+    if symmetry_breaking and k > 1:
+        # y[r] - y[r + 1] >= 0: las salas se usan en orden
+        order_cols = np.stack([y_col[:-1], y_col[1:]], axis=1)
+        add_rows(order_cols, np.tile([1.0, -1.0], (k - 1, 1)), 0.0, np.inf)
+
+    num_cols = n * k + k
+    col_lower = np.zeros(num_cols)
+    if fixed_clique is not None:
+        if len(fixed_clique) > k:
+            raise ValueError("El clique fijado no cabe en rooms_upper_bound salas")
+        for room, event in enumerate(fixed_clique):
+            col_lower[(event - 1) * k + room] = 1.0
+
+    lp = _assemble_lp(num_cols, np.concatenate([np.zeros(n * k), np.ones(k)]), col_lower,
+                      rows, cols, vals, row_lower, row_upper)
+
+    col_names = [f"x[{i},{r}]" for i in range(1, n + 1) for r in range(1, k + 1)]
+    col_names += [f"y[{r}]" for r in range(1, k + 1)]
+    return lp, col_names
+
+
+def build_representatives_model(num_events, conflicts):
+    """Formulación por representantes: z[u, v] = 1 si el evento u representa a v.
+
+    Cada sala queda representada por su evento de menor índice, lo que elimina
+    la simetría entre salas sin necesitar una cota superior de salas.
+    """
+    adjacency = build_adjacency(num_events, conflicts)
+    pairs, anti_edges = representatives_structure(num_events, adjacency)
+    col_of = {pair: col for col, pair in enumerate(pairs)}
+    num_cols = len(pairs)
+
+    rows, cols, vals = [], [], []
+    row_lower, row_upper = [], []
+
+    # Cada evento tiene exactamente un representante
+    pair_array = np.asarray(pairs, dtype=np.int64)
+    rows.append(pair_array[:, 1] - 1)
+    cols.append(np.arange(num_cols))
+    vals.append(np.ones(num_cols))
+    row_lower.append(np.ones(num_events))
+    row_upper.append(np.ones(num_events))
+    num_rows = num_events
+
+    # z[u, v] - z[u, u] <= 0
+    others = [(col_of[u, v], col_of[u, u]) for u, v in pairs if u != v]
+    if others:
+        block = np.asarray(others, dtype=np.int64)
+        rows.append(np.repeat(np.arange(num_rows, num_rows + len(block)), 2))
+        cols.append(block.ravel())
+        vals.append(np.tile([1.0, -1.0], len(block)))
+        row_lower.append(np.full(len(block), -np.inf))
+        row_upper.append(np.zeros(len(block)))
+        num_rows += len(block)
+
+    # z[u, v] + z[u, w] - z[u, u] <= 0 si v y w están en conflicto
+    if anti_edges:
+        block = np.asarray([(col_of[u, v], col_of[u, w], col_of[u, u]) for u, v, w in anti_edges],
+                           dtype=np.int64)
+        rows.append(np.repeat(np.arange(num_rows, num_rows + len(block)), 3))
+        cols.append(block.ravel())
+        vals.append(np.tile([1.0, 1.0, -1.0], len(block)))
+        row_lower.append(np.full(len(block), -np.inf))
+        row_upper.append(np.zeros(len(block)))
+
+    col_cost = (pair_array[:, 0] == pair_array[:, 1]).astype(float)
+    lp = _assemble_lp(num_cols, col_cost, np.zeros(num_cols), rows, cols, vals, row_lower, row_upper)
+    col_names = [f"z[{u},{v}]" for u, v in pairs]
+    return lp, col_names
+
+
+def coloring_to_col_values(col_names, rooms):
+    """Traduce una asignación {evento: sala} al vector de columnas de cualquiera de los modelos."""
+    index = {name: col for col, name in enumerate(col_names)}
+    values = np.zeros(len(col_names))
+    if col_names and col_names[0].startswith("z["):
+        for representative, event in representatives_from_rooms(rooms):
+            values[index[f"z[{representative},{event}]"]] = 1.0
+    else:
+        for event, room in rooms.items():
+            values[index[f"x[{event},{room}]"]] = 1.0
+            values[index[f"y[{room}]"]] = 1.0
+    return values
+
+
 def export_model_to_mps(model, mps_path):
     """Exporta el modelo Pyomo a formato MPS."""
     model.write(mps_path, format="mps")
 
 
-def solve_with_highspy(mps_path):
-    """Resuelve el modelo exportado en MPS utilizando HighsPy."""
+def solve_with_highspy(model, time_limit=None, output=True, col_names=None, dump_mps=None,
+                       start=None):
+    """Resuelve el modelo utilizando HighsPy.
+
+    model puede ser la ruta de un archivo MPS o un HighsLp construido con
+    build_highs_model, que se pasa en memoria. dump_mps escribe además el
+    modelo cargado a disco (solo para depuración). start es un vector de
+    valores de columna (p. ej. de coloring_to_col_values) usado como MIP start.
+    """
     highs = Highs()
-    highs.readModel(mps_path)
+    highs.setOptionValue("output_flag", output)
+    if time_limit is not None:
+        highs.setOptionValue("time_limit", float(time_limit))
+    if isinstance(model, str):
+        highs.readModel(model)
+    else:
+        highs.passModel(model)
+    if dump_mps is not None:
+        for col, name in enumerate(col_names or []):
+            highs.passColName(col, name)
+        highs.writeModel(dump_mps)
+    if start is not None:
+        highs.setSolution(len(start), np.arange(len(start), dtype=np.int32), np.asarray(start, dtype=float))
     highs.run()
     return highs
 
 
-def print_results_highspy(highs):
+def print_results_highspy(highs, col_names=None):
     """Imprime los resultados obtenidos con HighsPy."""
     solution = highs.getSolution()
     print("\nResultados obtenidos con HighsPy:")
@@ -110,7 +341,8 @@ def print_results_highspy(highs):
     # Extraer variables
     print("\nVariables:")
     for i, value in enumerate(solution.col_value):
-        print(f"x[{i}] = {value:.2f}")
+        name = col_names[i] if col_names is not None else f"x[{i}]"
+        print(f"{name} = {value:.2f}")
 
 
 # ---------------------- FLUJO PRINCIPAL ----------------------
@@ -118,22 +350,27 @@ def print_results_highspy(highs):
 if __name__ == "__main__":
     # Ruta al archivo de instancia
     file_path = "day1/instance.txt"
-    mps_path = "model.mps"
+    # Volcado MPS opcional para depuración (None = resolver solo en memoria)
+    mps_path = None
 
     # 1. Cargar datos
     num_events, conflicts, graph = load_instance(file_path)
 
-    rooms_upper_bound = greedy_coloring(graph, num_events)
-
-    # 2. Construir modelo de optimización en Pyomo
-    model = build_optimization_model(num_events, conflicts, rooms_upper_bound)
+    # 2. Cotas de coloración: clique greedy (inferior) y DSATUR + TabuCol (superior)
+    lower_bound, rooms_upper_bound, colors, clique = color_bounds(num_events, conflicts)
+    print(f"Cotas de salas: {lower_bound} <= óptimo <= {rooms_upper_bound}")
 
-    # 3. Exportar el modelo a MPS
-    export_model_to_mps(model, mps_path)
-    print(f"Modelo exportado a {mps_path}")
+    if lower_bound == rooms_upper_bound:
+        # La coloración ya es óptima: no hace falta el MIP
+        print("La coloración heurística es óptima:", colors)
+    else:
+        # 3. Construir el modelo directamente como matriz CSC
+        lp, col_names = build_highs_model(num_events, conflicts, rooms_upper_bound)
 
-    # 4. Resolver el modelo utilizando HighsPy
-    highs = solve_with_highspy(mps_path)
+        # 4. Resolver el modelo en memoria utilizando HighsPy
+        highs = solve_with_highspy(lp, col_names=col_names, dump_mps=mps_path)
+        if mps_path is not None:
+            print(f"Modelo exportado a {mps_path}")
 
-    # 5. Imprimir resultados de HighsPy
-    print_results_highspy(highs)
+        # 5. Imprimir resultados de HighsPy
+        print_results_highspy(highs, col_names)
@@ -1,65 +1,172 @@
-from ortools.sat.python import cp_model
+import argparse
+import contextlib
+import json
+import sys
+import threading
+import time
 from collections import defaultdict
 
+import numpy as np
+from ortools.sat.python import cp_model
+
+from common import solutions
+from common.instances import load_edges
+from day1.coloring import color_bounds
+from day1.symmetry import align_coloring, build_adjacency, representatives_from_rooms, representatives_structure
+
 # ---------------------- FUNCIONES ----------------------
 
 
 def load_instance(file_path):
     """Carga la instancia desde un archivo y construye el grafo."""
-    with open(file_path, "r") as file:
-        lines = file.readlines()
-
-    # Parsear número de eventos y conflictos
-    num_events, num_conflicts = map(int, lines[0].strip().split())
+    # Lectura vectorizada (mmap) de la cabecera y de las líneas "e x y", a través de la caché de instancias
+    num_events, edges = load_edges(file_path)
+    conflicts = list(map(tuple, edges.tolist()))
 
     # Construir grafo como lista de adyacencia
     graph = defaultdict(list)
-    conflicts = []
-    for line in lines[1:]:
-        if line.startswith("e"):  # Procesar solo líneas con conflictos
-            _, x, y = line.strip().split()
-            x, y = int(x), int(y)
-            graph[x].append(y)
-            graph[y].append(x)
-            conflicts.append((x, y))
+    for x, y in conflicts:
+        graph[x].append(y)
+        graph[y].append(x)
 
     return num_events, conflicts, graph
 
 
-def greedy_coloring(graph, num_events):
-    """Realiza una heurística de coloración greedy."""
-    colors = {}
-    for node in range(1, num_events + 1):
-        # Obtener colores usados por los vecinos
-        neighbor_colors = {colors[neighbor] for neighbor in graph[node] if neighbor in colors}
-        # Asignar el primer color disponible
-        for color in range(num_events):  # Máximo num_events colores posibles
-            if color not in neighbor_colors:
-                colors[node] = color
-                break
-
-    return max(colors.values()) + 1
-
-
 # ---------------------- FLUJO PRINCIPAL ----------------------
 
-class MySolverCallback(cp_model.CpSolverSolutionCallback):
-    """Clase que maneja el callback para mostrar soluciones intermedias."""
+class TelemetryCallback(cp_model.CpSolverSolutionCallback):
+    """Escribe la telemetría de la búsqueda como líneas JSON.
+
+    Cada registro tiene event ("solution" o "bound"), time (segundos de reloj
+    desde el inicio), objective, bound y gap relativo. stream es un archivo
+    abierto o None (solo se guarda el último registro). Los workers de CP-SAT
+    llaman desde varios hilos, así que la escritura va con un lock.
+    """
 
-    def __init__(self, num_events, rooms_upper_bound,  x, y):
+    def __init__(self, stream=None):
         super().__init__()
-        self.num_events = num_events
-        self.rooms_upper_bound = rooms_upper_bound
-        self.x = x
-        self.y = y
+        self.stream = stream
+        self.start = time.perf_counter()
+        self.objective = None
+        self.bound = None
+        self.last = None
+        self._lock = threading.Lock()
+
+    def record(self, event, objective, bound):
+        with self._lock:
+            self.objective, self.bound = objective, bound
+            gap = None
+            if objective is not None and bound is not None:
+                gap = abs(objective - bound) / max(1.0, abs(objective))
+            self.last = {"event": event, "time": round(time.perf_counter() - self.start, 6),
+                         "objective": objective, "bound": bound, "gap": gap}
+            if self.stream is not None:
+                self.stream.write(json.dumps(self.last) + "\n")
+                self.stream.flush()
 
     def on_solution_callback(self):
-        """Se ejecuta cuando se encuentra una solución."""
-        print("\nSolución encontrada:")
-        print("Número de salas utilizadas:", self.ObjectiveValue(), self.BestObjectiveBound())
+        """Se ejecuta cuando se encuentra una solución mejor."""
+        self.record("solution", self.ObjectiveValue(), self.BestObjectiveBound())
+
+    def on_bound(self, bound):
+        """Se registra en solver.best_bound_callback: la cota mejora sin nueva solución."""
+        self.record("bound", self.objective, bound)
+
+
+def solve_with_ortools(num_events, conflicts, rooms_upper_bound, symmetry_breaking=False,
+                       fixed_clique=None, hint=None, time_limit=None):
+    """Resuelve la asignación de salas con CP-SAT.
+
+    symmetry_breaking añade y[r] >= y[r + 1]; fixed_clique fija clique[k] en la
+    sala k + 1; hint ({evento: sala}) se pasa al solver con AddHint.
+    """
+    model, x, y = build_ortools_model(num_events, conflicts, rooms_upper_bound, symmetry_breaking,
+                                      fixed_clique, hint)
+    return _solve(model, time_limit)
+
+
+def solve_rooms_with_ortools(num_events, conflicts, rooms_upper_bound, time_limit=None, num_workers=None,
+                             hint=None, fixed_clique=None, symmetry_breaking=True, telemetry=None):
+    """Modo producción: CP-SAT con varios workers; devuelve el resultado como datos.
+
+    num_workers None deja que CP-SAT elija (un worker por núcleo). telemetry
+    es la ruta de un archivo JSONL (se añade al final) o un archivo abierto
+    donde TelemetryCallback escribe cada solución y cada mejora de la cota.
+    Devuelve un dict con status, rooms ({evento: sala} o None si no hay
+    solución), objective, bound, gap y wall_time.
+    """
+    model, x, y = build_ortools_model(num_events, conflicts, rooms_upper_bound, symmetry_breaking,
+                                      fixed_clique, hint)
+    with contextlib.ExitStack() as stack:
+        if isinstance(telemetry, str):
+            telemetry = stack.enter_context(open(telemetry, "a"))
+        solver, status = _solve(model, time_limit, num_workers, TelemetryCallback(telemetry))
+
+    found = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    objective = solver.objective_value if found else None
+    bound = solver.best_objective_bound
+    return {"status": solver.status_name(status), "rooms": rooms_from_solver(solver, x) if found else None,
+            "objective": objective, "bound": bound,
+            "gap": abs(objective - bound) / max(1.0, abs(objective)) if found else None,
+            "wall_time": solver.wall_time}
+
+
+def solve_rooms_cached(num_events, conflicts, time_limit=None, num_workers=None, cache=None):
+    """solve_rooms_with_ortools a través de la caché de soluciones (common/solutions.py).
+
+    La clave es el hash de las aristas canónicas (i < j, ordenadas y sin
+    repetir), así que el mismo grafo con otro orden de líneas da un acierto,
+    que se vuelve a verificar (ningún conflicto comparte sala) antes de
+    devolverlo. Con el mismo número de eventos y otras aristas (casi
+    acierto), la asignación guardada, si sigue siendo válida, pasa a ser la
+    cota superior y el hint de CP-SAT. Devuelve el dict de
+    solve_rooms_with_ortools con la clave "cache" ("hit", "near" o "miss").
+    """
+    cache = cache or solutions.default()
+    edges = np.sort(np.asarray(conflicts, dtype=np.int64).reshape(-1, 2), axis=1)
+    edges = np.unique(edges[edges[:, 0] != edges[:, 1]], axis=0)
+    key, structure = solutions.fingerprint("day1", num_events, edges), solutions.fingerprint("day1", num_events)
+
+    kind, entry = cache.lookup("day1", key, structure) if cache is not None else ("miss", None)
+    stored = None
+    if entry is not None:
+        rooms = entry["solution"]["rooms"]
+        if len(rooms) == num_events and not np.any(rooms[edges[:, 0] - 1] == rooms[edges[:, 1] - 1]):
+            stored = {event: int(room) for event, room in enumerate(rooms.tolist(), start=1)}
+        if kind == "hit" and stored is not None and len(set(stored.values())) == entry["objective"]:
+            cache.count("hit")
+            objective = float(entry["objective"])
+            return {"status": "OPTIMAL", "rooms": stored, "objective": objective, "bound": objective, "gap": 0.0,
+                    "wall_time": 0.0, "cache": "hit"}
+        kind = "near" if stored is not None else "miss"
+        cache.count(kind)
+
+    lower_bound, rooms_upper_bound, colors, clique = color_bounds(num_events, conflicts)
+    if stored is not None and len(set(stored.values())) < rooms_upper_bound:
+        colors, rooms_upper_bound = stored, len(set(stored.values()))
+    if lower_bound == rooms_upper_bound:
+        rooms = align_coloring(colors, clique)
+        result = {"status": "OPTIMAL", "rooms": rooms, "objective": float(rooms_upper_bound),
+                  "bound": float(lower_bound), "gap": 0.0, "wall_time": 0.0}
+    else:
+        result = solve_rooms_with_ortools(num_events, conflicts, rooms_upper_bound, time_limit, num_workers,
+                                          hint=align_coloring(colors, clique), fixed_clique=clique)
+    result["cache"] = kind
+    if cache is not None and result["rooms"] is not None:
+        rooms = np.array([result["rooms"][event] for event in range(1, num_events + 1)], dtype=np.int64)
+        cache.store("day1", key, structure, len(set(result["rooms"].values())), result["status"] == "OPTIMAL",
+                    {"rooms": rooms})
+    return result
 
 
-def solve_with_ortools(num_events, conflicts, rooms_upper_bound):
+def rooms_from_solver(solver, x):
+    """{evento: sala} de la solución de CP-SAT, con x[i, r] de build_ortools_model."""
+    return {i: r for (i, r), var in x.items() if solver.BooleanValue(var)}
+
+
+def build_ortools_model(num_events, conflicts, rooms_upper_bound, symmetry_breaking=False,
+                        fixed_clique=None, hint=None):
+    """Construye el modelo CP-SAT de solve_with_ortools; devuelve (model, x, y)."""
     model = cp_model.CpModel()
 
     # Variables de decisión: x[i, r] = 1 si el evento i está en la sala r
@@ -88,31 +195,115 @@ def solve_with_ortools(num_events, conflicts, rooms_upper_bound):
             model.Add(x[i, r] <= y[r])
     model.Add(sum(y[r] for r in range(1, rooms_upper_bound + 1)) >= 1)
 
+    # Ruptura de simetría: las salas se usan en orden
+    if symmetry_breaking:
+        for r in range(1, rooms_upper_bound):
+            model.Add(y[r] >= y[r + 1])
+
+    # Ruptura de simetría: los eventos de un clique van a salas fijas
+    if fixed_clique is not None:
+        for room, event in enumerate(fixed_clique, start=1):
+            model.Add(x[event, room] == 1)
+
+    if hint is not None:
+        used_rooms = set(hint.values())
+        for (i, r), var in x.items():
+            model.AddHint(var, hint[i] == r)
+        for r, var in y.items():
+            model.AddHint(var, r in used_rooms)
+
     # Función objetivo: minimizar el número de salas usadas
     model.Minimize(sum(y[r] for r in range(1, rooms_upper_bound + 1)))
 
-    # Crear el callback
-    callback = MySolverCallback(num_events, rooms_upper_bound,  x, y)
+    return model, x, y
+
+
+def solve_representatives_with_ortools(num_events, conflicts, hint=None, time_limit=None):
+    """Resuelve la formulación por representantes con CP-SAT.
+
+    z[u, v] = 1 si el evento u (el de menor índice de su sala) representa a v.
+    """
+    model = cp_model.CpModel()
+    adjacency = build_adjacency(num_events, conflicts)
+    pairs, anti_edges = representatives_structure(num_events, adjacency)
+
+    z = {(u, v): model.NewBoolVar(f'z_{u}_{v}') for u, v in pairs}
+
+    # Cada evento tiene exactamente un representante
+    represented_by = defaultdict(list)
+    for (u, v), var in z.items():
+        represented_by[v].append(var)
+    for v in range(1, num_events + 1):
+        model.AddExactlyOne(represented_by[v])
+
+    # Un evento solo representa a otros si se representa a sí mismo
+    for (u, v), var in z.items():
+        if u != v:
+            model.AddImplication(var, z[u, u])
 
-    # Resolver el modelo con el callback
+    # Dos eventos en conflicto no pueden tener el mismo representante
+    for u, v, w in anti_edges:
+        model.Add(z[u, v] + z[u, w] <= z[u, u])
+
+    if hint is not None:
+        active = set(representatives_from_rooms(hint))
+        for pair, var in z.items():
+            model.AddHint(var, pair in active)
+
+    model.Minimize(sum(z[u, u] for u in range(1, num_events + 1)))
+
+    return _solve(model, time_limit)
+
+
+def _solve(model, time_limit, num_workers=None, callback=None):
+    """Resuelve con CP-SAT; devuelve (solver, status).
+
+    Sin enumerate_all_solutions: esa opción fuerza una búsqueda secuencial y
+    desactiva el portfolio de workers y las técnicas que no conservan todas
+    las soluciones (presolve, LNS), y solo se necesita la óptima.
+    """
     solver = cp_model.CpSolver()
-    solver.parameters.enumerate_all_solutions = True
+    if time_limit is not None:
+        solver.parameters.max_time_in_seconds = time_limit
+    if num_workers is not None:
+        solver.parameters.num_workers = num_workers
+    if callback is not None:
+        solver.best_bound_callback = callback.on_bound
 
     status = solver.solve(model, callback)
-    print(solver.status_name(status))
+    return solver, status
 
 # ---------------------- FLUJO PRINCIPAL ----------------------
 
 
-if __name__ == "__main__":
-    # Ruta al archivo de instancia
-    file_path = "day1/instance.txt"
+def main():
+    parser = argparse.ArgumentParser(description="Asignación de salas de day1 con CP-SAT (modo producción).")
+    parser.add_argument("--instance", default="day1/instance.txt")
+    parser.add_argument("--time-limit", type=float, default=60.0)
+    parser.add_argument("--workers", type=int, default=None, help="workers de CP-SAT (por defecto, uno por núcleo)")
+    parser.add_argument("--telemetry", default=None, help="archivo JSONL de telemetría ('-' para stdout)")
+    args = parser.parse_args()
 
     # 1. Cargar datos
-    num_events, conflicts, graph = load_instance(file_path)
+    num_events, conflicts, graph = load_instance(args.instance)
+
+    # 2. Cotas de coloración: clique greedy (inferior) y DSATUR + TabuCol (superior)
+    lower_bound, rooms_upper_bound, colors, clique = color_bounds(num_events, conflicts)
+    print(f"Cotas de salas: {lower_bound} <= óptimo <= {rooms_upper_bound}")
+
+    if lower_bound == rooms_upper_bound:
+        # La coloración ya es óptima: no hace falta resolver el modelo
+        print("La coloración heurística es óptima:", colors)
+        return
 
-    # 2. Obtener el número máximo de salas de la heurística de coloración greedy
-    rooms_upper_bound = greedy_coloring(graph, num_events)
+    # 3. Resolver con CP-SAT, arrancando de la coloración alineada con el clique fijado
+    result = solve_rooms_with_ortools(num_events, conflicts, rooms_upper_bound, args.time_limit, args.workers,
+                                      hint=align_coloring(colors, clique), fixed_clique=clique,
+                                      telemetry=sys.stdout if args.telemetry == "-" else args.telemetry)
+    print(f"{result['status']}: {result['objective']} salas (cota {result['bound']}, "
+          f"{result['wall_time']:.1f} s)")
+    print("Asignación:", result["rooms"])
 
-    # 3. Resolver el modelo con OR-Tools y el callback para ver soluciones intermedias
-    solve_with_ortools(num_events, conflicts, rooms_upper_bound)
+
+if __name__ == "__main__":
+    main()
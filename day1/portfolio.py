@@ -0,0 +1,99 @@
+"""Portfolio de solvers para la asignación de salas de day1 (common/portfolio.py).
+
+En este proceso se calculan una coloración DSATUR (cota superior de salas) y
+un clique greedy (cota inferior). Si coinciden no hace falta nada más; si no,
+se lanzan en paralelo:
+
+- "tabucol": la mejora TabuCol de day1.coloring, por rondas, que arranca de
+  la mejor coloración del portfolio cuando otro backend encuentra una mejor;
+- "highs": el MIP de build_highs_model con ruptura de simetría, arrancado
+  con setSolution desde la mejor coloración disponible;
+- "cpsat": el mismo modelo en CP-SAT (build_ortools_model), con AddHint.
+
+La solución compartida es el color (desde 0) de cada evento, en base 0.
+"""
+import numpy as np
+from highspy import Highs
+
+from common.portfolio import run_portfolio, solve_cpsat, solve_highs
+from day1.coloring import build_csr, dsatur, greedy_clique, improve_coloring
+from day1.day1_highs import build_highs_model, coloring_to_col_values
+from day1.day1_ortools import build_ortools_model
+from day1.symmetry import align_coloring
+
+
+def _rooms(colors, clique):
+    """{evento: sala} alineado con el clique fijado y el orden de salas."""
+    return align_coloring({event: int(color) for event, color in enumerate(colors.tolist(), start=1)}, clique)
+
+
+def _compact(colors):
+    """Reetiqueta los colores como 0..k-1 (k = número de salas usadas)."""
+    return np.unique(colors, return_inverse=True)[1].astype(np.int64)
+
+
+def tabucol_backend(problem, incumbent):
+    indptr, indices = build_csr(problem["num_events"], problem["conflicts"])
+    colors = problem["colors"]
+    incumbent.offer(colors.max() + 1, colors)
+    incumbent.raise_bound(len(problem["clique"]))
+    seed = 0
+    while not incumbent.stopped():
+        # Continuar desde la mejor coloración del portfolio si es mejor que la propia
+        best = incumbent.best()
+        if best is not None and best[0] < colors.max() + 1:
+            colors = _compact(best[1].astype(np.int64))
+        candidate = improve_coloring(indptr, indices, colors, min(1.0, incumbent.remaining()),
+                                     len(problem["clique"]), seed)
+        seed += 1
+        if candidate.max() < colors.max():
+            colors = candidate
+            incumbent.offer(colors.max() + 1, colors)
+    return "stopped"
+
+
+def highs_backend(problem, incumbent):
+    n, k, clique = problem["num_events"], problem["rooms_upper_bound"], problem["clique"]
+    lp, col_names = build_highs_model(n, problem["conflicts"], k, symmetry_breaking=True, fixed_clique=clique)
+    highs = Highs()
+    highs.setOptionValue("output_flag", False)
+    highs.passModel(lp)
+    best = incumbent.best()
+    if best is not None:
+        start = coloring_to_col_values(col_names, _rooms(best[1], clique))
+        highs.setSolution(len(start), np.arange(len(start), dtype=np.int32), start)
+    return solve_highs(highs, incumbent, lambda values: values[:n * k].reshape(n, k).argmax(axis=1))
+
+
+def cpsat_backend(problem, incumbent):
+    n, k, clique = problem["num_events"], problem["rooms_upper_bound"], problem["clique"]
+    best = incumbent.best()
+    model, x, _ = build_ortools_model(n, problem["conflicts"], k, symmetry_breaking=True, fixed_clique=clique,
+                                      hint=_rooms(best[1], clique) if best is not None else None)
+    variables = [x[i, r] for i in range(1, n + 1) for r in range(1, k + 1)]
+    return solve_cpsat(model, incumbent, variables, lambda values: values.reshape(n, k).argmax(axis=1))
+
+
+BACKENDS = {"tabucol": tabucol_backend, "highs": highs_backend, "cpsat": cpsat_backend}
+
+
+def solve_rooms_portfolio(num_events, conflicts, time_limit=60.0, backends=None, log_path=None):
+    """Asigna salas con el portfolio; devuelve ({evento: sala}, PortfolioResult o None).
+
+    El resultado es None cuando DSATUR y el clique ya prueban la optimalidad.
+    Si ningún backend encuentra una coloración antes del límite de tiempo
+    (p. ej. sin "tabucol", que ofrece la de DSATUR al arrancar), se devuelve
+    la coloración DSATUR.
+    """
+    indptr, indices = build_csr(num_events, conflicts)
+    colors = dsatur(indptr, indices)
+    clique = [v + 1 for v in greedy_clique(indptr, indices)]
+    if len(clique) == colors.max() + 1:
+        return _rooms(colors, clique), None
+
+    problem = {"num_events": num_events, "conflicts": conflicts, "rooms_upper_bound": int(colors.max()) + 1,
+               "clique": clique, "colors": colors}
+    result = run_portfolio(problem, {name: BACKENDS[name] for name in backends or BACKENDS}, time_limit,
+                           size=num_events, problem_type="day1-coloring", log_path=log_path)
+    solution = colors if result.solution is None else result.solution.astype(np.int64)
+    return _rooms(solution, clique), result
@@ -0,0 +1,69 @@
+"""Ruptura de simetría y arranque en caliente para los modelos de salas de day1.
+
+Las salas son intercambiables, así que cualquier permutación de una solución
+es otra solución con el mismo valor. Estas funciones construyen los datos que
+usan day1_highs y day1_ortools para eliminar esas permutaciones:
+
+- ordenar el uso de salas (y[r] >= y[r + 1]),
+- fijar los eventos de un clique grande a salas concretas,
+- la formulación por representantes (cada sala la "representa" su evento de
+  menor índice),
+- una coloración (de day1.coloring) alineada con lo anterior para usarla
+  como solución inicial (AddHint en CP-SAT, setSolution en HiGHS).
+"""
+from collections import defaultdict
+
+
+def build_adjacency(num_events, conflicts):
+    """Devuelve la lista de adyacencia como conjuntos, indexada por evento (base 1)."""
+    adjacency = {event: set() for event in range(1, num_events + 1)}
+    for i, j in conflicts:
+        if i != j:
+            adjacency[i].add(j)
+            adjacency[j].add(i)
+    return adjacency
+
+
+def align_coloring(colors, clique=()):
+    """Reetiqueta una coloración para que sea compatible con la ruptura de simetría.
+
+    El evento clique[k] queda en la sala k + 1 y el resto de colores ocupan las
+    salas siguientes sin huecos, de modo que se cumple y[r] >= y[r + 1].
+    Devuelve {evento: sala} con salas desde 1.
+    """
+    relabel = {}
+    for event in clique:
+        relabel.setdefault(colors[event], len(relabel) + 1)
+    for event in sorted(colors):
+        relabel.setdefault(colors[event], len(relabel) + 1)
+    return {event: relabel[color] for event, color in colors.items()}
+
+
+def representatives_structure(num_events, adjacency):
+    """Índices de la formulación por representantes (Campêlo, Campos y Corrêa).
+
+    Devuelve:
+    - pairs: pares (u, v) con u <= v no adyacentes; z[u, v] = 1 si u representa a v.
+    - anti_edges: ternas (u, v, w) con v, w > u no adyacentes a u pero adyacentes
+      entre sí, que generan z[u, v] + z[u, w] <= z[u, u].
+    """
+    pairs = []
+    anti_edges = []
+    for u in range(1, num_events + 1):
+        anti = [v for v in range(u + 1, num_events + 1) if v not in adjacency[u]]
+        pairs.append((u, u))
+        pairs.extend((u, v) for v in anti)
+        anti_set = set(anti)
+        for v in anti:
+            for w in adjacency[v]:
+                if w > v and w in anti_set:
+                    anti_edges.append((u, v, w))
+    return pairs, anti_edges
+
+
+def representatives_from_rooms(rooms):
+    """Convierte {evento: sala} en los pares (representante, evento) activos."""
+    classes = defaultdict(list)
+    for event, room in rooms.items():
+        classes[room].append(event)
+    return [(min(events), event) for events in classes.values() for event in events]
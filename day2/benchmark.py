@@ -0,0 +1,126 @@
+"""Benchmark of the day2 RCSP solver against the MIP.
+
+Runs both on day2/instance.txt and the RCSP solver alone on generated
+graphs with 10k+ cities (the MIP only when --mip-max-cities allows it),
+then compares ways of answering a sweep of budgets.
+
+Usage (from the repository root):
+    python -m day2.benchmark --sizes 10000 20000 --degree 8
+"""
+import argparse
+import random
+import time
+
+from day2.day2_mathopt import parse_input, solve_with_mip, sweep_budgets_mip
+from day2.rcsp import build_graph, dijkstra, pareto_frontier, solve_budgets, solve_rcsp
+
+
+def generate_instance(num_cities, degree=8, window=None, seed=0):
+    """Layered random graph where short connections burn more fuel.
+
+    Every city links forward to `degree` cities within `window` positions
+    (num_cities // 20 by default, so paths have a few dozen hops), so city 1
+    always reaches city num_cities. The budget sits halfway between the
+    cheapest-fuel path and the fuel used by the unconstrained shortest path.
+    """
+    rng = random.Random(seed)
+    window = window or max(50, num_cities // 20)
+    connections = []
+    for city in range(1, num_cities):
+        heads = {rng.randint(city + 1, min(num_cities, city + window)) for _ in range(degree)}
+        for head in sorted(heads):
+            distance = rng.randint(1, 100)
+            fuel = max(1, 101 - distance + rng.randint(-10, 10))
+            connections.append((city, head, distance, fuel))
+
+    graph = build_graph(num_cities, connections)
+    min_fuel, _ = dijkstra(graph.indptr, graph.heads, graph.fuel, 1)
+    _, distance, fuel = solve_rcsp(graph, budget=10 ** 12)
+    budget = (min_fuel[num_cities] + fuel) // 2
+    return num_cities, len(connections), budget, connections
+
+
+def run_case(name, num_cities, budget, connections, run_mip):
+    start = time.perf_counter()
+    graph = build_graph(num_cities, connections)
+    build_time = time.perf_counter() - start
+
+    results = {}
+    for label, use_lagrangian in (("rcsp", False), ("rcsp+lagr", True)):
+        start = time.perf_counter()
+        results[label] = (solve_rcsp(graph, budget, use_lagrangian=use_lagrangian), time.perf_counter() - start)
+    if run_mip:
+        start = time.perf_counter()
+        results["mip"] = (solve_with_mip(num_cities, budget, connections, enable_output=False),
+                          time.perf_counter() - start)
+
+    for label, (solution, elapsed) in results.items():
+        distance, fuel = (solution[1], solution[2]) if solution else (None, None)
+        print(f"{name:>14} {label:>10} {num_cities:>8} {len(connections):>9} {budget:>8} "
+              f"{build_time:>9.3f} {elapsed:>9.3f} {str(distance):>9} {str(fuel):>8}")
+    if len({solution[1] for solution, _ in results.values() if solution}) > 1:
+        print(f"{name:>14} WARNING: solvers disagree on the optimal distance")
+
+
+def run_sweep(name, num_cities, budget, connections, num_budgets, run_mip):
+    """Times answering num_budgets budgets: one by one vs. one frontier vs. one incremental MIP."""
+    graph = build_graph(num_cities, connections)
+    budgets = [round(budget * (0.5 + i / num_budgets)) for i in range(num_budgets)]
+
+    timings = {}
+    start = time.perf_counter()
+    for value in budgets:
+        solve_rcsp(graph, value)
+    timings["rcsp x N"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    frontier = pareto_frontier(graph)
+    timings["frontier"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    solve_budgets(graph, budgets)
+    timings["solve_budgets"] = time.perf_counter() - start
+
+    if run_mip:
+        start = time.perf_counter()
+        for value in budgets:
+            solve_with_mip(num_cities, value, connections, enable_output=False)
+        timings["mip x N"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sweep_budgets_mip(num_cities, budgets, connections)
+        timings["mip sweep"] = time.perf_counter() - start
+
+    print(f"{name:>14} budgets={num_budgets} frontier points={len(frontier)} " +
+          " ".join(f"{label}={elapsed:.3f}s" for label, elapsed in timings.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instance", default="day2/instance.txt")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10000, 20000])
+    parser.add_argument("--degree", type=int, default=8)
+    parser.add_argument("--mip-max-cities", type=int, default=10000)
+    parser.add_argument("--sweep-budgets", type=int, default=20,
+                        help="number of budgets for the budget-sweep comparison")
+    args = parser.parse_args()
+
+    num_cities, _, budget, connections = parse_input(args.instance)
+    cases = [("instance", num_cities, budget, connections)]
+    for size in args.sizes:
+        num_cities, _, budget, connections = generate_instance(size, args.degree, seed=size)
+        cases.append((f"layered-{size}", num_cities, budget, connections))
+
+    print(f"{'case':>14} {'solver':>10} {'cities':>8} {'edges':>9} {'budget':>8} "
+          f"{'build[s]':>9} {'solve[s]':>9} {'distance':>9} {'fuel':>8}")
+    for name, num_cities, budget, connections in cases:
+        run_case(name, num_cities, budget, connections, run_mip=num_cities <= args.mip_max_cities)
+
+    print()
+    for name, num_cities, budget, connections in cases:
+        run_sweep(name, num_cities, budget, connections, args.sweep_budgets,
+                  run_mip=num_cities <= args.mip_max_cities // 10)
+
+
+if __name__ == "__main__":
+    main()
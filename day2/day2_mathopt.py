@@ -1,66 +1,77 @@
+from collections import defaultdict
+
+import numpy as np
 from ortools.math_opt.python import mathopt
 
+from common.cache import cached
+from day2.rcsp import build_graph, solve_rcsp
+
 
 def parse_input(file_path):
+    # El texto solo se analiza si la caché de instancias no tiene ya este contenido
+    data = cached("day2.connections", [file_path], lambda: _parse_connections(file_path))
+    num_cities, num_connections, budget = data["header"]
+    connections = list(map(tuple, data["connections"].tolist()))
+    return num_cities, num_connections, budget, connections
+
+
+def _parse_connections(file_path):
     with open(file_path, 'r') as f:
         lines = f.readlines()
 
     # Leer cantidad de ciudades, conexiones y presupuesto
     num_cities, num_connections, budget = map(int, lines[0].split())
 
-    # Leer las conexiones
-    connections = []
-    for line in lines[1:]:
-        city1, city2, distance, fuel_cost = map(int, line.split())
-        connections.append((city1, city2, distance, fuel_cost))
+    # Leer las conexiones (city1, city2, distance, fuel_cost)
+    connections = [list(map(int, line.split())) for line in lines[1:]]
 
-    return num_cities, num_connections, budget, connections
+    return {"header": [num_cities, num_connections, budget],
+            "connections": np.array(connections, dtype=np.int64).reshape(-1, 4)}
 
 
-def solve_shortest_path_with_budget(file_path):
-    num_cities, num_connections, budget, connections = parse_input(file_path)
+def build_budget_mip(num_cities, budget, connections, source=1, target=None):
+    """Construye el MIP binario del camino más corto con presupuesto.
 
+    Devuelve (model, x, budget_constraint); x sigue el orden de connections.
+    """
+    target = num_cities if target is None else target
     model = mathopt.Model(name="shortest_path_with_budget")
 
-    x = {}
-    for i, (city1, city2, _, _) in enumerate(connections):
-        x[(city1, city2)] = model.add_binary_variable(name=f"x_{city1}_{city2}")
+    x = [model.add_binary_variable(name=f"x_{city1}_{city2}") for (city1, city2, _, _) in connections]
 
-    model.add_linear_constraint(
-        sum(x[(city1, city2)] * fuel_cost for (city1, city2, _, fuel_cost) in connections) <= budget,
+    # Aristas entrantes y salientes de cada ciudad, en una sola pasada
+    incoming, outgoing = defaultdict(list), defaultdict(list)
+    for var, (city1, city2, _, _) in zip(x, connections):
+        outgoing[city1].append(var)
+        incoming[city2].append(var)
+
+    budget_constraint = model.add_linear_constraint(
+        sum(var * fuel_cost for var, (_, _, _, fuel_cost) in zip(x, connections)) <= budget,
         name="budget_constraint"
     )
 
-    model.add_linear_constraint(
-        sum(x[(city1, city2)] for (city1, city2, _, _) in connections if city1 == 1) == 1,
-        name="exit_madrid"
-    )
-    model.add_linear_constraint(
-        sum(x[(city1, city2)] for (city1, city2, _, _) in connections if city2 == 100) == 1,
-        name="enter_copenhagen"
-    )
+    model.add_linear_constraint(sum(outgoing[source]) == 1, name="exit_madrid")
+    model.add_linear_constraint(sum(incoming[target]) == 1, name="enter_copenhagen")
 
-    for city in range(2, num_cities):
+    for city in range(1, num_cities + 1):
+        if city in (source, target):
+            continue
         model.add_linear_constraint(
-            sum(x[(city1, city)] for (city1, city2, _, _) in connections if city2 == city) ==
-            sum(x[(city, city2)] for (city1, city2, _, _) in connections if city1 == city),
+            sum(incoming[city]) == sum(outgoing[city]),
             name=f"flow_balance_{city}"
         )
 
     model.minimize(
-        sum(x[(city1, city2)] * distance for (city1, city2, distance, _) in connections)
+        sum(var * distance for var, (_, _, distance, _) in zip(x, connections))
     )
+    return model, x, budget_constraint
 
-    params = mathopt.SolveParameters(enable_output=True)
-    result = mathopt.solve(model, mathopt.SolverType.HIGHS, params=params)
-
-    if result.termination.reason != mathopt.TerminationReason.OPTIMAL:
-        raise RuntimeError(f"Model failed to solve: {result.termination}")
 
+def extract_path(result, x, connections, source, target):
+    """Reconstruye (ordered_path, total_distance, total_fuel_cost) a partir de la solución del MIP."""
+    values = result.variable_values(x)
     used_connections = [
-        (city1, city2, distance, fuel_cost)
-        for (city1, city2, distance, fuel_cost), var in zip(connections, x.values())
-        if result.variable_values()[var] > 0.5
+        connection for connection, value in zip(connections, values) if value > 0.5
     ]
 
     path = {}
@@ -68,19 +79,84 @@ def solve_shortest_path_with_budget(file_path):
         path[city1] = city2
 
     ordered_path = []
-    current_city = 1
-    while current_city != 100:
+    current_city = source
+    while current_city != target:
         ordered_path.append(current_city)
         current_city = path[current_city]
-    ordered_path.append(100)
+    ordered_path.append(target)
+
+    # Solo cuentan las aristas del camino (el MIP podría añadir ciclos de coste cero)
+    on_path = set(zip(ordered_path, ordered_path[1:]))
+    total_distance = sum(distance for city1, city2, distance, _ in used_connections if (city1, city2) in on_path)
+    total_fuel_cost = sum(fuel_cost for city1, city2, _, fuel_cost in used_connections if (city1, city2) in on_path)
+
+    return ordered_path, total_distance, total_fuel_cost
+
+
+def solve_with_mip(num_cities, budget, connections, source=1, target=None, enable_output=True):
+    """Resuelve el camino más corto con presupuesto como MIP binario (validación cruzada).
+
+    Devuelve (ordered_path, total_distance, total_fuel_cost).
+    """
+    target = num_cities if target is None else target
+    model, x, _ = build_budget_mip(num_cities, budget, connections, source, target)
+
+    params = mathopt.SolveParameters(enable_output=enable_output)
+    result = mathopt.solve(model, mathopt.SolverType.HIGHS, params=params)
+
+    if result.termination.reason != mathopt.TerminationReason.OPTIMAL:
+        raise RuntimeError(f"Model failed to solve: {result.termination}")
+
+    return extract_path(result, x, connections, source, target)
+
+
+def sweep_budgets_mip(num_cities, budgets, connections, source=1, target=None, enable_output=False):
+    """Resuelve varios presupuestos reutilizando un único modelo.
+
+    Solo cambia la cota superior de budget_constraint entre resoluciones
+    (IncrementalSolver de mathopt). Devuelve {budget: solución o None}.
+    """
+    target = num_cities if target is None else target
+    budgets = list(budgets)
+    model, x, budget_constraint = build_budget_mip(num_cities, max(budgets, default=0), connections,
+                                                   source, target)
+    solver = mathopt.IncrementalSolver(model, mathopt.SolverType.HIGHS)
+    params = mathopt.SolveParameters(enable_output=enable_output)
+
+    answers = {}
+    for budget in budgets:
+        budget_constraint.upper_bound = budget
+        result = solver.solve(params=params)
+        if result.termination.reason == mathopt.TerminationReason.OPTIMAL:
+            answers[budget] = extract_path(result, x, connections, source, target)
+        elif result.termination.reason == mathopt.TerminationReason.INFEASIBLE:
+            answers[budget] = None
+        else:
+            raise RuntimeError(f"Model failed to solve: {result.termination}")
+    return answers
+
+
+def solve_shortest_path_with_budget(file_path, method="rcsp"):
+    """Resuelve la instancia con el solver RCSP (por defecto) o con el MIP ("mip")."""
+    num_cities, num_connections, budget, connections = parse_input(file_path)
+
+    if method == "rcsp":
+        solution = solve_rcsp(build_graph(num_cities, connections), budget)
+    elif method == "mip":
+        solution = solve_with_mip(num_cities, budget, connections)
+    else:
+        raise ValueError(f"Unknown method: {method}")
 
-    total_fuel_cost = sum(fuel_cost for _, _, _, fuel_cost in used_connections)
+    if solution is None:
+        raise RuntimeError("No path fits in the budget")
+    ordered_path, total_distance, total_fuel_cost = solution
 
-    print("Objective value (total distance):", result.objective_value())
+    print("Objective value (total distance):", total_distance)
     print("Total fuel cost used:", total_fuel_cost)
     print("Budget available:", budget)
     print("Ordered path:")
     print(" -> ".join(map(str, ordered_path)))
+    return solution
 
 
 # Main
@@ -0,0 +1,249 @@
+"""Resource-constrained shortest path (RCSP) solver for day2.
+
+The graph is stored as compact CSR arrays (one forward, one reverse). The
+solver runs a label-setting search on (distance, fuel) labels:
+
+- labels are expanded in order of distance + reverse-Dijkstra distance bound,
+  so the first label that reaches the target is optimal;
+- a label is dropped when a settled label at the same city has both less
+  distance and less fuel (dominance), when the cheapest remaining fuel no
+  longer fits in the budget, or when its bound cannot beat the incumbent;
+- optionally, a Lagrangian relaxation of the budget gives a stronger bound
+  and a feasible incumbent before the search starts.
+
+Without a budget the same search enumerates the whole distance/fuel Pareto
+frontier (pareto_frontier), which answers any list of budgets at once
+(solve_budgets).
+"""
+import heapq
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class BudgetGraph:
+    """Directed graph in CSR form; cities keep their 1-based ids (row 0 is unused)."""
+    num_cities: int
+    indptr: np.ndarray
+    heads: np.ndarray
+    distance: np.ndarray
+    fuel: np.ndarray
+    reverse_indptr: np.ndarray
+    reverse_tails: np.ndarray
+    reverse_distance: np.ndarray
+    reverse_fuel: np.ndarray
+
+
+def build_graph(num_cities, connections):
+    """Builds the forward and reverse CSR arrays from (city1, city2, distance, fuel) tuples."""
+    edges = np.asarray(connections, dtype=np.int64).reshape(-1, 4)
+
+    def csr(tails, heads):
+        order = np.argsort(tails, kind="stable")
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(tails, minlength=num_cities + 1))])
+        return indptr, heads[order], edges[order, 2], edges[order, 3]
+
+    indptr, heads, distance, fuel = csr(edges[:, 0], edges[:, 1])
+    reverse_indptr, reverse_tails, reverse_distance, reverse_fuel = csr(edges[:, 1], edges[:, 0])
+    return BudgetGraph(num_cities, indptr, heads, distance, fuel,
+                       reverse_indptr, reverse_tails, reverse_distance, reverse_fuel)
+
+
+def dijkstra(indptr, heads, weights, source):
+    """Single-source shortest paths; returns (dist, pred_edge) with math.inf / -1 when unreachable."""
+    indptr, heads, weights = indptr.tolist(), heads.tolist(), weights.tolist()
+    dist = [math.inf] * (len(indptr) - 1)
+    pred_edge = [-1] * (len(indptr) - 1)
+    dist[source] = 0
+    heap = [(0, source)]
+    while heap:
+        d, v = heapq.heappop(heap)
+        if d > dist[v]:
+            continue
+        for e in range(indptr[v], indptr[v + 1]):
+            w = heads[e]
+            nd = d + weights[e]
+            if nd < dist[w]:
+                dist[w] = nd
+                pred_edge[w] = e
+                heapq.heappush(heap, (nd, w))
+    return dist, pred_edge
+
+
+def lagrangian_bound(graph, budget, source, target, iterations=30):
+    """Maximises L(lam) = min_p (distance + lam * fuel) - lam * budget over lam >= 0.
+
+    L is concave and piecewise linear. Each step moves lam to the point where
+    the best feasible and the best infeasible path found so far cost the same
+    (the exact line search for a single relaxed constraint), so a few shortest
+    path runs are enough. Returns (bound, lam, incumbent), where incumbent is
+    the best budget-feasible path seen as (path, distance, fuel), or None.
+    """
+    tails = np.repeat(np.arange(graph.num_cities + 1), np.diff(graph.indptr))
+
+    def shortest(weights):
+        dist, pred_edge = dijkstra(graph.indptr, graph.heads, weights, source)
+        if math.isinf(dist[target]):
+            return None
+        path, distance, fuel = [target], 0, 0
+        while path[-1] != source:
+            e = pred_edge[path[-1]]
+            distance += int(graph.distance[e])
+            fuel += int(graph.fuel[e])
+            path.append(int(tails[e]))
+        return path[::-1], distance, fuel
+
+    shortest_path = shortest(graph.distance)
+    if shortest_path is None:
+        return math.inf, 0.0, None
+    if shortest_path[2] <= budget:
+        return shortest_path[1], 0.0, shortest_path
+
+    feasible = shortest(graph.fuel)
+    if feasible[2] > budget:
+        return math.inf, 0.0, None  # not even the cheapest-fuel path fits
+
+    infeasible = shortest_path
+    best_bound, best_lam = float(shortest_path[1]), 0.0
+    for iteration in range(iterations):
+        # Multiplier at which both paths have the same Lagrangian cost
+        lam = (feasible[1] - infeasible[1]) / (infeasible[2] - feasible[2])
+        path = shortest(graph.distance + lam * graph.fuel)
+        value = path[1] + lam * path[2]
+        if value - lam * budget > best_bound:
+            best_bound, best_lam = value - lam * budget, lam
+        if value >= feasible[1] + lam * feasible[2] - 1e-9:
+            break  # no path beats the current pair at lam: lam is optimal
+        if path[2] <= budget:
+            feasible = path
+        else:
+            infeasible = path
+        if math.ceil(best_bound - 1e-6) >= feasible[1]:
+            break  # the bound already proves the incumbent optimal
+    return best_bound, best_lam, feasible
+
+
+def _follow_reverse_tree(graph, source, target, reverse_pred_edge):
+    """Walks a reverse shortest-path tree from source to target as (path, distance, fuel)."""
+    # Reverse edge e starts at the city whose row holds it: the next city towards the target
+    rows = np.repeat(np.arange(graph.num_cities + 1), np.diff(graph.reverse_indptr))
+    path, distance, fuel = [source], 0, 0
+    while path[-1] != target:
+        e = reverse_pred_edge[path[-1]]
+        distance += int(graph.reverse_distance[e])
+        fuel += int(graph.reverse_fuel[e])
+        path.append(int(rows[e]))
+    return path, distance, fuel
+
+
+def solve_rcsp(graph, budget, source=1, target=None, use_lagrangian=False):
+    """Shortest source-target path whose total fuel does not exceed budget.
+
+    Returns (ordered_path, total_distance, total_fuel), or None if no path fits
+    in the budget.
+    """
+    target = graph.num_cities if target is None else target
+
+    # Reverse Dijkstra: lower bounds on the distance and fuel still needed
+    dist_to_target, _ = dijkstra(graph.reverse_indptr, graph.reverse_tails, graph.reverse_distance, target)
+    fuel_to_target, fuel_pred_edge = dijkstra(graph.reverse_indptr, graph.reverse_tails, graph.reverse_fuel, target)
+    if fuel_to_target[source] > budget:
+        return None
+
+    # The cheapest-fuel path is always feasible here and gives a first incumbent
+    incumbent = _follow_reverse_tree(graph, source, target, fuel_pred_edge)
+    lam, lam_to_target = 0.0, None
+    if use_lagrangian:
+        bound, lam, lagrangian_incumbent = lagrangian_bound(graph, budget, source, target)
+        if lagrangian_incumbent is not None and lagrangian_incumbent[1] < incumbent[1]:
+            incumbent = lagrangian_incumbent
+        if math.ceil(bound - 1e-6) >= incumbent[1]:
+            return incumbent
+        if lam > 0:
+            weights = graph.reverse_distance + lam * graph.reverse_fuel
+            lam_to_target, _ = dijkstra(graph.reverse_indptr, graph.reverse_tails, weights, target)
+    best_distance = incumbent[1]
+
+    def lagrangian_prune(nd, nf, w):
+        bound = nd + lam * nf + lam_to_target[w] - lam * budget
+        # Distances are integers: only a strictly shorter path can beat the incumbent
+        return math.ceil(bound - 1e-6) >= best_distance
+
+    labels = _target_labels(graph, source, target, budget, dist_to_target, fuel_to_target, best_distance,
+                            lagrangian_prune if lam_to_target is not None else None)
+    return next(labels, incumbent)
+
+
+def _target_labels(graph, source, target, budget, dist_to_target, fuel_to_target,
+                   best_distance=math.inf, prune=None):
+    """Label-setting core: yields each non-dominated target label as (path, distance, fuel).
+
+    Labels come out in increasing distance and strictly decreasing fuel, so
+    together they form the distance/fuel Pareto frontier up to `budget`.
+    """
+    indptr, heads = graph.indptr.tolist(), graph.heads.tolist()
+    distance, fuel = graph.distance.tolist(), graph.fuel.tolist()
+
+    # Labels: parallel lists of city, fuel and predecessor label (distance travels in the heap)
+    label_city, label_fuel, label_pred = [source], [0], [-1]
+    min_settled_fuel = [math.inf] * (graph.num_cities + 1)
+    heap = [(dist_to_target[source], 0, 0)]
+    while heap:
+        _, d, label = heapq.heappop(heap)
+        v, f = label_city[label], label_fuel[label]
+        if f >= min_settled_fuel[v]:
+            continue  # dominated by a settled label with less (or equal) distance
+        min_settled_fuel[v] = f
+        if v == target:
+            path = []
+            while label >= 0:
+                path.append(label_city[label])
+                label = label_pred[label]
+            yield path[::-1], d, f
+            continue
+
+        # A label that cannot end with less fuel than the last target label is dominated
+        fuel_limit = min(budget, min_settled_fuel[target] - 1)
+        for e in range(indptr[v], indptr[v + 1]):
+            w = heads[e]
+            nf = f + fuel[e]
+            if nf >= min_settled_fuel[w] or nf + fuel_to_target[w] > fuel_limit:
+                continue
+            nd = d + distance[e]
+            # Distances are integers: only a strictly shorter path can beat the incumbent
+            if nd + dist_to_target[w] >= best_distance or (prune is not None and prune(nd, nf, w)):
+                continue
+            label_city.append(w)
+            label_fuel.append(nf)
+            label_pred.append(label)
+            heapq.heappush(heap, (nd + dist_to_target[w], nd, len(label_city) - 1))
+
+
+def pareto_frontier(graph, source=1, target=None, max_budget=math.inf):
+    """Full distance-vs-fuel trade-off curve in one bi-objective label-setting pass.
+
+    Returns the non-dominated paths as a list of (path, distance, fuel), by
+    increasing distance (and so decreasing fuel), limited to fuel <= max_budget.
+    """
+    target = graph.num_cities if target is None else target
+    dist_to_target, _ = dijkstra(graph.reverse_indptr, graph.reverse_tails, graph.reverse_distance, target)
+    fuel_to_target, _ = dijkstra(graph.reverse_indptr, graph.reverse_tails, graph.reverse_fuel, target)
+    return list(_target_labels(graph, source, target, max_budget, dist_to_target, fuel_to_target))
+
+
+def solve_budgets(graph, budgets, source=1, target=None):
+    """Answers several budgets from one Pareto frontier.
+
+    Returns {budget: (ordered_path, total_distance, total_fuel) or None}.
+    """
+    budgets = list(budgets)
+    frontier = pareto_frontier(graph, source, target, max_budget=max(budgets, default=0))
+    fuels = np.array([point[2] for point in frontier])
+    answers = {}
+    for budget in budgets:
+        # The frontier is sorted by decreasing fuel: the first point that fits is the shortest
+        fits = np.flatnonzero(fuels <= budget)
+        answers[budget] = frontier[fits[0]] if len(fits) else None
+    return answers
@@ -0,0 +1,456 @@
+"""Polynomial solvers for the day3 task assignment problem.
+
+The cost matrix is an int64 NumPy array (tasks in rows, employees in
+columns). Two algorithms are provided:
+
+- solve_jv: Jonker-Volgenant shortest augmenting path. Column reduction
+  and augmenting row reduction assign most rows up front. Each remaining row
+  is then added by one Dijkstra search over reduced costs, vectorised over
+  the columns.
+- solve_auction: epsilon-scaling auction (Bertsekas) with vectorised
+  Jacobi bidding of all unassigned rows at once.
+
+IncrementalAssignment keeps a JV optimum and its potentials alive across
+cost updates, new tasks and removed employees, and repairs it with a few
+augmenting paths instead of solving again.
+
+Both solvers return an AssignmentResult with the dual potentials (u, v). They
+satisfy u[i] + v[j] <= cost[i, j] everywhere. For JV they are tight on the
+chosen cells. For the auction they are tight to within 1 / (n + 1). Either
+way the duality gap proves the integer cost optimal, and check_certificate
+verifies that.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from common import solutions
+from common.cache import cached
+
+
+@dataclass
+class AssignmentResult:
+    """Optimal assignment: row i is assigned to column col_for_row[i]."""
+    col_for_row: np.ndarray
+    cost: int
+    u: np.ndarray
+    v: np.ndarray
+
+
+def read_cost_matrix(file_path):
+    """The (n_tasks, n_tasks) int64 cost array of a day3 instance, through the instance cache (read-only)."""
+    return cached("day3.costs", [file_path], lambda: {"costs": parse_cost_matrix(file_path)})["costs"]
+
+
+def parse_cost_matrix(file_path):
+    """Parses a day3 instance straight into an (n_tasks, n_tasks) int64 array."""
+    with open(file_path, 'r') as file:
+        data = "".join(line for line in file if not line.lstrip().startswith("#"))
+
+    values = np.fromstring(data, dtype=np.int64, sep=" ")
+    n_tasks = int(values[0])
+    if len(values) - 1 != n_tasks * n_tasks:
+        raise ValueError("The file does not contain the expected number of costs.")
+    return values[1:].reshape(n_tasks, n_tasks)
+
+
+def _augment(costs, u, v, col_for_row, row_for_col, row):
+    """Adds `row` to the matching along a shortest augmenting path (one Dijkstra search).
+
+    Columns that share the current minimum distance are scanned together, one
+    vectorised (rows x columns) step per distance level. With integer costs
+    the ties are frequent. Keeps u, v dual feasible and complementary on every
+    matched cell.
+    """
+    n_cols = costs.shape[1]
+    shortest = np.full(n_cols, np.inf)
+    path = np.full(n_cols, -1, dtype=np.int64)
+    scanned = np.zeros(n_cols, dtype=bool)
+    visited_rows = [np.array([row])]
+
+    rows, min_value, sink = np.array([row]), 0.0, -1
+    while True:
+        # Relax every column from the rows reached at distance min_value
+        reduced = min_value + costs[rows] - u[rows, None] - v
+        best = reduced.argmin(axis=0)
+        reduced = reduced[best, np.arange(n_cols)]
+        improve = ~scanned & (reduced < shortest)
+        shortest[improve] = reduced[improve]
+        path[improve] = rows[best[improve]]
+
+        candidates = np.where(scanned, np.inf, shortest)
+        min_value = candidates.min()
+        if not np.isfinite(min_value):
+            raise ValueError("The cost matrix admits no complete assignment.")
+        level = np.flatnonzero(candidates == min_value)
+        free = level[row_for_col[level] < 0]
+        if len(free):
+            sink = int(free[0])
+            scanned[sink] = True
+            break
+        scanned[level] = True
+        rows = row_for_col[level]
+        visited_rows.append(rows)
+
+    # Dual update along the search tree
+    u[row] += min_value
+    others = np.concatenate(visited_rows[1:]) if len(visited_rows) > 1 else np.zeros(0, dtype=np.int64)
+    u[others] += min_value - shortest[col_for_row[others]]
+    v[scanned] -= min_value - shortest[scanned]
+
+    # Flip the augmenting path
+    j = sink
+    while True:
+        i = int(path[j])
+        row_for_col[j] = i
+        col_for_row[i], j = j, col_for_row[i]
+        if i == row:
+            break
+
+
+def _augmenting_row_reduction(costs, v, col_for_row, row_for_col, passes=2):
+    """JV augmenting row reduction: auction-like reassignment of free rows (lowers v only).
+
+    Afterwards every assigned row sits on a minimum of its reduced costs
+    costs[i] - v, which is what the augmentation phase needs.
+    """
+    n_cols = costs.shape[1]
+    for _ in range(passes):
+        free = np.flatnonzero(col_for_row < 0).tolist()
+        next_free = []
+        budget = 10 * (len(free) + 1)  # guards against long price wars on ties
+        k = 0
+        while k < len(free) and budget:
+            budget -= 1
+            i = free[k]
+            k += 1
+            reduced = costs[i] - v
+            if n_cols > 1:
+                j1, j2 = np.argpartition(reduced, 1)[:2]
+                if reduced[j2] < reduced[j1]:
+                    j1, j2 = j2, j1
+            else:
+                j1 = j2 = 0
+            u1, u2 = reduced[j1], reduced[j2]
+            i0 = row_for_col[j1]
+            if u1 < u2:
+                v[j1] -= u2 - u1
+            elif i0 >= 0:
+                j1 = j2
+                i0 = row_for_col[j2]
+            if i0 >= 0:
+                col_for_row[i0] = -1
+                if u1 < u2:
+                    k -= 1
+                    free[k] = int(i0)
+                else:
+                    next_free.append(int(i0))
+            col_for_row[i], row_for_col[j1] = j1, i
+        if not next_free:
+            break
+
+
+def solve_jv(costs, start=None):
+    """Optimal assignment by shortest augmenting paths (n_rows <= n_cols).
+
+    start is an optional AssignmentResult of a square matrix of the same
+    shape (e.g. the same instance with other costs). Its column potentials
+    are kept, the rows take their minimum reduced cost, the rows whose own
+    cell stays tight keep their column and only the others are augmented.
+    """
+    costs = np.asarray(costs, dtype=np.float64)
+    n_rows, n_cols = costs.shape
+    if n_rows > n_cols:
+        raise ValueError("More tasks than employees: no complete assignment exists.")
+    col_for_row = np.full(n_rows, -1, dtype=np.int64)
+    row_for_col = np.full(n_cols, -1, dtype=np.int64)
+    u = np.zeros(n_rows)
+    v = np.zeros(n_cols)
+
+    if start is not None and n_rows == n_cols and len(start.col_for_row) == n_rows:
+        v = np.asarray(start.v, dtype=np.float64).copy()
+        u = (costs - v).min(axis=1)
+        rows = np.arange(n_rows)
+        tight = np.abs(costs[rows, start.col_for_row] - u - v[start.col_for_row]) < 1e-9
+        col_for_row[tight] = start.col_for_row[tight]
+        row_for_col[col_for_row[tight]] = rows[tight]
+    elif n_rows == n_cols and n_rows:
+        # Column reduction: each column goes to its cheapest row if that row is still free
+        v = costs.min(axis=0)
+        for j, i in enumerate(costs.argmin(axis=0).tolist()):
+            if col_for_row[i] < 0:
+                col_for_row[i], row_for_col[j] = j, i
+        _augmenting_row_reduction(costs, v, col_for_row, row_for_col)
+
+        # Row potentials: tight on assigned cells, row minimum on free rows (both dual feasible)
+        u = (costs - v).min(axis=1)
+
+    for row in np.flatnonzero(col_for_row < 0):
+        _augment(costs, u, v, col_for_row, row_for_col, int(row))
+
+    total = int(round(costs[np.arange(n_rows), col_for_row].sum()))
+    return AssignmentResult(col_for_row, total, u, v)
+
+
+def solve_auction(costs, epsilon_factor=5.0):
+    """Optimal assignment by epsilon-scaling auction (square integer matrices).
+
+    Costs are scaled by n + 1 so that the final epsilon of 1 guarantees
+    optimality for the original integer costs.
+    """
+    costs = np.asarray(costs, dtype=np.int64)
+    n = costs.shape[0]
+    if costs.shape != (n, n):
+        raise ValueError("The auction solver needs a square cost matrix.")
+    if n == 0:
+        return AssignmentResult(np.zeros(0, dtype=np.int64), 0, np.zeros(0), np.zeros(0))
+
+    benefit = -(costs * (n + 1))
+    prices = np.zeros(n, dtype=np.int64)
+    epsilon = max(1, int(np.ptp(benefit)) // 2)
+    rows = np.arange(n)
+
+    while True:
+        col_for_row = np.full(n, -1, dtype=np.int64)
+        row_for_col = np.full(n, -1, dtype=np.int64)
+        unassigned = rows
+        while len(unassigned):
+            # Every unassigned row bids for its best column at once (Jacobi auction)
+            values = benefit[unassigned] - prices
+            best = np.argmax(values, axis=1)
+            best_value = values[np.arange(len(unassigned)), best]
+            values[np.arange(len(unassigned)), best] = np.iinfo(np.int64).min
+            second_value = values.max(axis=1) if n > 1 else best_value
+            bids = best_value - second_value + epsilon
+
+            # Highest bid wins each column
+            order = np.lexsort((-bids, best))
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = best[order][1:] != best[order][:-1]
+            winners, columns = unassigned[order[first]], best[order[first]]
+
+            previous = row_for_col[columns]
+            displaced = previous[previous >= 0]
+            col_for_row[displaced] = -1
+            prices[columns] += bids[order[first]]
+            row_for_col[columns] = winners
+            col_for_row[winners] = columns
+            unassigned = np.concatenate([unassigned[~np.isin(unassigned, winners)], displaced])
+        if epsilon == 1:
+            break
+        epsilon = max(1, int(epsilon // epsilon_factor))
+
+    # Duals in the original cost units: v = -prices, u = row-wise min of reduced costs
+    v = -prices / (n + 1)
+    u = (costs - v).min(axis=1)
+    total = int(costs[rows, col_for_row].sum())
+    return AssignmentResult(col_for_row, total, u, v)
+
+
+def check_certificate(costs, result, tolerance=1e-6):
+    """True when the potentials (u, v) prove result optimal for integer costs.
+
+    Requires dual feasibility (u[i] + v[j] <= cost[i, j]) and a duality gap
+    below 1. For JV the gap is 0. For the auction it is below n / (n + 1).
+    """
+    costs = np.asarray(costs, dtype=np.float64)
+    rows = np.arange(len(result.col_for_row))
+    if len(np.unique(result.col_for_row)) != len(rows):
+        return False
+    reduced = costs - result.u[:, None] - result.v
+    if reduced.min(initial=0.0) < -tolerance:
+        return False
+    # With spare columns (rectangular case) the column constraints are <= 1, so v must be <= 0
+    if costs.shape[1] > len(rows) and result.v.max() > tolerance:
+        return False
+    return bool(result.cost - (result.u.sum() + result.v.sum()) < 1 - tolerance)
+
+
+class IncrementalAssignment:
+    """Stateful JV solver that repairs its optimum after small changes.
+
+    Tasks are rows and employees are columns, as in read_task_assignment.
+    When there are more employees than tasks, zero-cost dummy tasks fill the
+    matrix up to a square, so the potentials need no sign constraints. A change
+    only frees the rows whose reduced costs it breaks (a negative reduced cost,
+    or a positive one on the row's own cell). Each freed row gets back the
+    minimum of its reduced costs and is reinserted with one augmenting path.
+
+    Employees are numbered by their current position. Removing one shifts the
+    later ones down, as when deleting from a list. Tasks keep their numbers.
+    """
+
+    def __init__(self, cost_matrix):
+        costs = np.array(cost_matrix, dtype=np.float64, ndmin=2)
+        n_tasks, n_employees = costs.shape
+        if n_tasks > n_employees:
+            raise ValueError("More tasks than employees: no complete assignment exists.")
+        self._costs = np.vstack([costs, np.zeros((n_employees - n_tasks, n_employees))])
+        self._task_rows = np.arange(n_tasks)
+        result = solve_jv(self._costs)
+        self._col_for_row, self._u, self._v = result.col_for_row, result.u, result.v
+        self._row_for_col = np.empty(n_employees, dtype=np.int64)
+        self._row_for_col[self._col_for_row] = np.arange(n_employees)
+
+    @property
+    def n_tasks(self):
+        return len(self._task_rows)
+
+    @property
+    def n_employees(self):
+        return self._costs.shape[1]
+
+    @property
+    def cost_matrix(self):
+        """Current (n_tasks, n_employees) costs, without the dummy tasks."""
+        return self._costs[self._task_rows]
+
+    @property
+    def assignment(self):
+        """Employee assigned to each task."""
+        return self._col_for_row[self._task_rows]
+
+    @property
+    def cost(self):
+        return int(round(self._costs[self._task_rows, self.assignment].sum()))
+
+    def result(self):
+        """AssignmentResult over the real tasks, with potentials that pass check_certificate.
+
+        Shifting v down by its maximum keeps it <= 0 (which the spare employees
+        need). The same amount moves onto u, so the real rows stay feasible.
+        """
+        shift = self._v.max() if self.n_tasks < self.n_employees else 0.0
+        return AssignmentResult(self.assignment, self.cost, self._u[self._task_rows] + shift, self._v - shift)
+
+    def _free_and_repair(self, rows):
+        """Unassigns `rows`, resets their potentials to row minima and augments them back."""
+        rows = np.unique(rows)
+        if not len(rows):
+            return
+        cols = self._col_for_row[rows]
+        self._row_for_col[cols[cols >= 0]] = -1
+        self._col_for_row[rows] = -1
+        self._u[rows] = (self._costs[rows] - self._v).min(axis=1)
+        for row in rows.tolist():
+            _augment(self._costs, self._u, self._v, self._col_for_row, self._row_for_col, row)
+
+    def update_costs(self, tasks, employees, values):
+        """Sets cost[tasks[k], employees[k]] = values[k] and restores the optimum."""
+        rows = self._task_rows[np.asarray(tasks, dtype=np.int64)]
+        cols = np.asarray(employees, dtype=np.int64)
+        self._costs[rows, cols] = values
+
+        # A cheaper own cell only needs a lower u (the rest of the row stays feasible)
+        own = self._col_for_row[rows] == cols
+        reduced = self._costs[rows, cols] - self._u[rows] - self._v[cols]
+        cheaper = own & (reduced < 0)
+        self._u[rows[cheaper]] += reduced[cheaper]
+        reduced = self._costs[rows, cols] - self._u[rows] - self._v[cols]
+        self._free_and_repair(rows[(reduced < 0) | (own & (reduced > 0))])
+
+    def add_task(self, task_costs):
+        """Adds a task with one cost per employee and returns its number.
+
+        It takes the place of a dummy task, so it needs a spare employee.
+        """
+        dummies = np.setdiff1d(np.arange(self.n_employees), self._task_rows)
+        if not len(dummies):
+            raise ValueError("More tasks than employees: no complete assignment exists.")
+        row = int(dummies[0])
+        self._costs[row] = task_costs
+        self._task_rows = np.append(self._task_rows, row)
+        self._free_and_repair([row])
+        return self.n_tasks - 1
+
+    def add_employee(self, employee_costs):
+        """Adds an employee with one cost per task and returns its number.
+
+        A dummy task comes with it to keep the matrix square. The new v is the
+        largest value that keeps its column feasible.
+        """
+        column = np.zeros(self.n_employees)
+        column[self._task_rows] = employee_costs
+        self._costs = np.vstack([np.column_stack([self._costs, column]), np.zeros(self.n_employees + 1)])
+        self._v = np.append(self._v, (column - self._u).min(initial=0.0))
+        self._u = np.append(self._u, 0.0)
+        self._col_for_row = np.append(self._col_for_row, -1)
+        self._row_for_col = np.append(self._row_for_col, -1)
+        self._free_and_repair([self.n_employees - 1])
+        return self.n_employees - 1
+
+    def remove_employee(self, employee):
+        """Removes an employee. Their task, if real, moves to the best remaining employee."""
+        dummies = np.setdiff1d(np.arange(self.n_employees), self._task_rows)
+        if not len(dummies):
+            raise ValueError("More tasks than employees: no complete assignment exists.")
+        row = self._row_for_col[employee]
+        # A dummy task leaves with the employee: their own, or any other one (which frees its column)
+        dummy = row if row in dummies else int(dummies[0])
+        self._row_for_col[self._col_for_row[dummy]] = -1
+        self._col_for_row[row] = -1
+
+        self._costs = np.delete(np.delete(self._costs, dummy, axis=0), employee, axis=1)
+        self._u = np.delete(self._u, dummy)
+        self._v = np.delete(self._v, employee)
+        self._col_for_row = np.delete(self._col_for_row, dummy)
+        self._col_for_row[self._col_for_row > employee] -= 1
+        self._row_for_col = np.delete(self._row_for_col, employee)
+        self._row_for_col[self._row_for_col > dummy] -= 1
+        self._task_rows[self._task_rows > dummy] -= 1
+
+        if row != dummy:
+            row -= row > dummy
+            self._free_and_repair([row])
+
+
+def solve_assignment(costs, method="jv"):
+    """Solves the assignment with "jv" (default) or "auction"."""
+    if method == "jv":
+        return solve_jv(costs)
+    if method == "auction":
+        return solve_auction(costs)
+    raise ValueError(f"Unknown method: {method}")
+
+
+def solve_assignment_cached(costs, method="jv", cache=None):
+    """solve_assignment through the solution cache (common/solutions.py, the default one if cache is None).
+
+    Rows are sorted lexicographically before hashing, so the same tasks
+    listed in another order share an entry. A hit is re-verified with
+    check_certificate; a near miss (same shape) warm-starts solve_jv.
+    """
+    cache = cache or solutions.default()
+    if cache is None:
+        return solve_assignment(costs, method)
+    costs = np.asarray(costs, dtype=np.int64)
+    order = np.lexsort(costs.T[::-1])  # canonical row i is task order[i]
+    canonical = costs[order]
+    key, structure = solutions.fingerprint("day3", canonical), solutions.fingerprint("day3", costs.shape)
+
+    kind, entry = cache.lookup("day3", key, structure)
+    start = None
+    if entry is not None:
+        stored = entry["solution"]
+        result = AssignmentResult(stored["col_for_row"], 0, stored["u"], stored["v"])
+        if kind == "hit":
+            result.cost = int(canonical[np.arange(len(canonical)), result.col_for_row].sum())
+            if check_certificate(canonical, result):
+                cache.count("hit")
+                return _uncanonical(result, order)
+        start = result
+        cache.count("near")
+
+    result = solve_jv(canonical, start) if method == "jv" else solve_assignment(canonical, method)
+    cache.store("day3", key, structure, result.cost, check_certificate(canonical, result),
+                {"col_for_row": result.col_for_row, "u": result.u, "v": result.v})
+    return _uncanonical(result, order)
+
+
+def _uncanonical(result, order):
+    """Maps a result on the row-sorted matrix back to the original task order."""
+    col_for_row = np.empty_like(result.col_for_row)
+    col_for_row[order] = result.col_for_row
+    u = np.empty_like(result.u)
+    u[order] = result.u
+    return AssignmentResult(col_for_row, result.cost, u, result.v)
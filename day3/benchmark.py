@@ -0,0 +1,59 @@
+"""Benchmark of the day3 assignment solvers.
+
+Times the NumPy solvers (JV and auction) on day3/instance.txt and on random
+integer cost matrices, checks each result with its dual certificate, and runs
+the MIP on the sizes where it stays practical (--mip-max-size).
+
+Usage (from the repository root):
+    python -m day3.benchmark --sizes 1000 2000 5000
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from day3.assignment import check_certificate, read_cost_matrix, solve_assignment
+from day3.day3 import task_assignment
+
+
+def run_case(name, costs, methods, run_mip):
+    results = {}
+    for method in methods:
+        start = time.perf_counter()
+        result = solve_assignment(costs, method)
+        results[method] = (result.cost, time.perf_counter() - start, check_certificate(costs, result))
+    if run_mip:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            cost = task_assignment(len(costs), costs.tolist(), enable_output=False)
+        results["mip"] = (round(cost), time.perf_counter() - start, None)
+
+    for method, (cost, elapsed, certified) in results.items():
+        print(f"{name:>14} {method:>8} {len(costs):>6} {elapsed:>9.3f} {cost:>10} {str(certified):>9}")
+    if len({cost for cost, _, _ in results.values()}) > 1:
+        print(f"{name:>14} WARNING: solvers disagree on the optimal cost")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instance", default="day3/instance.txt")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1000, 2000, 5000])
+    parser.add_argument("--max-cost", type=int, default=1000)
+    parser.add_argument("--methods", nargs="*", default=["jv", "auction"])
+    parser.add_argument("--mip-max-size", type=int, default=100)
+    args = parser.parse_args()
+
+    cases = [("instance", read_cost_matrix(args.instance))]
+    for size in args.sizes:
+        rng = np.random.default_rng(size)
+        cases.append((f"random-{size}", rng.integers(0, args.max_cost, (size, size))))
+
+    print(f"{'case':>14} {'solver':>8} {'n':>6} {'solve[s]':>9} {'cost':>10} {'certified':>9}")
+    for name, costs in cases:
+        run_case(name, costs, args.methods, run_mip=len(costs) <= args.mip_max_size)
+
+
+if __name__ == "__main__":
+    main()
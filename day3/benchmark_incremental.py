@@ -0,0 +1,78 @@
+"""Latency of incremental re-solves for day3.
+
+Streams random updates into an IncrementalAssignment and times each one:
+single cells, whole employee columns, and add/remove employee events. It
+compares them with a full JV solve of the same matrix and, with
+--verify-every, checks the repaired optimum against a full solve.
+
+Usage (from the repository root):
+    python -m day3.benchmark_incremental --size 2000 --updates 200
+"""
+import argparse
+import time
+
+import numpy as np
+
+from day3.assignment import IncrementalAssignment, check_certificate, solve_jv
+
+
+def percentiles(latencies):
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return f"p50={p50:.2f}ms p95={p95:.2f}ms p99={p99:.2f}ms max={max(latencies) * 1000:.2f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--max-cost", type=int, default=1000)
+    parser.add_argument("--updates", type=int, default=200)
+    parser.add_argument("--cells", type=int, default=5, help="cells changed by each cell update")
+    parser.add_argument("--verify-every", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    costs = rng.integers(0, args.max_cost, (args.size, args.size))
+
+    start = time.perf_counter()
+    solver = IncrementalAssignment(costs)
+    full_time = time.perf_counter() - start
+    print(f"n={args.size} initial solve={full_time:.3f}s cost={solver.cost}")
+
+    latencies = {"cells": [], "employee column": [], "add employee": [], "remove employee": []}
+    for step in range(1, args.updates + 1):
+        kind = rng.choice(list(latencies), p=[0.7, 0.2, 0.05, 0.05])
+        start = time.perf_counter()
+        if kind == "cells":
+            solver.update_costs(rng.integers(0, solver.n_tasks, args.cells),
+                                rng.integers(0, solver.n_employees, args.cells),
+                                rng.integers(0, args.max_cost, args.cells))
+        elif kind == "employee column":
+            employee = int(rng.integers(0, solver.n_employees))
+            solver.update_costs(np.arange(solver.n_tasks), np.full(solver.n_tasks, employee),
+                                rng.integers(0, args.max_cost, solver.n_tasks))
+        elif kind == "add employee":
+            solver.add_employee(rng.integers(0, args.max_cost, solver.n_tasks))
+        elif solver.n_employees > solver.n_tasks:
+            solver.remove_employee(int(rng.integers(0, solver.n_employees)))
+        else:
+            continue
+        latencies[kind].append(time.perf_counter() - start)
+
+        if args.verify_every and step % args.verify_every == 0:
+            matrix = solver.cost_matrix
+            start = time.perf_counter()
+            reference = solve_jv(matrix)
+            full_time = time.perf_counter() - start
+            result = solver.result()
+            ok = reference.cost == result.cost and check_certificate(matrix, result)
+            print(f"step {step}: incremental cost={result.cost} full JV cost={reference.cost} "
+                  f"({full_time:.3f}s) certified={ok}")
+
+    for kind, values in latencies.items():
+        if values:
+            print(f"{kind:>16}: {len(values):>4} updates {percentiles(values)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 from ortools.math_opt.python import mathopt
 
+from day3.assignment import check_certificate, read_cost_matrix, solve_assignment
+
 
 def read_task_assignment(file_path):
     """
@@ -9,31 +11,15 @@ def read_task_assignment(file_path):
     :return: An integer representing the number of tasks and employees,
              and a matrix with assignment costs.
     """
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
-
-    # Filter out commented lines and strip whitespace
-    lines = [line.strip() for line in lines if not line.strip().startswith("#") and line.strip()]
-
-    # Get the number of tasks and employees
-    n_tasks = int(lines[0])
-
-    # Read the costs into a matrix
-    costs = []
-    for line in lines[1:]:
-        costs.extend(map(int, line.split()))
-
-    # Verify the number of costs matches expectations
-    if len(costs) != n_tasks * n_tasks:
-        raise ValueError("The file does not contain the expected number of costs.")
-
-    # Transform the flat list into an n_tasks x n_tasks matrix
-    cost_matrix = [costs[i * n_tasks:(i + 1) * n_tasks] for i in range(n_tasks)]
+    # With ADVENTORCODE_CACHE=1, the parsed matrix comes from the instance cache when the file has not changed
+    costs = read_cost_matrix(file_path)
+    n_tasks, cost_matrix = len(costs), costs.tolist()
 
     return n_tasks, cost_matrix
 
 
-def task_assignment(n_tasks, cost_matrix):
+def task_assignment(n_tasks, cost_matrix, enable_output=True):
+    """MIP formulation solved with HiGHS; kept as the validation backend for solve_assignment."""
     model = mathopt.Model(name="task_assignment")
     x = {
         (task, employee): model.add_binary_variable(name=f"x_{task}_{employee}")
@@ -54,7 +40,7 @@ def task_assignment(n_tasks, cost_matrix):
     model.minimize(
         sum(x[(task, employee)] * cost_matrix[task][employee] for task, employee in x)
     )
-    params = mathopt.SolveParameters(enable_output=True)
+    params = mathopt.SolveParameters(enable_output=enable_output)
     solution = mathopt.solve(model, mathopt.SolverType.HIGHS, params=params)
 
     if solution:
@@ -75,12 +61,30 @@ def task_assignment(n_tasks, cost_matrix):
             for employee in range(n_tasks)
         )
         print(f"Optimal Cost: {optimal_cost}")
+        return optimal_cost
 
     else:
         print("No feasible solution found.")
 
 
+def solve_task_assignment(file_path, method="jv"):
+    """Solves the instance with the NumPy solvers ("jv" or "auction") or with the MIP ("mip")."""
+    if method == "mip":
+        n_tasks, cost_matrix = read_task_assignment(file_path)
+        return task_assignment(n_tasks, cost_matrix)
+
+    costs = read_cost_matrix(file_path)
+    result = solve_assignment(costs, method)
+    if not check_certificate(costs, result):
+        raise RuntimeError("The dual potentials do not certify the assignment as optimal.")
+
+    print("Optimal Assignment:")
+    for task, employee in enumerate(result.col_for_row.tolist()):
+        print(f"Task {task} is assigned to Employee {employee}")
+    print(f"Optimal Cost: {result.cost}")
+    return result.cost
+
+
 if __name__ == "__main__":
     file_path = 'day3/instance.txt'
-    n_tasks, cost_matrix = read_task_assignment(file_path)
-    task_assignment(n_tasks, cost_matrix)
+    solve_task_assignment(file_path)
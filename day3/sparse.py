@@ -0,0 +1,254 @@
+"""Sparse assignment for large day3 instances.
+
+A 50k x 50k dense cost matrix does not fit in memory as Python lists, and
+most of its entries are never worth using. Here the candidate edges are
+kept as CSR arrays (SparseCosts), one row per task:
+
+- candidates_from_dense streams a dense matrix in row blocks (a
+  memory-mapped .npy file, or the cached array of read_cost_matrix, which
+  is memory-mapped too) and keeps, per row, the k cheapest entries and/or
+  those under a cost threshold. Only one block is in memory at a time;
+- solve_sparse_auction is the epsilon-scaling Jacobi auction of
+  day3/assignment.py over the candidate edges only. Whether the candidates
+  admit a complete assignment at all is decided first, with a maximum
+  matching of the candidate graph (OR-Tools SimpleLinearSumAssignment on
+  zero costs); if not, the result is "infeasible" and no bid is made;
+- dense_violations prices the whole dense matrix, again in row blocks, with
+  the potentials of the sparse solution. No negative reduced cost (and a
+  gap below 1, as check_certificate asks) proves the sparse optimum optimal
+  for the dense problem; otherwise the violating edges are what the
+  sparsification missed;
+- solve_sparsified puts them together: k cheapest candidates per row,
+  doubling k while the candidates are infeasible, and adding the most
+  violated edge of each row until the potentials certify the optimum.
+
+Every result carries a status: "optimal" (certified against the dense
+matrix), "sparse-optimal" (optimal on the candidates only) or
+"infeasible".
+"""
+from dataclasses import dataclass
+
+import numpy as np
+from ortools.graph.python.linear_sum_assignment import SimpleLinearSumAssignment
+
+from day3.assignment import read_cost_matrix
+
+
+@dataclass
+class SparseCosts:
+    """Candidate edges in CSR form: the columns of row i are cols[indptr[i]:indptr[i + 1]]."""
+    n_rows: int
+    n_cols: int
+    indptr: np.ndarray
+    cols: np.ndarray
+    costs: np.ndarray
+
+    @property
+    def nnz(self):
+        return len(self.cols)
+
+    def with_edges(self, rows, cols, costs):
+        """A copy with the edges (rows[k], cols[k], costs[k]) added (duplicates are dropped)."""
+        owner = np.repeat(np.arange(self.n_rows), np.diff(self.indptr))
+        rows = np.concatenate([owner, np.asarray(rows, dtype=np.int64)])
+        cols = np.concatenate([self.cols, np.asarray(cols, dtype=np.int64)])
+        costs = np.concatenate([self.costs, np.asarray(costs, dtype=np.int64)])
+        rows, index = np.unique(rows * self.n_cols + cols, return_index=True)
+        return _from_coo(self.n_rows, self.n_cols, rows // self.n_cols, rows % self.n_cols, costs[index])
+
+
+@dataclass
+class SparseAssignmentResult:
+    """Assignment on the candidate edges with its potentials (u, v) and how far they prove it optimal."""
+    col_for_row: np.ndarray
+    cost: int
+    u: np.ndarray
+    v: np.ndarray
+    status: str  # "optimal", "sparse-optimal" or "infeasible"
+    violations: int = 0  # dense rows with a negative reduced cost (after dense_violations)
+
+
+def _from_coo(n_rows, n_cols, rows, cols, costs):
+    order = np.lexsort((cols, rows))
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n_rows))])
+    return SparseCosts(n_rows, n_cols, indptr, cols[order].astype(np.int64), costs[order].astype(np.int64))
+
+
+def open_dense(file_path):
+    """A dense cost matrix without loading it: np.load(mmap_mode="r") for .npy, the instance cache otherwise."""
+    if file_path.endswith(".npy"):
+        return np.load(file_path, mmap_mode="r")
+    return read_cost_matrix(file_path)
+
+
+def candidates_from_dense(costs, k=None, threshold=None, block=1024):
+    """SparseCosts with the k cheapest entries of each row and/or the entries <= threshold.
+
+    With both, an entry must pass both tests. `costs` may be any 2-D
+    array-like that supports row slicing, e.g. a memory map: it is read
+    `block` rows at a time.
+    """
+    if k is None and threshold is None:
+        raise ValueError("Give k, threshold or both.")
+    n_rows, n_cols = costs.shape
+    rows, cols, values = [], [], []
+    for start in range(0, n_rows, block):
+        chunk = np.asarray(costs[start:start + block], dtype=np.int64)
+        if k is not None and k < n_cols:
+            keep = np.argpartition(chunk, k - 1, axis=1)[:, :k]
+            local = np.repeat(np.arange(len(chunk)), k)
+            keep = keep.ravel()
+        else:
+            local, keep = np.nonzero(np.ones(chunk.shape, dtype=bool))
+        chunk_values = chunk[local, keep]
+        if threshold is not None:
+            mask = chunk_values <= threshold
+            local, keep, chunk_values = local[mask], keep[mask], chunk_values[mask]
+        rows.append(local + start)
+        cols.append(keep)
+        values.append(chunk_values)
+    return _from_coo(n_rows, n_cols, np.concatenate(rows), np.concatenate(cols), np.concatenate(values))
+
+
+def has_perfect_matching(sparse):
+    """Whether the candidate edges admit a complete assignment (square problems)."""
+    if sparse.n_rows != sparse.n_cols:
+        return False
+    counts = np.diff(sparse.indptr)
+    if sparse.n_rows == 0:
+        return True
+    if counts.min() == 0 or len(np.unique(sparse.cols)) < sparse.n_cols:
+        return False
+    matching = SimpleLinearSumAssignment()
+    matching.add_arcs_with_cost(np.repeat(np.arange(sparse.n_rows), counts), sparse.cols,
+                                np.zeros(sparse.nnz, dtype=np.int64))
+    return matching.solve() == matching.OPTIMAL
+
+
+def solve_sparse_auction(sparse, epsilon_factor=5.0):
+    """Epsilon-scaling auction over the candidate edges (square problems); returns a SparseAssignmentResult.
+
+    As in solve_auction, costs are scaled by n + 1 so that the final
+    epsilon of 1 makes the result optimal on the candidates. A row with a
+    single candidate bids as if its second best were worth the whole
+    benefit range less. The auction only runs once has_perfect_matching
+    holds: on infeasible candidates it would raise prices forever.
+    """
+    n = sparse.n_rows
+    if sparse.n_cols != n:
+        raise ValueError("The auction solver needs a square cost matrix.")
+    counts = np.diff(sparse.indptr)
+    empty = SparseAssignmentResult(np.full(n, -1, dtype=np.int64), 0, np.zeros(n), np.zeros(n), "infeasible")
+    if n == 0:
+        empty.status = "sparse-optimal"
+        return empty
+    if not has_perfect_matching(sparse):
+        return empty
+
+    benefit = -(sparse.costs * (n + 1))
+    span = int(np.ptp(benefit))
+    prices = np.zeros(n, dtype=np.int64)
+    epsilon = max(1, span // 2)
+
+    while True:
+        col_for_row = np.full(n, -1, dtype=np.int64)
+        row_for_col = np.full(n, -1, dtype=np.int64)
+        unassigned = np.arange(n)
+        while len(unassigned):
+            # Candidate edges of every unassigned row, grouped by row
+            lengths = counts[unassigned]
+            offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+            segment = np.repeat(np.arange(len(unassigned)), lengths)
+            edges = np.repeat(sparse.indptr[unassigned] - offsets, lengths) + np.arange(len(segment))
+            values = benefit[edges] - prices[sparse.cols[edges]]
+
+            # Best and second best value per row (rows sorted by decreasing value within their segment)
+            order = np.lexsort((-values, segment))
+            best_edge = edges[order[offsets]]
+            best_value = values[order[offsets]]
+            second = np.minimum(offsets + 1, len(order) - 1)
+            second_value = np.where(lengths > 1, values[order[second]], best_value - span - epsilon)
+            best = sparse.cols[best_edge]
+            bids = best_value - second_value + epsilon
+
+            # Highest bid wins each column
+            order = np.lexsort((-bids, best))
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = best[order][1:] != best[order][:-1]
+            winners, columns = unassigned[order[first]], best[order[first]]
+
+            previous = row_for_col[columns]
+            displaced = previous[previous >= 0]
+            col_for_row[displaced] = -1
+            prices[columns] += bids[order[first]]
+            row_for_col[columns] = winners
+            col_for_row[winners] = columns
+            unassigned = np.concatenate([unassigned[~np.isin(unassigned, winners)], displaced])
+        if epsilon == 1:
+            break
+        epsilon = max(1, int(epsilon // epsilon_factor))
+
+    # Duals in the original cost units: v = -prices, u = minimum reduced cost over each row's candidates
+    v = -prices / (n + 1)
+    owner = np.repeat(np.arange(n), counts)
+    reduced = sparse.costs - v[sparse.cols]
+    u = np.full(n, np.inf)
+    np.minimum.at(u, owner, reduced)
+    position = np.flatnonzero(sparse.cols == col_for_row[owner])
+    total = int(sparse.costs[position].sum())
+    return SparseAssignmentResult(col_for_row, total, u, v, "sparse-optimal")
+
+
+def dense_violations(costs, result, block=1024, tolerance=1e-6):
+    """(rows, cols) of the most negative reduced cost of every dense row that has one.
+
+    Streams `costs` in row blocks with the potentials of `result`. Also
+    sets result.violations and, when there are none and the duality gap is
+    below 1, result.status = "optimal". An infeasible result has no
+    potentials to check and is left as it is.
+    """
+    n_rows = costs.shape[0]
+    if result.status == "infeasible":
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    rows, cols = [], []
+    for start in range(0, n_rows, block):
+        reduced = np.asarray(costs[start:start + block], dtype=np.float64) - result.u[start:start + block, None] \
+            - result.v
+        worst = reduced.argmin(axis=1)
+        bad = np.flatnonzero(reduced[np.arange(len(reduced)), worst] < -tolerance)
+        rows.append(bad + start)
+        cols.append(worst[bad])
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    result.violations = len(rows)
+    if not len(rows) and result.cost - (result.u.sum() + result.v.sum()) < 1 - tolerance:
+        result.status = "optimal"
+    return rows, cols
+
+
+def solve_sparsified(costs, k=16, block=1024, max_rounds=20):
+    """Optimal assignment of a large dense matrix through sparse candidates; returns a SparseAssignmentResult.
+
+    Starts from the k cheapest entries of each row, doubles k while the
+    candidates are infeasible (keeping the edges added so far) and adds the
+    most violated dense edge of each row until the potentials certify the
+    optimum (status "optimal"). After
+    max_rounds the last result is returned with its status as it stands.
+    """
+    sparse = candidates_from_dense(costs, k=k, block=block)
+    result = None
+    for _ in range(max_rounds):
+        result = solve_sparse_auction(sparse)
+        if result.status == "infeasible":
+            if k >= costs.shape[1]:
+                return result
+            k = min(2 * k, costs.shape[1])
+            owner = np.repeat(np.arange(sparse.n_rows), np.diff(sparse.indptr))
+            sparse = candidates_from_dense(costs, k=k, block=block).with_edges(owner, sparse.cols, sparse.costs)
+            continue
+        rows, cols = dense_violations(costs, result, block)
+        if result.status == "optimal" or not len(rows):
+            return result
+        values = np.fromiter((costs[row, col] for row, col in zip(rows.tolist(), cols.tolist())),
+                             dtype=np.int64, count=len(rows))
+        sparse = sparse.with_edges(rows, cols, values)
+    return result
@@ -0,0 +1,93 @@
+"""Benchmark de las formulaciones del horario de day4.
+
+Compara el modelo denso original, el modelo disperso (HiGHS), CP-SAT y la
+descomposición por días sobre day4 y sobre instancias generadas de mayor
+tamaño. Muestra el número de variables y restricciones, el tiempo de
+construcción y el tiempo de resolución.
+
+Uso (desde la raíz del repositorio):
+    python -m day4.benchmark --sizes 8 16 32 --fill 0.8
+"""
+import argparse
+import random
+import time
+
+from ortools.math_opt.python import mathopt
+
+from day4.day4 import build_dense_model, read_instance_files, solve_dense
+from day4.timetable import (N_DAYS, PERIODS_PER_DAY, build_sparse_model, requirement_triples, solve_by_days,
+                            solve_sparse, solve_with_cpsat)
+
+
+def generate_instance(size, fill=0.8, seed=0):
+    """Instancia factible con `size` profesores, clases y aulas.
+
+    Construye un horario al azar (en cada periodo, un emparejamiento parcial
+    aula-profesor-clase con una fracción `fill` de las aulas ocupadas) y
+    devuelve los requisitos que cuenta, así que siempre existe solución.
+    """
+    rng = random.Random(seed)
+    matrix = [[[0] * size for _ in range(size)] for _ in range(size)]
+    for _ in range(N_DAYS * PERIODS_PER_DAY):
+        teachers, classes = rng.sample(range(size), size), rng.sample(range(size), size)
+        for room in rng.sample(range(size), round(fill * size)):
+            matrix[room][classes[room]][teachers[room]] += 1
+    dimensions = {'NUMBER_OF_TEACHERS': size, 'NUMBER_OF_CLASSES': size, 'NUMBER_OF_ROOM_AVAILABLE': size,
+                  'NUMBER_OF_REQUIREMENTS': sum(map(sum, (row for room in matrix for row in room)))}
+    return matrix, dimensions
+
+
+def model_size(model):
+    return len(list(model.variables())), len(list(model.linear_constraints()))
+
+
+def run_case(name, matrix, dimensions, methods, time_limit):
+    for method in methods:
+        size = ("-", "-")
+        start = time.perf_counter()
+        if method == "dense":
+            size = model_size(build_dense_model(matrix, dimensions)[0])
+        elif method == "sparse":
+            size = model_size(build_sparse_model(requirement_triples(matrix, dimensions))[0])
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        try:
+            if method == "dense":
+                solution = solve_dense(matrix, dimensions, enable_output=False)
+            elif method == "sparse":
+                solution = solve_sparse(matrix, dimensions, time_limit=time_limit, enable_output=False)
+            elif method == "cpsat":
+                solution = solve_with_cpsat(matrix, dimensions, time_limit=time_limit)
+            else:
+                solution = solve_by_days(matrix, dimensions)
+        except RuntimeError:
+            solution = None  # sin horario dentro del límite de tiempo
+        elapsed = time.perf_counter() - start
+        lessons = "-" if solution is None else len(solution)
+        print(f"{name:>12} {method:>7} {size[0]:>9} {size[1]:>8} {build_time:>9.3f} {elapsed:>9.3f} "
+              f"{lessons:>8}/{dimensions['NUMBER_OF_REQUIREMENTS']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[8, 16, 32])
+    parser.add_argument("--fill", type=float, default=0.8)
+    parser.add_argument("--methods", nargs="*", default=["dense", "sparse", "cpsat", "days"])
+    parser.add_argument("--dense-max-size", type=int, default=8)
+    parser.add_argument("--time-limit", type=float, default=120.0, help="límite para HiGHS y CP-SAT")
+    args = parser.parse_args()
+
+    cases = [("instance", *read_instance_files('day4/instance_req.txt', 'day4/instance_note.txt'))]
+    for size in args.sizes:
+        cases.append((f"gen-{size}", *generate_instance(size, args.fill, seed=size)))
+
+    print(f"{'case':>12} {'method':>7} {'vars':>9} {'rows':>8} {'build[s]':>9} {'solve[s]':>9} {'lessons':>12}")
+    for name, matrix, dimensions in cases:
+        methods = [method for method in args.methods
+                   if method != "dense" or dimensions['NUMBER_OF_TEACHERS'] <= args.dense_max_size]
+        run_case(name, matrix, dimensions, methods, args.time_limit)
+
+
+if __name__ == "__main__":
+    main()
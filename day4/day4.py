@@ -1,5 +1,9 @@
+import numpy as np
 from ortools.math_opt.python import mathopt
-import pandas as pd
+
+from common.cache import cached
+from common.results import chosen_keys
+from day4.timetable import lessons_frame, solve_by_days, solve_sparse, solve_with_cpsat
 
 
 def read_schedule_requirements(file_path, dimensions):
@@ -44,18 +48,33 @@ def read_instance_note(file_path):
 
 
 def read_instance_files(instance_req_path, instance_note_path):
+    # Los ficheros solo se analizan si la caché de instancias no tiene ya su contenido
+    data = cached("day4.requirements", [instance_req_path, instance_note_path],
+                  lambda: parse_instance_files(instance_req_path, instance_note_path))
+    dimensions = data["dimensions"]
+
+    # Reconstruir matrix[room][class][teacher] a partir de las filas (una por línea del fichero)
+    n_classes = dimensions['NUMBER_OF_CLASSES']
+    matrix = {}
+    for line, values in enumerate(data["requirements"].tolist()):
+        matrix.setdefault(line // n_classes, {})[line % n_classes] = dict(enumerate(values))
+
+    return matrix, dimensions
+
+
+def parse_instance_files(instance_req_path, instance_note_path):
     dimensions = read_instance_note(instance_note_path)
 
     # Leer la instancia de requisitos
     matrix = read_schedule_requirements(instance_req_path, dimensions)
 
-    # Leer las dimensiones del problema
-
-    return matrix, dimensions
+    # Una fila por línea del fichero, en el mismo orden (room, class)
+    rows = [list(matrix[room][i_class].values()) for room in matrix for i_class in matrix[room]]
+    return {"dimensions": dimensions, "requirements": np.array(rows, dtype=np.int64)}
 
 
-def solve_scheduling_problem(matrix, dimensions):
-    n_periods = 6*5
+def build_dense_model(matrix, dimensions, n_periods=6*5):
+    """Formulación original: x para todas las combinaciones (n^4 * n_periods variables)."""
     n_teachers = dimensions['NUMBER_OF_TEACHERS']
     n_classes = dimensions['NUMBER_OF_CLASSES']
     n_rooms = dimensions['NUMBER_OF_ROOM_AVAILABLE']
@@ -106,40 +125,44 @@ def solve_scheduling_problem(matrix, dimensions):
     model.maximize(
         sum(x[(teacher, room, i_class, period)] for teacher, room, i_class, period in x)
     )
-    params = mathopt.SolveParameters(enable_output=True)
+    return model, x
+
+
+def solve_dense(matrix, dimensions, enable_output=True):
+    n_periods = 6*5
+    model, x = build_dense_model(matrix, dimensions, n_periods)
+
+    params = mathopt.SolveParameters(enable_output=enable_output)
     result = mathopt.solve(model, mathopt.SolverType.HIGHS, params=params)
 
-    # Supongamos que ya tienes los valores de solución
-    solution = []
-    for period in range(n_periods):
-        for teacher in range(n_teachers):
-            for i_class in range(n_classes):
-                for room in range(n_rooms):
-                    if result.variable_values()[x[teacher, room, i_class, period]] > 0.5:  # Variable activa
-                        solution.append({
-                            "Day": period // 6,  # 6 periodos por día
-                            "Period": period % 6,  # Periodos dentro de un día
-                            "Room": int(room),
-                            "Teacher": int(teacher),
-                            "Class": int(i_class)
-                        })
-
-    df = pd.DataFrame(solution)
+    # Una sola lectura de la solución; las claves (teacher, room, i_class, period) siguen el orden de x
+    teacher, room, i_class, period = chosen_keys(result, list(x.values()), list(x)).T
+    return lessons_frame(teacher, room, i_class, period)
+
+
+def solve_scheduling_problem(matrix, dimensions, method="sparse"):
+    """Resuelve con "sparse" (HiGHS, por defecto), "cpsat", "days" (descomposición) o "dense"."""
+    solvers = {"sparse": solve_sparse, "cpsat": solve_with_cpsat, "days": solve_by_days, "dense": solve_dense}
+    if method not in solvers:
+        raise ValueError(f"Unknown method: {method}")
+    df = solvers[method](matrix, dimensions)
 
     # Creamos una columna combinada "teacher - class"
     df["Teacher-Class"] = df["Teacher"].astype(str) + " - " + df["Class"].astype(str)
 
-    # Visualizar en formato tabla por salón con combinación teacher-class
-    for room in range(n_rooms):
-        room_schedule = df[df["Room"] == room].pivot(index="Period", columns="Day", values="Teacher-Class")
+    # Un único pivot (Room, Period) x Day; cada salón es un bloque del índice
+    timetable = df.pivot(index=["Room", "Period"], columns="Day", values="Teacher-Class")
+    for room, room_schedule in timetable.groupby(level="Room"):
         print(f"\nRoom {room} Schedule:")
-        print(room_schedule)
+        print(room_schedule.droplevel("Room"))
+    return df
 
 
-# Especificar las rutas de los archivos
-instance_req_path = 'day4/instance_req.txt'
-instance_note_path = 'day4/instance_note.txt'
+if __name__ == "__main__":
+    # Especificar las rutas de los archivos
+    instance_req_path = 'day4/instance_req.txt'
+    instance_note_path = 'day4/instance_note.txt'
 
-# Llamar a la función principal
-matrix, dimensions = read_instance_files(instance_req_path, instance_note_path)
-solve_scheduling_problem(matrix, dimensions)
+    # Llamar a la función principal
+    matrix, dimensions = read_instance_files(instance_req_path, instance_note_path)
+    solve_scheduling_problem(matrix, dimensions)
@@ -0,0 +1,292 @@
+"""Formulación dispersa del horario de day4 y su descomposición por días.
+
+Solo se crean variables para las ternas (profesor, aula, clase) con
+requisito positivo: x[k, period] vale 1 si la lección k se imparte en ese
+periodo. Las restricciones se emiten desde listas de índices por aula,
+profesor y clase, una vez por periodo, en lugar de recorrer las cuatro
+dimensiones:
+
+- build_sparse_model / solve_sparse: el MIP de mathopt resuelto con HiGHS;
+- solve_with_cpsat: el mismo modelo en CP-SAT con AddExactlyOne/AddAtMostOne;
+- solve_by_days: primero reparte las lecciones entre los días y después,
+  día a día, asigna los periodos. Un reparto diario imposible se excluye con
+  un corte y se vuelve a repartir.
+
+Todas devuelven las lecciones programadas como un DataFrame con columnas
+Day, Period, Room, Teacher y Class (lessons_frame).
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from ortools.math_opt.python import mathopt
+
+from common.results import chosen_indices
+
+N_DAYS = 5
+PERIODS_PER_DAY = 6
+
+
+def requirement_triples(matrix, dimensions):
+    """Lista de (teacher, room, i_class, count) con count > 0."""
+    return [
+        (teacher, room, i_class, matrix[room][i_class][teacher])
+        for room in range(dimensions['NUMBER_OF_ROOM_AVAILABLE'])
+        for i_class in range(dimensions['NUMBER_OF_CLASSES'])
+        for teacher in range(dimensions['NUMBER_OF_TEACHERS'])
+        if matrix[room][i_class][teacher] > 0
+    ]
+
+
+def resource_groups(triples):
+    """Índices de las ternas que comparten aula, profesor o clase (solo grupos de dos o más)."""
+    groups = defaultdict(list)
+    for k, (teacher, room, i_class, _) in enumerate(triples):
+        groups['room', room].append(k)
+        groups['teacher', teacher].append(k)
+        groups['class', i_class].append(k)
+    return {key: members for key, members in groups.items() if len(members) > 1}
+
+
+def anchor_periods(triples, groups, n_periods):
+    """Fija los periodos del recurso más cargado para romper la simetría entre periodos.
+
+    Los periodos son intercambiables: cualquier horario puede permutarse
+    para que las lecciones de ese recurso ocupen los primeros periodos en el
+    orden de sus ternas. Devuelve {k: periodos fijados a 1}.
+    """
+    if not groups:
+        return {}
+    members = max(groups.values(), key=lambda ks: sum(triples[k][3] for k in ks))
+    anchored, period = {}, 0
+    for k in members:
+        count = min(triples[k][3], n_periods - period)
+        anchored[k] = list(range(period, period + count))
+        period += count
+    return anchored
+
+
+def lessons_frame(teacher, room, i_class, period, periods_per_day=PERIODS_PER_DAY):
+    """DataFrame de lecciones (Day, Period, Room, Teacher, Class) a partir de arrays alineados."""
+    import pandas as pd  # importación diferida: leer y modelar la instancia no necesita pandas
+
+    period = np.asarray(period, dtype=np.int64)
+    df = pd.DataFrame({
+        "Day": period // periods_per_day,
+        "Period": period % periods_per_day,
+        "Room": np.asarray(room, dtype=np.int64),
+        "Teacher": np.asarray(teacher, dtype=np.int64),
+        "Class": np.asarray(i_class, dtype=np.int64)
+    })
+    return df.sort_values(["Day", "Period", "Room"], ignore_index=True)
+
+
+def _triple_lessons(triples, k, period, periods_per_day=PERIODS_PER_DAY):
+    """Lecciones de las ternas triples[k] en los periodos `period` (arrays alineados)."""
+    columns = np.asarray(triples, dtype=np.int64).reshape(-1, 4)[np.asarray(k, dtype=np.int64)]
+    return lessons_frame(columns[:, 0], columns[:, 1], columns[:, 2], period, periods_per_day)
+
+
+def build_sparse_model(triples, n_periods=N_DAYS * PERIODS_PER_DAY, symmetry_breaking=True):
+    """MIP de factibilidad con x[k][period] solo para las ternas con requisito.
+
+    El objetivo original (maximizar el número de lecciones) es constante
+    cuando se cumplen los requisitos, así que se omite.
+    """
+    model = mathopt.Model(name="scheduling_sparse")
+    x = [
+        [model.add_binary_variable(name=f"x_{teacher}_{room}_{i_class}_{period}") for period in range(n_periods)]
+        for teacher, room, i_class, _ in triples
+    ]
+    for k, (teacher, room, i_class, count) in enumerate(triples):
+        model.add_linear_constraint(sum(x[k]) == count, name=f'requirement_{teacher}_{room}_{i_class}')
+
+    groups = resource_groups(triples)
+    if symmetry_breaking:
+        for k, periods in anchor_periods(triples, groups, n_periods).items():
+            for period in periods:
+                x[k][period].lower_bound = 1
+
+    names = {'room': 'no_overlaping', 'teacher': 'no_double_booking', 'class': 'no_double_class'}
+    for (kind, index), members in groups.items():
+        for period in range(n_periods):
+            model.add_linear_constraint(
+                sum(x[k][period] for k in members) <= 1,
+                name=f'{names[kind]}_{index}_{period}'
+            )
+    return model, x
+
+
+def solve_sparse(matrix, dimensions, n_periods=N_DAYS * PERIODS_PER_DAY, symmetry_breaking=True,
+                 time_limit=None, enable_output=True):
+    triples = requirement_triples(matrix, dimensions)
+    model, x = build_sparse_model(triples, n_periods, symmetry_breaking)
+    params = mathopt.SolveParameters(enable_output=enable_output)
+    if time_limit is not None:
+        params.time_limit = timedelta(seconds=time_limit)
+    result = mathopt.solve(model, mathopt.SolverType.HIGHS, params=params)
+    if result.termination.reason != mathopt.TerminationReason.OPTIMAL:
+        raise RuntimeError(f"Model failed to solve: {result.termination}")
+
+    k, period = np.divmod(chosen_indices(result, [var for row in x for var in row]), n_periods)
+    return _triple_lessons(triples, k, period)
+
+
+def _cpsat_periods(triples, counts, periods, time_limit=None, symmetry_breaking=True, explain=False):
+    """Asigna counts[k] periodos de `periods` a cada terna con CP-SAT.
+
+    Devuelve (scheduled, core): la lista de (k, period) programados, o None y
+    las ternas que ya no caben (con explain=True, el núcleo de asunciones de
+    CP-SAT; sin explain, todas las activas). core es None si se agotó el
+    tiempo sin probar nada.
+    """
+    from ortools.sat.python import cp_model  # diferida, como pandas: solo la usan los modelos CP-SAT
+
+    model = cp_model.CpModel()
+    active = [k for k, count in enumerate(counts) if count > 0]
+    x = {(k, period): model.NewBoolVar(f'x_{k}_{period}') for k in active for period in periods}
+    # Con explain cada requisito depende de una asunción, para extraer el núcleo infactible
+    assumption = {k: model.NewBoolVar(f'a_{k}') for k in active} if explain else {}
+    for k in active:
+        if explain:
+            model.Add(sum(x[k, period] for period in periods) == counts[k]).OnlyEnforceIf(assumption[k])
+        elif counts[k] == 1:
+            model.AddExactlyOne(x[k, period] for period in periods)
+        else:
+            model.Add(sum(x[k, period] for period in periods) == counts[k])
+
+    local = [triples[k][:3] + (counts[k],) for k in active]
+    groups = resource_groups(local)
+    for members in groups.values():
+        for period in periods:
+            model.AddAtMostOne(x[active[k], period] for k in members)
+    if symmetry_breaking:
+        for k, offsets in anchor_periods(local, groups, len(periods)).items():
+            for offset in offsets:
+                anchor = model.Add(x[active[k], periods[offset]] == 1)
+                if explain:
+                    anchor.OnlyEnforceIf(assumption[active[k]])
+
+    solver = cp_model.CpSolver()
+    if time_limit is not None:
+        solver.parameters.max_time_in_seconds = time_limit
+    if explain:
+        model.AddAssumptions(assumption.values())
+        solver.parameters.num_workers = 1
+    status = solver.Solve(model)
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return [(k, period) for (k, period), var in x.items() if solver.Value(var)], None
+    if status != cp_model.INFEASIBLE:
+        return None, None
+    if explain:
+        literals = set(solver.SufficientAssumptionsForInfeasibility())
+        return None, [k for k in active if assumption[k].Index() in literals]
+    return None, active
+
+
+def _shrink_core(triples, counts, periods, core, time_limit=None):
+    """Reduce el núcleo infactible quitando ternas mientras siga sin caber (cortes más fuertes)."""
+    core = list(core)
+    for k in list(core):
+        trial = [counts[j] if j in core and j != k else 0 for j in range(len(counts))]
+        if _cpsat_periods(triples, trial, periods, time_limit)[1] is not None:
+            core.remove(k)
+    return core
+
+
+def solve_with_cpsat(matrix, dimensions, n_periods=N_DAYS * PERIODS_PER_DAY, time_limit=None,
+                     symmetry_breaking=True):
+    triples = requirement_triples(matrix, dimensions)
+    scheduled, _ = _cpsat_periods(triples, [count for *_, count in triples], range(n_periods), time_limit,
+                                  symmetry_breaking)
+    if scheduled is None:
+        raise RuntimeError("CP-SAT found no feasible timetable")
+    k, period = np.array(scheduled, dtype=np.int64).reshape(-1, 2).T
+    return _triple_lessons(triples, k, period)
+
+
+def solve_by_days(matrix, dimensions, n_days=N_DAYS, periods_per_day=PERIODS_PER_DAY, max_rounds=50,
+                  day_time_limit=2.0, symmetry_breaking=True):
+    """Descomposición en dos etapas para instancias grandes (ambas con CP-SAT).
+
+    Etapa 1: y[k, day] lecciones de la terna k en cada día. Cada aula,
+    profesor y clase reparte su carga por igual (a lo sumo ceil(carga /
+    n_days) por día, o periods_per_day si así no hay reparto). Etapa 2: un
+    modelo pequeño por día asigna los periodos. Si un día no admite su reparto,
+    CP-SAT devuelve un núcleo de ternas que ya no caben juntas. Ningún día
+    puede admitir ese núcleo ni nada que lo contenga: se añade el corte
+    "alguna terna del núcleo recibe menos lecciones" para todos los días y se
+    repite. Un día que agota day_time_limit sin respuesta se corta entero:
+    ese corte es heurístico y puede descartar repartos válidos.
+
+    Pensada para instancias grandes con holgura. Si los recursos ocupan todos
+    los periodos (como en day4/instance_req.txt), los días no tienen margen y
+    los cortes convergen despacio: si no hay horario tras max_rounds rondas (o
+    los cortes dejan el reparto sin solución), se resuelve el problema entero
+    con solve_with_cpsat.
+    """
+    from ortools.sat.python import cp_model
+
+    triples = requirement_triples(matrix, dimensions)
+    groups = resource_groups(triples)
+
+    def distribution_model(balanced):
+        model = cp_model.CpModel()
+        y = {
+            (k, day): model.NewIntVar(0, min(count, periods_per_day), f'y_{k}_{day}')
+            for k, (_, _, _, count) in enumerate(triples)
+            for day in range(n_days)
+        }
+        for k, (_, _, _, count) in enumerate(triples):
+            model.Add(sum(y[k, day] for day in range(n_days)) == count)
+        caps = {}
+        for key, members in groups.items():
+            load = sum(triples[k][3] for k in members)
+            caps[key] = min(periods_per_day, -(-load // n_days)) if balanced else periods_per_day
+            for day in range(n_days):
+                model.Add(sum(y[k, day] for k in members) <= caps[key])
+        return model, y
+
+    # Primero con la carga repartida por igual (días con holgura, mucho más fáciles de programar)
+    solver = cp_model.CpSolver()
+    # Es un problema de transporte con topes: la relajación lineal solo frena la búsqueda
+    solver.parameters.linearization_level = 0
+    model, y = distribution_model(balanced=True)
+    status = solver.Solve(model)
+    if status == cp_model.INFEASIBLE:
+        model, y = distribution_model(balanced=False)
+        status = solver.Solve(model)
+    for _ in range(max_rounds):
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            # Los cortes heurísticos (días sin respuesta) pueden haber descartado todos los repartos
+            break
+
+        scheduled_days, infeasible_days = [], []
+        for day in range(n_days):
+            counts = [solver.Value(y[k, day]) for k in range(len(triples))]
+            periods = range(day * periods_per_day, (day + 1) * periods_per_day)
+            scheduled, core = _cpsat_periods(triples, counts, periods, day_time_limit, symmetry_breaking)
+            if scheduled is None and core is None:
+                core = [k for k, count in enumerate(counts) if count > 0]
+            elif scheduled is None:
+                # Las asunciones debilitan la propagación: solo se usan para explicar un día imposible
+                explained = _cpsat_periods(triples, counts, periods, day_time_limit, symmetry_breaking,
+                                           explain=True)[1]
+                core = _shrink_core(triples, counts, periods, explained or core, day_time_limit)
+            if scheduled is None:
+                infeasible_days.append({k: counts[k] for k in core})
+            else:
+                scheduled_days.extend(scheduled)
+        if not infeasible_days:
+            k, period = np.array(scheduled_days, dtype=np.int64).reshape(-1, 2).T
+            return _triple_lessons(triples, k, period, periods_per_day)
+
+        # Corte de no-good monótono sobre el núcleo infactible, válido para cualquier día
+        for core in infeasible_days:
+            for day in range(n_days):
+                fewer = [model.NewBoolVar('') for _ in core]
+                for flag, (k, count) in zip(fewer, core.items()):
+                    model.Add(y[k, day] <= count - 1).OnlyEnforceIf(flag)
+                model.AddBoolOr(fewer)
+        status = solver.Solve(model)
+    return solve_with_cpsat(matrix, dimensions, n_days * periods_per_day, symmetry_breaking=symmetry_breaking)
@@ -0,0 +1,50 @@
+"""Benchmark of the day5 facility location solvers.
+
+Solves day5/instance.txt and generated instances (--sizes, as
+warehouses x clients) with the strong MIP and with Benders decomposition,
+and prints the time to optimality (or the final gap at --time-limit) and
+the bound progress of each run.
+
+Usage (from the repository root):
+    python -m day5.benchmark --sizes 50x200 100x1000 --time-limit 300
+"""
+import argparse
+import math
+
+from day5.facility import generate_instance, read_instance, solve_benders, solve_mip
+
+SOLVERS = {"mip": solve_mip, "benders": solve_benders}
+
+
+def print_history(history, points=8):
+    """A few evenly spaced entries of the bound history (once both bounds are finite)."""
+    history = [entry for entry in history if math.isfinite(entry[1]) and math.isfinite(entry[2])]
+    step = max(1, len(history) // points)
+    for seconds, lower, upper in history[::step] + ([history[-1]] if (len(history) - 1) % step else []):
+        print(f"{'':>16} {seconds:>9.2f}s {lower:>14.3f} {upper:>14.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instance", default="day5/instance.txt")
+    parser.add_argument("--sizes", nargs="*", default=["50x200", "100x1000"])
+    parser.add_argument("--methods", nargs="*", default=list(SOLVERS))
+    parser.add_argument("--time-limit", type=float, default=300.0)
+    args = parser.parse_args()
+
+    cases = [("instance", read_instance(args.instance))]
+    for size in args.sizes:
+        m, n = map(int, size.split("x"))
+        cases.append((f"random-{size}", generate_instance(m, n, seed=m)))
+
+    print(f"{'case':>16} {'solver':>8} {'time[s]':>9} {'cost':>14} {'bound':>14} {'gap[%]':>7}")
+    for name, instance in cases:
+        for method in args.methods:
+            result = SOLVERS[method](instance, time_limit=args.time_limit, output=False)
+            print(f"{name:>16} {method:>8} {result.elapsed:>9.2f} {result.cost:>14.3f} "
+                  f"{result.lower_bound:>14.3f} {100 * result.gap:>7.3f}")
+            print_history(result.history)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Quality against time for the day5 local search.
+
+For day5/instance.txt and generated instances (--sizes, as warehouses x
+clients), runs solve_local_search with an increasing number of starts and
+prints its cost and gap to a reference: the optimum from solve_benders, or
+its best bound when --time-limit stops it first. --warm-start also solves
+the MIP with and without the local-search plan as its MIP start.
+
+Usage (from the repository root):
+    python -m day5.benchmark_local_search --sizes 50x200 100x1000 --starts 1 4 16
+"""
+import argparse
+
+from day5.facility import generate_instance, read_instance, solve_benders, solve_mip
+from day5.local_search import solve_local_search
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instance", default="day5/instance.txt")
+    parser.add_argument("--sizes", nargs="*", default=["50x200", "100x1000"])
+    parser.add_argument("--starts", type=int, nargs="*", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--time-limit", type=float, default=120.0)
+    parser.add_argument("--warm-start", action="store_true")
+    args = parser.parse_args()
+
+    cases = [("instance", read_instance(args.instance))]
+    for size in args.sizes:
+        m, n = map(int, size.split("x"))
+        cases.append((f"random-{size}", generate_instance(m, n, seed=m)))
+
+    print(f"{'case':>16} {'solver':>14} {'time[s]':>9} {'cost':>14} {'gap[%]':>7}")
+    for name, instance in cases:
+        reference = solve_benders(instance, time_limit=args.time_limit, output=False).lower_bound
+        print(f"{name:>16} {'reference':>14} {'':>9} {reference:>14.3f}")
+        heuristic = None
+        for starts in args.starts:
+            heuristic = solve_local_search(instance, starts=starts, workers=args.workers)
+            print(f"{name:>16} {f'local x{starts}':>14} {heuristic.elapsed:>9.3f} {heuristic.cost:>14.3f} "
+                  f"{100 * (heuristic.cost - reference) / heuristic.cost:>7.3f}")
+        if args.warm_start:
+            for label, initial in (("mip", None), ("mip + start", heuristic)):
+                result = solve_mip(instance, time_limit=args.time_limit, output=False, initial=initial)
+                print(f"{name:>16} {label:>14} {result.elapsed:>9.3f} {result.cost:>14.3f} "
+                      f"{100 * result.gap:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
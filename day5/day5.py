@@ -0,0 +1,27 @@
+from day5.facility import read_instance, solve_benders, solve_mip
+
+
+def solve_facility_location(file_path, method="benders", time_limit=None):
+    """Opens warehouses and assigns the clients of day5 at minimum total cost.
+
+    method "benders" runs the Benders decomposition of day5/facility.py;
+    "mip" solves the strong formulation with HiGHS.
+    """
+    instance = read_instance(file_path)
+    if method == "benders":
+        result = solve_benders(instance, time_limit=time_limit, output=False)
+    elif method == "mip":
+        result = solve_mip(instance, time_limit=time_limit, output=False)
+    else:
+        raise ValueError(f"Unknown method: {method}")
+
+    for warehouse in result.open.tolist():
+        clients = (result.assignment[warehouse] > 1e-9).nonzero()[0]
+        print(f"Warehouse {warehouse} serves clients: {clients.tolist()}")
+    print(f"Total cost: {result.cost:.3f} (bound {result.lower_bound:.3f}, gap {100 * result.gap:.3f}%) "
+          f"in {result.elapsed:.2f}s")
+    return result
+
+
+if __name__ == "__main__":
+    solve_facility_location('day5/instance.txt')
@@ -0,0 +1,430 @@
+"""Capacitated facility location for day5.
+
+An instance (OR-Library "cap" format) has m warehouses with a capacity s_i
+and a fixed opening cost f_i, and n clients with a demand d_j. c_ij is the
+cost of serving all of client j's demand from warehouse i. A client may be
+split between warehouses:
+
+    min  sum_i f_i y_i + sum_ij c_ij x_ij
+    s.t. sum_i x_ij = 1                 for every client j
+         sum_j d_j x_ij <= s_i y_i      for every warehouse i
+         x_ij <= y_i                    (the strong linking rows)
+         y binary, x >= 0
+
+Two exact methods:
+
+- solve_mip: the strong formulation above, in mathopt or handed to HiGHS
+  as CSC arrays. The HiGHS run records its bound progress with a callback.
+- solve_benders: Benders decomposition over y. For fixed y the rest is a
+  transportation LP. It is built once as arrays, and each iteration only
+  changes column bounds, so HiGHS warm-starts from the previous basis. The
+  row and column duals give the cut eta >= sum_j v_j + sum_i g_i y_i,
+  computed with array operations. The master splits eta into per-client
+  eta_j with closed-form cuts from the uncapacitated relaxation
+  (client_cuts), which give it most of its bound early. It first solves
+  its LP relaxation (cuts at fractional y are valid too) and then the
+  binary problem. The covering row
+  sum_i s_i y_i >= sum_j d_j keeps every subproblem feasible, so no
+  feasibility cuts are needed.
+
+Both return a FacilityResult with the bound history [(seconds, lower, upper)].
+"""
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+import numpy as np
+from highspy import Highs, HighsLp, HighsSolution, HighsVarType, MatrixFormat, ObjSense, cb
+from ortools.math_opt.python import mathopt
+
+from common.cache import cached
+from common.results import variable_array
+
+
+@dataclass
+class FacilityInstance:
+    capacity: np.ndarray  # (m,)
+    fixed_cost: np.ndarray  # (m,)
+    demand: np.ndarray  # (n,)
+    cost: np.ndarray  # (m, n): cost of serving all of client j from warehouse i
+
+    @property
+    def n_warehouses(self):
+        return len(self.capacity)
+
+    @property
+    def n_clients(self):
+        return len(self.demand)
+
+
+@dataclass
+class FacilityResult:
+    open: np.ndarray  # indices of the open warehouses
+    assignment: np.ndarray  # (m, n) fraction of each client served by each warehouse
+    cost: float
+    lower_bound: float
+    elapsed: float
+    history: list = field(default_factory=list)  # (seconds, lower bound, upper bound)
+
+    @property
+    def gap(self):
+        return max(self.cost - self.lower_bound, 0.0) / abs(self.cost) if self.cost else 0.0
+
+
+def read_instance(file_path):
+    """The FacilityInstance of a day5 file, through the instance cache (its arrays are read-only)."""
+    data = cached("day5.facility", [file_path], lambda: parse_instance(file_path))
+    return FacilityInstance(data["capacity"], data["fixed_cost"], data["demand"], data["cost"])
+
+
+def parse_instance(file_path):
+    """Parses a day5 instance (header, m "capacity fixed_cost" lines, then demand and m costs per client)."""
+    with open(file_path, 'r') as file:
+        data = "".join(line for line in file if not line.lstrip().startswith("#"))
+    values = np.array(data.split(), dtype=np.float64)
+    m, n = int(values[0]), int(values[1])
+    warehouses = values[2:2 + 2 * m].reshape(m, 2)
+    clients = values[2 + 2 * m:2 + 2 * m + n * (m + 1)].reshape(n, m + 1)
+    return {"capacity": warehouses[:, 0].copy(), "fixed_cost": warehouses[:, 1].copy(),
+            "demand": clients[:, 0].copy(), "cost": np.ascontiguousarray(clients[:, 1:].T)}
+
+
+def generate_instance(n_warehouses, n_clients, capacity_ratio=3.0, seed=0):
+    """Random instance in the style of Cornuejols, Sridharan and Thizy (1991).
+
+    Points are uniform in the unit square. Demands are in [5, 35) and
+    capacities in [10, 160), scaled so that the total capacity is
+    capacity_ratio times the total demand. Fixed costs grow with the square
+    root of the capacity, and c_ij = 10 * distance * d_j.
+    """
+    rng = np.random.default_rng(seed)
+    warehouses, clients = rng.random((n_warehouses, 2)), rng.random((n_clients, 2))
+    demand = rng.uniform(5, 35, n_clients).round()
+    capacity = rng.uniform(10, 160, n_warehouses)
+    capacity = (capacity * capacity_ratio * demand.sum() / capacity.sum()).round()
+    fixed_cost = (rng.uniform(0, 90, n_warehouses) + rng.uniform(100, 110, n_warehouses) * np.sqrt(capacity)).round()
+    distance = np.linalg.norm(warehouses[:, None, :] - clients[None, :, :], axis=2)
+    return FacilityInstance(capacity, fixed_cost, demand, (10 * distance * demand).round(3))
+
+
+def _result(instance, y, x, lower_bound, start, history):
+    opened = np.flatnonzero(y > 0.5)
+    cost = float(instance.fixed_cost[opened].sum() + (instance.cost * x).sum())
+    return FacilityResult(opened, x, cost, lower_bound, time.perf_counter() - start, history)
+
+
+# ---------------------------------------------------------------- strong MIP
+
+def build_strong_model(instance):
+    """The strong formulation in mathopt; returns (model, y, x) with x as an (m, n) object array."""
+    m, n = instance.n_warehouses, instance.n_clients
+    model = mathopt.Model(name="facility_location")
+    y = [model.add_binary_variable(name=f"y_{i}") for i in range(m)]
+    x = np.array([[model.add_variable(lb=0.0, ub=1.0, name=f"x_{i}_{j}") for j in range(n)] for i in range(m)])
+    for j in range(n):
+        model.add_linear_constraint(mathopt.fast_sum(x[:, j].tolist()) == 1, name=f"client_{j}")
+    for i in range(m):
+        served = mathopt.fast_sum(d * var for d, var in zip(instance.demand.tolist(), x[i].tolist()))
+        model.add_linear_constraint(served <= instance.capacity[i] * y[i], name=f"capacity_{i}")
+        for j in range(n):
+            model.add_linear_constraint(x[i, j] <= y[i])
+    model.minimize(mathopt.fast_sum(f * var for f, var in zip(instance.fixed_cost.tolist(), y)) +
+                   mathopt.fast_sum(c * var for c, var in zip(instance.cost.ravel().tolist(), x.ravel().tolist())))
+    return model, y, x
+
+
+def build_highs_lp(instance):
+    """The strong formulation as a HighsLp. Columns: y_0..y_{m-1}, then x_ij at m + i * n + j.
+
+    Rows: n client rows, m capacity rows, then the m * n linking rows x_ij - y_i <= 0.
+    """
+    m, n = instance.n_warehouses, instance.n_clients
+    k = np.arange(m * n)
+    i, j = np.divmod(k, n)
+    # x_ij: client row j (1), capacity row n + i (d_j), linking row n + m + k (1)
+    x_rows = np.stack([j, n + i, n + m + k], axis=1)
+    x_vals = np.stack([np.ones(m * n), instance.demand[j], np.ones(m * n)], axis=1)
+    # y_i: capacity row n + i (-s_i), linking rows n + m + i * n + j (-1)
+    y_rows = np.concatenate([(n + np.arange(m))[:, None], n + m + np.arange(m * n).reshape(m, n)], axis=1)
+    y_vals = np.concatenate([-instance.capacity[:, None], -np.ones((m, n))], axis=1)
+
+    lp = HighsLp()
+    lp.num_col_ = m + m * n
+    lp.num_row_ = n + m + m * n
+    lp.col_cost_ = np.concatenate([instance.fixed_cost, instance.cost.ravel()])
+    lp.col_lower_ = np.zeros(lp.num_col_)
+    lp.col_upper_ = np.ones(lp.num_col_)
+    lp.row_lower_ = np.concatenate([np.ones(n), np.full(m + m * n, -np.inf)])
+    lp.row_upper_ = np.concatenate([np.ones(n), np.zeros(m + m * n)])
+    lp.integrality_ = [HighsVarType.kInteger] * m + [HighsVarType.kContinuous] * (m * n)
+    lp.a_matrix_.format_ = MatrixFormat.kColwise
+    lp.a_matrix_.num_col_ = lp.num_col_
+    lp.a_matrix_.num_row_ = lp.num_row_
+    lp.a_matrix_.start_ = np.concatenate([[0], np.cumsum([n + 1] * m + [3] * (m * n))]).astype(np.int32)
+    lp.a_matrix_.index_ = np.concatenate([y_rows.ravel(), x_rows.ravel()]).astype(np.int32)
+    lp.a_matrix_.value_ = np.concatenate([y_vals.ravel(), x_vals.ravel()])
+    return lp
+
+
+def solve_mip(instance, backend="highs", time_limit=None, output=True, initial=None):
+    """Solves the strong formulation; returns a FacilityResult.
+
+    initial, a FacilityResult (e.g. from day5/local_search.py), is passed to
+    the solver as a MIP start.
+    """
+    start = time.perf_counter()
+    m, n = instance.n_warehouses, instance.n_clients
+    if initial is not None:
+        initial_y = np.zeros(m)
+        initial_y[initial.open] = 1.0
+    if backend == "mathopt":
+        model, y, x = build_strong_model(instance)
+        params = mathopt.SolveParameters(enable_output=output)
+        if time_limit is not None:
+            params.time_limit = timedelta(seconds=time_limit)
+        model_params = None
+        if initial is not None:
+            hint = dict(zip(y, initial_y.tolist())) | dict(zip(x.ravel().tolist(), initial.assignment.ravel().tolist()))
+            model_params = mathopt.ModelSolveParameters(solution_hints=[mathopt.SolutionHint(variable_values=hint)])
+        result = mathopt.solve(model, mathopt.SolverType.HIGHS, params=params, model_params=model_params)
+        if not result.has_primal_feasible_solution():
+            raise RuntimeError(f"Model failed to solve: {result.termination}")
+        y_values = variable_array(result, y)
+        x_values = variable_array(result, x.ravel().tolist()).reshape(m, n)
+        bound = result.termination.objective_bounds.dual_bound
+        return _result(instance, y_values, x_values, bound, start, [(time.perf_counter() - start, bound,
+                                                                     result.objective_value())])
+    if backend != "highs":
+        raise ValueError(f"Unknown backend: {backend}")
+
+    highs = Highs()
+    highs.setOptionValue("output_flag", output)
+    if time_limit is not None:
+        highs.setOptionValue("time_limit", float(time_limit))
+    highs.passModel(build_highs_lp(instance))
+    if initial is not None:
+        solution = HighsSolution()
+        solution.col_value = np.concatenate([initial_y, initial.assignment.ravel()]).tolist()
+        solution.value_valid = True
+        highs.setSolution(solution)
+    history = []
+
+    def record(callback_type, message, data_out, data_in, user_data):
+        bounds = (data_out.mip_dual_bound, data_out.mip_primal_bound)
+        if not history or bounds != history[-1][1:]:
+            history.append((time.perf_counter() - start, *bounds))
+
+    highs.setCallback(record, None)
+    highs.startCallback(cb.HighsCallbackType.kCallbackMipInterrupt)
+    highs.startCallback(cb.HighsCallbackType.kCallbackMipImprovingSolution)
+    highs.run()
+    status = highs.modelStatusToString(highs.getModelStatus())
+    info = highs.getInfo()
+    if status not in ("Optimal", "Time limit reached") or info.primal_solution_status != 2:
+        raise RuntimeError(f"Model failed to solve: {status}")
+    values = np.asarray(highs.getSolution().col_value)
+    bound = info.mip_dual_bound
+    history.append((time.perf_counter() - start, bound, info.objective_function_value))
+    return _result(instance, values[:m], values[m:].reshape(m, n), bound, start, history)
+
+
+# ---------------------------------------------------------------- Benders
+
+class TransportationSubproblem:
+    """The LP over x for a fixed y, kept in one Highs object and re-solved with new bounds.
+
+    Columns x_ij at i * n + j, then z_i at m * n + i, fixed to y_i. Rows: n
+    client rows (= 1), then m capacity rows sum_j d_j x_ij - s_i z_i <= 0.
+    y only appears in column bounds, so a single changeColsBounds call moves
+    the subproblem to a new y. The dual of the bounds fixing z_i then carries
+    the capacity term of the cut.
+    """
+
+    def __init__(self, instance):
+        m, n = instance.n_warehouses, instance.n_clients
+        self.instance = instance
+        k = np.arange(m * n)
+        i, j = np.divmod(k, n)
+        lp = HighsLp()
+        lp.num_col_, lp.num_row_ = m * n + m, n + m
+        lp.col_cost_ = np.concatenate([instance.cost.ravel(), np.zeros(m)])
+        lp.col_lower_ = np.zeros(m * n + m)
+        lp.col_upper_ = np.ones(m * n + m)
+        lp.row_lower_ = np.concatenate([np.ones(n), np.full(m, -np.inf)])
+        lp.row_upper_ = np.concatenate([np.ones(n), np.zeros(m)])
+        lp.a_matrix_.format_ = MatrixFormat.kColwise
+        lp.a_matrix_.num_col_, lp.a_matrix_.num_row_ = m * n + m, n + m
+        lp.a_matrix_.start_ = np.concatenate([2 * np.arange(m * n + 1), 2 * m * n + 1 + np.arange(m)]).astype(np.int32)
+        lp.a_matrix_.index_ = np.concatenate([np.stack([j, n + i], axis=1).ravel(), n + np.arange(m)]).astype(np.int32)
+        lp.a_matrix_.value_ = np.concatenate([np.stack([np.ones(m * n), instance.demand[j]], axis=1).ravel(),
+                                              -instance.capacity])
+        self.highs = Highs()
+        self.highs.setOptionValue("output_flag", False)
+        self.highs.passModel(lp)
+        self._columns = np.arange(m * n + m, dtype=np.int32)
+
+    def solve(self, y):
+        """Returns (Q(y), x as (m, n), cut constant, cut coefficients) with Q(y') >= constant + coefficients . y'."""
+        instance = self.instance
+        m, n = instance.n_warehouses, instance.n_clients
+        y = np.clip(np.asarray(y, dtype=np.float64), 0.0, 1.0)
+        self.highs.changeColsBounds(m * n + m, self._columns, np.concatenate([np.zeros(m * n), y]),
+                                    np.concatenate([np.repeat(y, n), y]))
+        self.highs.run()
+        status = self.highs.modelStatusToString(self.highs.getModelStatus())
+        if status != "Optimal":
+            raise RuntimeError(f"Transportation subproblem failed: {status}")
+        solution = self.highs.getSolution()
+        col_dual = np.asarray(solution.col_dual)
+        # x duals below zero belong to the upper bounds y_i (those above zero to the lower bounds 0)
+        bound_dual = np.minimum(col_dual[:m * n], 0.0).reshape(m, n)
+        constant = np.asarray(solution.row_dual)[:n].sum()
+        coefficients = col_dual[m * n:] + bound_dual.sum(axis=1)
+        x = np.asarray(solution.col_value)[:m * n].reshape(m, n)
+        return self.highs.getInfo().objective_function_value, x, constant, coefficients
+
+
+def client_cuts(instance, order, y):
+    """Per-client cuts eta_j >= constant_j + coefficients[:, j] . y from the uncapacitated relaxation.
+
+    Without capacities, client j takes its cheapest warehouses (`order`, the
+    argsort of cost along axis 0) until their y add up to 1. The warehouse k
+    that completes the sum fixes the dual: eta_j >= c_kj - sum_i (c_kj - c_ij)^+ y_i.
+    """
+    n = instance.n_clients
+    cumulative = np.cumsum(y[order], axis=0)
+    critical = order[np.argmax(cumulative >= 1 - 1e-9, axis=0), np.arange(n)]
+    constant = instance.cost[critical, np.arange(n)]
+    return constant, np.minimum(instance.cost - constant, 0.0)
+
+
+def solve_benders(instance, time_limit=None, tolerance=1e-6, output=True, initial=None):
+    """Benders decomposition: LP-relaxed master phase, then binary master; returns a FacilityResult.
+
+    The master carries eta >= sum_j eta_j, with eta_j bounded by the
+    per-client cuts of client_cuts (added when violated), and eta bounded by
+    the capacitated cuts of the transportation subproblem. The open
+    warehouses of `initial` (a FacilityResult), or all of them, give the
+    first incumbent.
+    """
+    start = time.perf_counter()
+    deadline = np.inf if time_limit is None else start + time_limit
+    m, n = instance.n_warehouses, instance.n_clients
+    subproblem = TransportationSubproblem(instance)
+    order = np.argsort(instance.cost, axis=0)
+
+    # Master columns: y_0..y_{m-1}, eta at m, eta_j at m + 1 + j; min f.y + eta
+    # Rows: sum_i s_i y_i >= sum_j d_j and eta - sum_j eta_j >= 0
+    master = Highs()
+    master.setOptionValue("output_flag", False)
+    master.setOptionValue("mip_rel_gap", tolerance)
+    lp = HighsLp()
+    lp.num_col_, lp.num_row_ = m + 1 + n, 2
+    lp.col_cost_ = np.concatenate([instance.fixed_cost, [1.0], np.zeros(n)])
+    lp.col_lower_ = np.zeros(m + 1 + n)
+    lp.col_upper_ = np.concatenate([np.ones(m), np.full(n + 1, np.inf)])
+    lp.row_lower_ = np.array([instance.demand.sum(), 0.0])
+    lp.row_upper_ = np.array([np.inf, np.inf])
+    lp.a_matrix_.format_ = MatrixFormat.kColwise
+    lp.a_matrix_.num_col_, lp.a_matrix_.num_row_ = m + 1 + n, 2
+    lp.a_matrix_.start_ = np.arange(m + 2 + n).astype(np.int32)
+    lp.a_matrix_.index_ = np.concatenate([np.zeros(m), np.ones(n + 1)]).astype(np.int32)
+    lp.a_matrix_.value_ = np.concatenate([instance.capacity, [1.0], -np.ones(n)])
+    master.passModel(lp)
+    master.changeObjectiveSense(ObjSense.kMinimize)
+    y_columns = np.arange(m, dtype=np.int32)
+
+    def add_cut(constant, coefficients):
+        # eta - coefficients . y >= constant
+        master.addRow(constant, np.inf, m + 1, np.arange(m + 1, dtype=np.int32), np.append(-coefficients, 1.0))
+
+    def add_client_cuts(y, eta_clients):
+        # eta_j - coefficients[:, j] . y >= constant_j, for the clients whose cut is violated
+        constant, coefficients = client_cuts(instance, order, y)
+        violated = np.flatnonzero(constant + coefficients.T @ y > eta_clients + 1e-6 * np.maximum(constant, 1.0))
+        if not len(violated):
+            return
+        block = coefficients[:, violated].T
+        rows, cols = np.nonzero(block)
+        ends = np.cumsum(np.bincount(rows, minlength=len(violated)) + 1)  # each row ends with eta_j
+        indices = np.empty(ends[-1], dtype=np.int32)
+        values = np.empty(ends[-1])
+        position = np.arange(len(rows)) + rows  # rows come sorted: shift past the earlier eta_j entries
+        indices[position], values[position] = cols, -block[rows, cols]
+        indices[ends - 1], values[ends - 1] = m + 1 + violated, 1.0
+        starts = np.concatenate([[0], ends[:-1]])
+        master.addRows(len(violated), constant[violated], np.full(len(violated), np.inf), len(indices),
+                       starts.astype(np.int32), indices, values)
+
+    add_client_cuts(np.ones(m), np.zeros(n))
+    core, converged = np.ones(m), False
+    lower, upper, best, history = -np.inf, np.inf, None, []
+    # First incumbent, so that there is one even if the time limit strikes at once: every warehouse open
+    # (always feasible when any solution is) unless `initial` gives one
+    trial = np.ones(m)
+    if initial is not None:
+        trial = np.zeros(m)
+        trial[initial.open] = 1.0
+    value, x, constant, coefficients = subproblem.solve(trial)
+    add_cut(constant, coefficients)
+    upper, best = instance.fixed_cost @ trial + value, (trial, x)
+    for integral in (False, True):
+        if integral:
+            master.changeColsIntegrality(m, y_columns, np.array([HighsVarType.kInteger] * m))
+            converged = False
+        while time.perf_counter() < deadline:
+            master.setOptionValue("time_limit", max(deadline - time.perf_counter(), 1e-3) if time_limit else np.inf)
+            if integral:
+                # Loose master gaps while the overall gap is large; exact once y stops moving
+                gap = (upper - lower) / max(abs(upper), 1.0)
+                master.setOptionValue("mip_rel_gap", tolerance if converged else max(tolerance, gap / 4))
+                master.setOptionValue("objective_bound", upper)
+            master.run()
+            status = master.modelStatusToString(master.getModelStatus())
+            if status == "Time limit reached":
+                if integral:
+                    lower = max(lower, master.getInfo().mip_dual_bound)
+                break
+            if integral and status == "Infeasible":
+                lower = upper  # nothing beats the incumbent (objective_bound cuts off the rest)
+                break
+            if status != "Optimal":
+                raise RuntimeError(f"Benders master failed: {status}")
+            columns = np.asarray(master.getSolution().col_value)
+            y, eta = columns[:m], columns[m]
+            # The relaxed master bounds the problem too; a binary master solved to a gap bounds it with its dual bound
+            lower = max(lower, master.getInfo().mip_dual_bound if integral else master.getInfo().objective_function_value)
+
+            add_client_cuts(y, columns[m + 1:])
+            separate = True
+            if not integral:
+                # In-out stabilisation: cut at a point between y and the core point first,
+                # and only at y itself when that cut does not separate it
+                core = 0.5 * (core + y)
+                value, x, constant, coefficients = subproblem.solve(core)
+                add_cut(constant, coefficients)
+                separate = constant + coefficients @ y <= eta + tolerance * max(abs(lower), 1.0)
+            if separate:
+                value, x, constant, coefficients = subproblem.solve(y)
+                add_cut(constant, coefficients)
+            converged = separate and value - eta <= tolerance * max(abs(lower), 1.0)
+            if integral:
+                trial = y.round()
+            else:
+                # Feasible y for the upper bound: open every warehouse the relaxation uses
+                trial = (y > 1e-6).astype(np.float64)
+                value, x, constant, coefficients = subproblem.solve(trial)
+                add_cut(constant, coefficients)
+            if instance.fixed_cost @ trial + value < upper:
+                upper, best = instance.fixed_cost @ trial + value, (trial, x)
+
+            history.append((time.perf_counter() - start, lower, upper))
+            if output:
+                print(f"benders {'mip' if integral else 'lp':>3} {len(history):>4} bound {lower:>14.3f} "
+                      f"best {upper:>14.3f} rows {master.getNumRow():>7} {history[-1][0]:>8.2f}s")
+            if upper - lower <= tolerance * max(abs(upper), 1.0) or (converged and not integral):
+                break  # optimal, or the relaxation is solved and the binary phase starts
+        if upper - lower <= tolerance * max(abs(upper), 1.0):
+            break
+
+    return _result(instance, best[0], best[1], lower, start, history)
@@ -0,0 +1,184 @@
+"""Local search for day5: near-optimal facility plans in milliseconds.
+
+A plan is the set of open warehouses. Every client is first sent to its
+cheapest open warehouse; evaluate() then repairs the overloaded warehouses
+by moving demand, cheapest extra cost per unit first, to open warehouses
+with spare capacity (clients may be split, as in the exact model).
+
+From the best and second-best open warehouse of every client (nearest),
+the uncapacitated cost change of all moves is computed in batch:
+
+- open i:          f_i + sum_j min(c_ij - b_j, 0)
+- close i:         -f_i + sum_{j served by i} (s_j - b_j)
+- swap k in, i out: the open term of k, -f_i, and for the clients of i
+                   min(c_kj, s_j) - min(c_kj, b_j), summed with one matmul
+
+where b_j and s_j are the best and second-best costs of client j. Moves
+that leave less capacity than the total demand are skipped. The
+`candidates` most promising moves are evaluated exactly (with the repair)
+and the first that improves the plan is taken; the search stops when none
+does.
+
+Pair swaps (add k, drop two) are estimated too, for the closed warehouses
+with the best open term. Starts come from random_plan: all warehouses open,
+then greedy randomised plans.
+
+solve_local_search runs several starts, in a process pool when workers > 1,
+polishes the best plan with the transportation LP and returns a
+FacilityResult. Its lower_bound is -inf (no bound is
+proved); pass it as `initial` to solve_mip or solve_benders to warm-start
+the exact methods.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from day5.facility import FacilityResult, TransportationSubproblem
+
+
+def nearest(cost, is_open):
+    """Best open warehouse of each client, its cost and the second-best cost (inf if there is none)."""
+    masked = np.where(is_open[:, None], cost, np.inf)
+    if len(cost) < 2:
+        return np.zeros(cost.shape[1], dtype=np.int64), masked[0], np.full(cost.shape[1], np.inf)
+    two = np.argpartition(masked, 1, axis=0)[:2]
+    columns = np.arange(cost.shape[1])
+    best = two[0]
+    return best, masked[best, columns], masked[two[1], columns]
+
+
+def move_deltas(instance, is_open, pair_width=16):
+    """Uncapacitated cost change of every move: (delta, add, drop, drop2), -1 where a move adds or drops nothing.
+
+    Pair swaps (add k, drop two) are tried for the pair_width closed
+    warehouses with the best open term. Moves that leave too little
+    capacity are left out.
+    """
+    cost, fixed, capacity = instance.cost, instance.fixed_cost, instance.capacity
+    m = instance.n_warehouses
+    best, best_cost, second_cost = nearest(cost, is_open)
+    served = np.zeros((cost.shape[1], m))
+    served[np.arange(cost.shape[1]), best] = 1.0
+    spare = capacity[is_open].sum() - instance.demand.sum()
+    closed, opened = np.flatnonzero(~is_open), np.flatnonzero(is_open)
+
+    open_delta = fixed[closed] + np.minimum(cost[closed] - best_cost, 0.0).sum(axis=1)
+    close_delta = np.nan_to_num(second_cost - best_cost, posinf=1e30) @ served[:, opened] - fixed[opened]
+    # Clients of i that k takes anyway are already counted in the open term of k
+    lost = np.nan_to_num(np.minimum(cost[closed], second_cost) - np.minimum(cost[closed], best_cost),
+                         posinf=1e30) @ served[:, opened]
+    swap_delta = open_delta[:, None] - fixed[opened][None, :] + lost
+    # Add k, drop i and i2 (clients of i whose second best is i2 are undercounted: exact evaluation follows)
+    top = np.argsort(open_delta)[:pair_width]
+    pair_delta = swap_delta[top][:, :, None] + (lost[top] - fixed[opened][None, :])[:, None, :]
+
+    none = np.full(1, -1)
+    k, i = np.meshgrid(closed, opened, indexing="ij")
+    t, i1, i2 = np.meshgrid(closed[top], opened, opened, indexing="ij")
+    delta = np.concatenate([open_delta, close_delta, swap_delta.ravel(), pair_delta.ravel()])
+    add = np.concatenate([closed, np.repeat(none, len(opened)), k.ravel(), t.ravel()])
+    drop = np.concatenate([np.repeat(none, len(closed)), opened, i.ravel(), i1.ravel()])
+    drop2 = np.concatenate([np.repeat(none, len(closed) + len(opened) + k.size), i2.ravel()])
+    keep = (capacity[drop] * (drop >= 0) + capacity[drop2] * (drop2 >= 0)
+            - capacity[add] * (add >= 0) <= spare) & ((drop2 < 0) | (drop < drop2))
+    return delta[keep], add[keep], drop[keep], drop2[keep]
+
+
+def evaluate(instance, is_open):
+    """Cost of a plan and its (m, n) assignment: cheapest open warehouse, then the capacity repair."""
+    cost, demand, m = instance.cost, instance.demand, instance.n_warehouses
+    best, _, _ = nearest(cost, is_open)
+    x = np.zeros(cost.shape)
+    x[best, np.arange(len(demand))] = 1.0
+    residual = np.where(is_open, instance.capacity, 0.0) - x @ demand
+
+    for i in np.flatnonzero(residual < -1e-9).tolist():
+        while residual[i] < -1e-9:
+            clients = np.flatnonzero(x[i] > 0)
+            targets = np.flatnonzero(residual > 1e-9)
+            # Extra cost per unit of demand of moving each client of i to each target
+            extra = (cost[np.ix_(targets, clients)] - cost[i, clients]) / demand[clients]
+            k, j = np.unravel_index(np.argmin(extra), extra.shape)
+            k, j = targets[k], clients[j]
+            amount = min(-residual[i], x[i, j] * demand[j], residual[k])
+            x[i, j] -= amount / demand[j]
+            x[k, j] += amount / demand[j]
+            residual[i] += amount
+            residual[k] -= amount
+    return float(instance.fixed_cost @ is_open + (cost * x).sum()), x
+
+
+def local_search(instance, is_open, candidates=8):
+    """Improves the plan is_open until no candidate move helps; returns (cost, is_open)."""
+    value, _ = evaluate(instance, is_open)
+    while True:
+        delta, add, drop, drop2 = move_deltas(instance, is_open)
+        for move in np.argsort(delta)[:candidates].tolist():
+            trial = is_open.copy()
+            trial[[index for index in (drop[move], drop2[move]) if index >= 0]] = False
+            if add[move] >= 0:
+                trial[add[move]] = True
+            trial_value, _ = evaluate(instance, trial)
+            if trial_value < value - 1e-9:
+                value, is_open = trial_value, trial
+                break
+        else:
+            return value, is_open
+
+
+def random_plan(instance, seed, noise=0.5):
+    """Greedy randomised start: warehouses by estimated cost per unit of capacity, until the demand is covered.
+
+    The estimate is f_i / s_i plus the mean cost per unit of demand of
+    serving the clients from i, scaled by a random factor in [1, 1 + noise)
+    (seed 0: no noise). Seed -1 opens every warehouse instead, so that the
+    search starts by closing.
+    """
+    if seed == -1:
+        return np.ones(instance.n_warehouses, dtype=bool)
+    unit_cost = instance.fixed_cost / instance.capacity + (instance.cost / instance.demand).mean(axis=1)
+    if seed:
+        unit_cost = unit_cost * np.random.default_rng(seed).uniform(1, 1 + noise, len(unit_cost))
+    order = np.argsort(unit_cost)
+    covered = np.cumsum(instance.capacity[order]) >= instance.demand.sum()
+    is_open = np.zeros(instance.n_warehouses, dtype=bool)
+    is_open[order[:np.argmax(covered) + 1]] = True
+    return is_open
+
+
+def _run_start(instance, seed, candidates):
+    return local_search(instance, random_plan(instance, seed), candidates)
+
+
+def solve_local_search(instance, starts=8, workers=None, candidates=8, polish=True):
+    """Multi-start local search; returns the best plan found as a FacilityResult.
+
+    The starts are random_plan seeds -1, 0, 1, ... They run in a process pool
+    of `workers` processes (default: one per CPU, capped at `starts`);
+    workers=1 runs them in this process. With polish, the clients of the
+    best plan are reassigned optimally with the transportation LP of
+    day5/facility.py instead of the repair.
+    """
+    begin = time.perf_counter()
+    seeds = list(range(-1, starts - 1))
+    workers = min(workers or os.cpu_count() or 1, starts)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            runs = list(pool.map(_run_start, [instance] * starts, seeds, [candidates] * starts))
+    else:
+        runs = [_run_start(instance, seed, candidates) for seed in seeds]
+
+    history, upper = [], np.inf
+    for value, _ in runs:
+        upper = min(upper, value)
+        history.append((time.perf_counter() - begin, -np.inf, upper))
+    value, is_open = min(runs, key=lambda run: run[0])
+    if polish:
+        assignment_cost, x, _, _ = TransportationSubproblem(instance).solve(is_open.astype(np.float64))
+        value = float(instance.fixed_cost @ is_open + assignment_cost)
+        history.append((time.perf_counter() - begin, -np.inf, value))
+    else:
+        _, x = evaluate(instance, is_open)
+    return FacilityResult(np.flatnonzero(is_open), x, value, -np.inf, time.perf_counter() - begin, history)
@@ -0,0 +1,27 @@
+from day6.set_cover import read_cover_instance, solve_cover_mip, solve_lagrangian
+
+
+def solve_railway_cover(file_path, method="lagrangian", time_limit=60.0):
+    """Covers every railway segment at minimum cost.
+
+    method "lagrangian" runs the Lagrangian heuristic of day6/set_cover.py
+    within time_limit seconds; "mip" solves the model exactly with HiGHS (for
+    validation: it takes several minutes on the shipped instance).
+    """
+    instance = read_cover_instance(file_path)
+    if method == "lagrangian":
+        result = solve_lagrangian(instance, time_limit=time_limit)
+    elif method == "mip":
+        result = solve_cover_mip(instance, time_limit=time_limit)
+    else:
+        raise ValueError(f"Unknown method: {method}")
+
+    for column in result.columns.tolist():
+        print(f"Set {column} covers segments: {(instance.column(column) + 1).tolist()}")
+    print(f"Best cover: cost {result.cost} with {len(result.columns)} sets")
+    print(f"Lower bound: {result.lower_bound:.0f} (gap {100 * result.gap:.2f}%) in {result.elapsed:.1f}s")
+    return result
+
+
+if __name__ == "__main__":
+    solve_railway_cover('day6/instance.txt')
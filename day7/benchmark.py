@@ -0,0 +1,87 @@
+"""Build-time benchmark for the day7 set-partitioning model.
+
+Compares the original construction (each product row scans every subset)
+with the inverted-index builds: mathopt rows from product -> subsets, and
+the CSC arrays handed to HiGHS. The presolve time and the reduced size are
+reported too, and --solve solves both the full and the presolved model. Runs on day7/instance.txt and on a synthetic
+instance --scale times larger, written in the same file format so that
+parsing is timed too.
+
+Usage (from the repository root):
+    python -m day7.benchmark --scale 10 --solve
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from day7.day7 import build_scan_model, read_and_parse_instance
+from day7.presolve import presolve
+from day7.set_partition import build_highs_lp, build_partition_model, read_set_family, solve_partition
+
+
+def write_synthetic_instance(file_path, n_products, n_subsets, seed=0):
+    """Random subsets of 2-6 products plus one expensive singleton per product (always feasible)."""
+    rng = np.random.default_rng(seed)
+    with open(file_path, 'w') as file:
+        file.write(f"# Synthetic instance: {n_products} products and {n_subsets} subsets\n")
+        file.write(f"{n_products} {n_subsets}\n")
+        for product in range(1, n_products + 1):
+            file.write(f"{20000} 1 {product}\n")
+        for _ in range(n_subsets - n_products):
+            products = np.sort(rng.choice(np.arange(1, n_products + 1), rng.integers(2, 7), replace=False))
+            cost = 1000 * len(products) + int(rng.integers(0, 5000))
+            file.write(f"{cost} {len(products)} " + " ".join(map(str, products.tolist())) + "\n")
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    value = function(*args)
+    return value, time.perf_counter() - start
+
+
+def run_case(name, file_path, run_scan, solve):
+    timings = {}
+    if run_scan:
+        (dimension, instance), timings["parse dicts"] = timed(read_and_parse_instance, file_path)
+        _, timings["scan build"] = timed(build_scan_model, dimension, instance)
+    family, timings["parse csr"] = timed(read_set_family, file_path)
+    _, timings["index build"] = timed(build_partition_model, family)
+    _, timings["csc build"] = timed(build_highs_lp, family)
+    reduction, timings["presolve"] = timed(presolve, family)
+    if solve:
+        chosen, timings["highs solve"] = timed(solve_partition, family, "highs", None, False)
+        print(f"{name}: optimal cost {int(family.costs[chosen].sum())} with {len(chosen)} subsets")
+        chosen, timings["presolved"] = timed(solve_partition, reduction.family, "highs", None, False)
+        chosen = reduction.restore(chosen)
+        print(f"{name}: presolved cost {int(family.costs[chosen].sum())} with {len(chosen)} subsets")
+
+    print(f"{name}: {family.n_products} products, {family.n_subsets} subsets, {len(family.elements)} nonzeros")
+    print(f"{name}: presolved to {reduction.family.n_products} products, {reduction.family.n_subsets} subsets")
+    for label, elapsed in timings.items():
+        print(f"{name:>12} {label:>12} {elapsed:>9.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instance", default="day7/instance.txt")
+    parser.add_argument("--scale", type=int, default=10, help="subsets multiplier for the synthetic instance")
+    parser.add_argument("--scan-max-subsets", type=int, default=100000,
+                        help="largest instance on which the original scan build is timed")
+    parser.add_argument("--solve", action="store_true", help="also solve with HiGHS (CSC backend)")
+    args = parser.parse_args()
+
+    family = read_set_family(args.instance)
+    run_case("instance", args.instance, family.n_subsets <= args.scan_max_subsets, args.solve)
+
+    n_subsets = args.scale * family.n_subsets
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "synthetic.txt")
+        write_synthetic_instance(file_path, family.n_products, n_subsets)
+        run_case(f"x{args.scale}", file_path, n_subsets <= args.scan_max_subsets, args.solve)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark of sifting (day7/sifting.py) against HiGHS on every column.
+
+Solves day7/instance.txt and a synthetic instance --scale times larger
+(day7.benchmark.write_synthetic_instance) both ways, each in a fresh
+process so that its peak resident memory (ru_maxrss) is its own. The full
+solve reads a SetFamily and passes all the columns to HiGHS; sifting maps
+the column pool from the instance cache (turned on here) and only builds
+the working set.
+The full solve is skipped past --full-max-subsets columns: on the x10
+instance (520k subsets) HiGHS had not returned after 15 minutes with a
+300 s limit.
+
+Usage (from the repository root):
+    python -m day7.benchmark_sifting --scale 10 --time-limit 300
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from highspy import Highs
+
+from common import cache
+from day7.benchmark import write_synthetic_instance
+from day7.set_partition import build_highs_lp, read_set_family
+from day7.sifting import read_pool, solve_sifting
+
+
+def run_full(file_path, time_limit):
+    start = time.perf_counter()
+    family = read_set_family(file_path)
+    highs = Highs()
+    highs.setOptionValue("output_flag", False)
+    highs.setOptionValue("time_limit", float(time_limit))
+    highs.passModel(build_highs_lp(family))
+    highs.run()
+    optimal = highs.modelStatusToString(highs.getModelStatus()) == "Optimal"
+    cost = highs.getInfo().objective_function_value if highs.getInfo().primal_solution_status == 2 else float("inf")
+    return (cost, optimal, family.n_subsets, time.perf_counter() - start,
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+
+
+def run_sifting(file_path, time_limit):
+    start = time.perf_counter()
+    result = solve_sifting(read_pool(file_path), time_limit, output=False)
+    return (result.cost, result.optimal, result.working_set, time.perf_counter() - start,
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+
+
+def run_case(name, file_path, time_limit, full):
+    read_pool(file_path)  # fill the instance cache, so that neither run times the text parse
+    for method, runner in (("highs", run_full), ("sifting", run_sifting)):
+        if method == "highs" and not full:
+            continue
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            cost, optimal, columns, elapsed, peak = executor.submit(runner, file_path, time_limit).result()
+        print(f"{name:>10} {method:>8} {cost:>12.0f} {str(optimal):>7} {columns:>9} {elapsed:>9.2f} {peak:>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instance", default="day7/instance.txt")
+    parser.add_argument("--scale", type=int, default=10, help="subsets multiplier for the synthetic instance")
+    parser.add_argument("--time-limit", type=float, default=300.0)
+    parser.add_argument("--full-max-subsets", type=int, default=100000,
+                        help="largest instance solved with every column (HiGHS overruns its time limit past it)")
+    args = parser.parse_args()
+
+    cache.configure()  # the workers are forked and share it
+    print(f"{'instance':>10} {'method':>8} {'cost':>12} {'optimal':>7} {'columns':>9} {'time[s]':>9} {'peak[MB]':>9}")
+    pool = read_pool(args.instance)
+    run_case("instance", args.instance, args.time_limit, pool.n_subsets <= args.full_max_subsets)
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "synthetic.txt")
+        write_synthetic_instance(file_path, pool.n_products, args.scale * pool.n_subsets)
+        run_case(f"x{args.scale}", file_path, args.time_limit, args.scale * pool.n_subsets <= args.full_max_subsets)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,29 @@
 from ortools.math_opt.python import mathopt
 
+from common.instances import load_set_family
+from day7.presolve import presolve
+from day7.set_partition import SetFamily, family_from_instance, read_set_family, solve_partition
+
 
 # Define the function to parse the file
 def read_and_parse_instance(file_path):
-    result = {}
-    dimensions = {}
-    dimension_read = False
-    with open(file_path, 'r') as file:
-        count = 0
-        for line in file:
-            line = line.strip()
-
-            if line.startswith('#') or not line:
-                continue
-
-            if line and not dimension_read:
-                dimension_read = True
-                n_products, n_subsets = map(int, line.split())
-                dimensions = {"n_products": n_products, "n_subsets": n_subsets}
-                continue
-
-            parts = list(map(int, line.split()))
+    """The instance as dicts: ({"n_products", "n_subsets"}, {subset: {"cost", "elements"}}).
 
-            result[count] = {
-                "cost": parts[0],
-                "elements": parts[2:]
-            }
-            count += 1
+    Built from the CSR arrays of the instance cache, so the text is only
+    parsed when the file changes.
+    """
+    n_products, costs, indptr, elements = load_set_family(file_path, counts=True)
+    dimensions = {"n_products": n_products, "n_subsets": len(costs)}
+    costs, indptr, elements = costs.tolist(), indptr.tolist(), elements.tolist()
+    result = {
+        subset: {"cost": costs[subset], "elements": elements[indptr[subset]:indptr[subset + 1]]}
+        for subset in range(len(costs))
+    }
     return dimensions, result
 
 
-def solve_subset_problem(dimension, instance):
+def build_scan_model(dimension, instance):
+    """Original construction: every product row scans all subsets (kept for benchmarks)."""
     model = mathopt.Model(name="subset_problem")
     x = {
         (subset): model.add_binary_variable(name=f"x_{subset}")
@@ -48,19 +41,38 @@ def solve_subset_problem(dimension, instance):
     model.minimize(
         sum(x[(subset)] * instance[subset]['cost'] for subset in x)
     )
-    params = mathopt.SolveParameters(enable_output=True)
-    result = mathopt.solve(model, mathopt.SolverType.HIGHS, params=params)
-    chosen_subsets = [
-        subset for subset in x
-        if result.variable_values()[x[subset]] > 0.5
-    ]
+    return model, x
+
+
+def solve_subset_problem(dimension, instance, backend="highs", use_presolve=True):
+    """Solves the set-partitioning problem from the inverted product -> subsets index.
+
+    backend "highs" passes the constraint matrix to HiGHS as CSC arrays;
+    "mathopt" builds the rows in mathopt from the same index; "sifting"
+    solves over a working set of columns priced from the LP duals
+    (day7/sifting.py). With use_presolve the family is reduced first
+    (day7/presolve.py) and the solution is mapped back to the original
+    subset ids.
+    """
+    family = instance if isinstance(instance, SetFamily) else family_from_instance(dimension, instance)
+    if use_presolve:
+        reduction = presolve(family)
+        print(f"Presolve: {family.n_products} x {family.n_subsets} -> "
+              f"{reduction.family.n_products} x {reduction.family.n_subsets}, {len(reduction.fixed)} fixed")
+        print(reduction.report())
+        chosen = solve_partition(reduction.family, backend) if reduction.family.n_products else []
+        chosen_subsets = reduction.restore(chosen)
+    else:
+        chosen_subsets = solve_partition(family, backend)
 
-    for subset in chosen_subsets:
-        elements = instance[subset]['elements']
+    for subset in chosen_subsets.tolist():
+        elements = family.subset(subset).tolist()
         print(f"Subset {subset} includes elements: {elements}")
+    return chosen_subsets
 
 
-instance_path = 'day7/instance.txt'
+if __name__ == "__main__":
+    instance_path = 'day7/instance.txt'
 
-dimensions, result = read_and_parse_instance(instance_path)
-solve_subset_problem(dimensions, result)
+    family = read_set_family(instance_path)
+    solve_subset_problem({"n_products": family.n_products, "n_subsets": family.n_subsets}, family)
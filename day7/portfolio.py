@@ -0,0 +1,72 @@
+"""Solver portfolio for the day7 set-partitioning model (common/portfolio.py).
+
+The family is presolved in this process (day7/presolve.py) and the reduced
+problem goes to these backends in parallel:
+
+- "highs": the CSC model of set_partition.build_highs_lp, started with
+  setSolution from the portfolio incumbent when there is one;
+- "cpsat": the same model in CP-SAT, one AddExactlyOne per product, with
+  the incumbent as hints;
+- "cpsat-lns": CP-SAT restricted to large neighbourhood search
+  (use_lns_only), a heuristic that finds partitions but proves nothing.
+
+The shared solution is x (0/1) for every reduced subset; objectives leave
+out the cost of the subsets fixed by the presolve.
+"""
+import numpy as np
+from highspy import Highs
+from ortools.sat.python import cp_model
+
+from common.portfolio import run_portfolio, solve_cpsat, solve_highs
+from day7.presolve import presolve
+from day7.set_partition import build_highs_lp
+
+
+def build_cpsat_model(family, hint=None):
+    """Set partitioning in CP-SAT; returns (model, x). hint is an optional 0/1 array over the subsets."""
+    model = cp_model.CpModel()
+    x = [model.NewBoolVar(f"x_{subset}") for subset in range(family.n_subsets)]
+    for product in range(1, family.n_products + 1):
+        model.AddExactlyOne([x[subset] for subset in family.covering(product).tolist()])
+    model.Minimize(sum(cost * var for cost, var in zip(family.costs.tolist(), x)))
+    if hint is not None:
+        for var, value in zip(x, np.asarray(hint).tolist()):
+            model.AddHint(var, value > 0.5)
+    return model, x
+
+
+def highs_backend(family, incumbent):
+    highs = Highs()
+    highs.setOptionValue("output_flag", False)
+    highs.passModel(build_highs_lp(family))
+    best = incumbent.best()
+    if best is not None:
+        highs.setSolution(family.n_subsets, np.arange(family.n_subsets, dtype=np.int32), best[1])
+    return solve_highs(highs, incumbent, lambda values: values > 0.5)
+
+
+def cpsat_backend(family, incumbent, parameters=None):
+    best = incumbent.best()
+    model, x = build_cpsat_model(family, best[1] if best is not None else None)
+    return solve_cpsat(model, incumbent, x, lambda values: values > 0, parameters)
+
+
+def cpsat_lns_backend(family, incumbent):
+    return cpsat_backend(family, incumbent, {"use_lns_only": True})
+
+
+BACKENDS = {"highs": highs_backend, "cpsat": cpsat_backend, "cpsat-lns": cpsat_lns_backend}
+
+
+def solve_partition_portfolio(family, time_limit=60.0, backends=None, log_path=None):
+    """Presolves and solves `family` with the portfolio; returns (chosen subset ids, PortfolioResult).
+
+    The chosen ids are None if no backend found a partition in time.
+    """
+    reduction = presolve(family)
+    result = run_portfolio(reduction.family, {name: BACKENDS[name] for name in backends or BACKENDS}, time_limit,
+                           size=reduction.family.n_subsets, problem_type="day7-set-partitioning",
+                           log_path=log_path)
+    if result.solution is None:
+        return None, result
+    return reduction.restore(np.flatnonzero(result.solution > 0.5)), result
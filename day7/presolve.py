@@ -0,0 +1,205 @@
+"""Set-partitioning presolve for day7.
+
+Runs between parsing and model building and repeats these rules until a
+pass changes nothing:
+
+- duplicate_columns / dominated_columns: among subsets with the same
+  products, keep only the cheapest (ties keep the lowest id);
+- split_columns: a subset whose products are exactly the union of two
+  disjoint subsets that together cost no more is never needed (only for
+  subsets of at most max_split_size products: all 2^n splits are tried);
+- forced: a product covered by a single subset fixes that subset to 1 and
+  removes all of its products;
+- conflicts: subsets sharing a product with a fixed subset are removed;
+- row_dominance: if every subset covering product p also covers q, a
+  subset that covers q but not p can never be used;
+- duplicate_rows: two products covered by exactly the same subsets keep
+  a single row.
+
+presolve returns a PresolveResult with the reduced SetFamily (products
+renumbered from 1), and restore() maps a reduced solution back to the
+original subset ids.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from day7.set_partition import SetFamily, make_family
+
+RULES = ["duplicate_columns", "dominated_columns", "split_columns", "forced", "conflicts", "row_dominance", "duplicate_rows"]
+
+
+@dataclass
+class PresolveResult:
+    family: SetFamily
+    columns: np.ndarray  # original id of each reduced subset
+    products: np.ndarray  # original id of each reduced product (index 0 unused)
+    fixed: np.ndarray  # original ids of the subsets fixed to 1
+    fixed_cost: int
+    stats: dict = field(default_factory=dict)  # rule -> [rows removed, columns removed]
+
+    def restore(self, chosen):
+        """Original subset ids of a reduced solution plus the fixed subsets (sorted)."""
+        return np.sort(np.concatenate([self.fixed, self.columns[np.asarray(chosen, dtype=np.int64)]]))
+
+    def report(self):
+        lines = [f"{'rule':>18} {'rows':>6} {'columns':>8}"]
+        lines += [f"{rule:>18} {rows:>6} {cols:>8}" for rule, (rows, cols) in self.stats.items()]
+        return "\n".join(lines)
+
+
+def presolve(family, max_split_size=12):
+    """Reduces `family` with the set-partitioning rules above; raises ValueError if it is infeasible."""
+    n_products, n_subsets = family.n_products, family.n_subsets
+    column_of = np.repeat(np.arange(n_subsets), np.diff(family.indptr))
+    col_active = np.ones(n_subsets, dtype=bool)
+    row_active = np.ones(n_products + 1, dtype=bool)
+    row_active[0] = False
+    fixed = []
+    stats = {rule: [0, 0] for rule in RULES}
+
+    def remove_columns(columns, rule):
+        columns = np.asarray(columns, dtype=np.int64)
+        columns = columns[col_active[columns]]
+        col_active[columns] = False
+        stats[rule][1] += len(columns)
+        return len(columns) > 0
+
+    changed = True
+    while changed:
+        changed = False
+        nnz = col_active[column_of] & row_active[family.elements]
+        degree = np.bincount(family.elements[nnz], minlength=n_products + 1)
+        if np.any(row_active & (degree == 0)):
+            raise ValueError("A product is covered by no subset: the instance is infeasible.")
+
+        # Forced subsets and the subsets that conflict with them
+        forced_rows = row_active & (degree == 1)
+        if forced_rows.any():
+            forced = np.unique(column_of[nnz & forced_rows[family.elements]])
+            covered = family.elements[np.isin(column_of, forced) & nnz]
+            if len(covered) != len(np.unique(covered)):
+                raise ValueError("Two forced subsets overlap: the instance is infeasible.")
+            fixed.extend(forced.tolist())
+            col_active[forced] = False
+            row_active[covered] = False
+            stats["forced"][0] += len(covered)
+            stats["forced"][1] += len(forced)
+            touched = np.zeros(n_products + 1, dtype=bool)
+            touched[covered] = True
+            remove_columns(np.unique(column_of[touched[family.elements] & col_active[column_of]]), "conflicts")
+            changed = True
+            continue
+
+        # Subsets with the same active products: only the cheapest survives
+        best = {}
+        for subset in np.flatnonzero(col_active).tolist():
+            products = family.elements[family.indptr[subset]:family.indptr[subset + 1]]
+            key = tuple(np.sort(products[row_active[products]]).tolist())
+            keep = best.setdefault(key, subset)
+            if keep == subset:
+                continue
+            if (family.costs[subset], subset) < (family.costs[keep], keep):
+                best[key], subset, keep = subset, keep, subset
+            rule = "duplicate_columns" if family.costs[subset] == family.costs[keep] else "dominated_columns"
+            changed |= remove_columns([subset], rule)
+        if changed:
+            continue
+
+        if max_split_size >= 2:
+            changed |= remove_columns(_split_dominated(family, column_of, col_active, row_active, best,
+                                                       max_split_size), "split_columns")
+            if changed:
+                continue
+
+        # Row dominance: S_p inside S_q forbids every subset in S_q \ S_p
+        nnz = col_active[column_of] & row_active[family.elements]
+        degree = np.bincount(family.elements[nnz], minlength=n_products + 1)
+        member = np.zeros((n_subsets,), dtype=bool)
+        for p in np.flatnonzero(row_active).tolist():
+            if not row_active[p]:
+                continue
+            covering = np.unique(column_of[nnz & (family.elements == p)])
+            member[:] = False
+            member[covering] = True
+            shared = np.bincount(family.elements[nnz & member[column_of]], minlength=n_products + 1)
+            for q in np.flatnonzero(row_active & (shared == degree[p])).tolist():
+                if q == p:
+                    continue
+                if degree[q] == degree[p]:
+                    row_active[q] = False  # same subsets as p: the row is redundant
+                    stats["duplicate_rows"][0] += 1
+                    changed = True
+                else:
+                    extra = column_of[nnz & (family.elements == q) & ~member[column_of]]
+                    changed |= remove_columns(np.unique(extra), "row_dominance")
+            if changed:
+                break
+
+    return _reduced(family, column_of, col_active, row_active, fixed, stats)
+
+
+def _split_dominated(family, column_of, col_active, row_active, best, max_size):
+    """Active subsets covered exactly by two disjoint active subsets of no greater total cost.
+
+    A product set is hashed as the XOR of random 64-bit product keys, so the
+    hashes of all 2^n sub-sets of a subset come from n doublings and each
+    split is two lookups in the sorted table of subset hashes. Candidates are
+    checked against `best` (sorted products -> subset) before removal, so a
+    hash collision never removes a column.
+    """
+    nnz = col_active[column_of] & row_active[family.elements]
+    products, owner = family.elements[nnz], column_of[nnz]
+    sizes = np.bincount(owner, minlength=family.n_subsets)
+    starts = np.concatenate([[0], np.cumsum(sizes)])
+    keys = np.random.default_rng(0).integers(1, 2 ** 63, size=family.n_products + 1, dtype=np.uint64)
+
+    hashes = np.zeros(family.n_subsets, dtype=np.uint64)
+    np.bitwise_xor.at(hashes, owner, keys[products])
+    columns = np.flatnonzero(col_active)
+    order = np.argsort(hashes[columns])
+    table, table_cost = hashes[columns][order], family.costs[columns][order]
+    present = np.zeros(2 ** 24, dtype=bool)  # low hash bits: skips most lookups of missing sub-sets
+    present[table & np.uint64(2 ** 24 - 1)] = True
+    missing = np.int64(2 ** 61)
+
+    removed = []
+    for size in range(2, max_size + 1):
+        group = columns[sizes[columns] == size]
+        for chunk in np.array_split(group, max(1, len(group) * 2 ** size // 2 ** 22)):
+            if not len(chunk):
+                continue
+            members = products[starts[chunk][:, None] + np.arange(size)]
+            sub_hashes = np.zeros((len(chunk), 1), dtype=np.uint64)
+            for j in range(size):  # bit j of the mask takes the j-th product
+                sub_hashes = np.concatenate([sub_hashes, sub_hashes ^ keys[members[:, j:j + 1]]], axis=1)
+            cost = np.full(sub_hashes.shape, missing)
+            candidate = present[sub_hashes & np.uint64(2 ** 24 - 1)]
+            position = np.minimum(np.searchsorted(table, sub_hashes[candidate]), len(table) - 1)
+            cost[candidate] = np.where(table[position] == sub_hashes[candidate], table_cost[position], missing)
+            split_cost = cost[:, 1:-1] + cost[:, -2:0:-1]  # mask m and its complement
+            mask = np.argmin(split_cost, axis=1) + 1
+            for row in np.flatnonzero(split_cost[np.arange(len(chunk)), mask - 1] <= family.costs[chunk]).tolist():
+                bits = (int(mask[row]) >> np.arange(size)) & 1 == 1
+                part = best.get(tuple(np.sort(members[row][bits]).tolist()))
+                rest = best.get(tuple(np.sort(members[row][~bits]).tolist()))
+                if part is not None and rest is not None and \
+                        family.costs[part] + family.costs[rest] <= family.costs[chunk[row]]:
+                    removed.append(chunk[row])
+    return removed
+
+
+def _reduced(family, column_of, col_active, row_active, fixed, stats):
+    """Builds the reduced SetFamily with renumbered products."""
+    products = np.flatnonzero(row_active)
+    renumber = np.zeros(family.n_products + 1, dtype=np.int64)
+    renumber[products] = np.arange(1, len(products) + 1)
+    columns = np.flatnonzero(col_active)
+
+    keep = col_active[column_of] & row_active[family.elements]
+    counts = np.bincount(column_of[keep], minlength=family.n_subsets)[columns]
+    reduced = make_family(len(products), family.costs[columns],
+                          np.concatenate([[0], np.cumsum(counts)]), renumber[family.elements[keep]])
+    fixed = np.array(sorted(fixed), dtype=np.int64)
+    return PresolveResult(reduced, columns, np.concatenate([[0], products]), fixed,
+                          int(family.costs[fixed].sum()), stats)
@@ -0,0 +1,226 @@
+"""Sparse set-partitioning model for day7.
+
+A SetFamily stores the subsets as CSR arrays (subset -> products) plus the
+inverted index (product -> subsets). Products keep their 1-based ids. The
+subset -> product arrays are also the CSC layout of the constraint matrix
+(one column per subset), so build_highs_lp hands them to HiGHS as they are,
+with no Python expression per row. build_partition_model makes the same
+model in mathopt, one row per product straight from the inverted index.
+solve_partition(backend="sifting") uses the column generation of
+day7/sifting.py instead of passing every column to the solver.
+"""
+from dataclasses import dataclass
+from datetime import timedelta
+
+import numpy as np
+from highspy import Highs, HighsLp, HighsVarType, MatrixFormat
+from ortools.math_opt.python import mathopt
+
+from common import solutions
+from common.instances import load_set_family
+from common.results import chosen_indices
+from day7.sifting import ColumnPool, solve_sifting
+
+
+@dataclass
+class SetFamily:
+    """Subsets in CSR form with the product -> subsets inverted index."""
+    n_products: int
+    costs: np.ndarray
+    indptr: np.ndarray
+    elements: np.ndarray
+    product_indptr: np.ndarray
+    product_subsets: np.ndarray
+
+    @property
+    def n_subsets(self):
+        return len(self.costs)
+
+    def subset(self, subset):
+        return self.elements[self.indptr[subset]:self.indptr[subset + 1]]
+
+    def covering(self, product):
+        return self.product_subsets[self.product_indptr[product]:self.product_indptr[product + 1]]
+
+
+def inverted_index(n_products, indptr, elements):
+    """product -> subsets CSR arrays (row 0 unused: products are 1-based)."""
+    subsets = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    order = np.argsort(elements, kind="stable")
+    product_indptr = np.concatenate([[0], np.cumsum(np.bincount(elements, minlength=n_products + 1))])
+    return product_indptr, subsets[order]
+
+
+def make_family(n_products, costs, indptr, elements):
+    indptr = np.asarray(indptr, dtype=np.int64)
+    elements = np.asarray(elements, dtype=np.int64)
+    return SetFamily(n_products, np.asarray(costs, dtype=np.int64), indptr, elements,
+                     *inverted_index(n_products, indptr, elements))
+
+
+def family_from_instance(dimension, instance):
+    """Converts the dicts of read_and_parse_instance into a SetFamily."""
+    lengths = [len(instance[subset]['elements']) for subset in range(dimension['n_subsets'])]
+    elements = [product for subset in range(dimension['n_subsets']) for product in instance[subset]['elements']]
+    costs = [instance[subset]['cost'] for subset in range(dimension['n_subsets'])]
+    return make_family(dimension['n_products'], costs, np.concatenate([[0], np.cumsum(lengths)]), elements)
+
+
+def read_set_family(file_path):
+    """Parses a day7 instance ("<cost> <count> <products...>" lines) straight into a SetFamily, through the instance cache."""
+    n_products, costs, indptr, elements = load_set_family(file_path, counts=True)
+    return make_family(n_products, costs, indptr, elements)
+
+
+def build_partition_model(family):
+    """Set-partitioning MIP in mathopt, one row per product from the inverted index."""
+    model = mathopt.Model(name="subset_problem")
+    x = [model.add_binary_variable(name=f"x_{subset}") for subset in range(family.n_subsets)]
+    for product in range(1, family.n_products + 1):
+        model.add_linear_constraint(
+            mathopt.fast_sum(x[subset] for subset in family.covering(product).tolist()) == 1,
+            name=f'product_present_{product}'
+        )
+    model.minimize(mathopt.fast_sum(cost * var for cost, var in zip(family.costs.tolist(), x)))
+    return model, x
+
+
+def build_highs_lp(family):
+    """The same MIP as a HighsLp: the subset CSR arrays are the column-wise constraint matrix."""
+    lp = HighsLp()
+    lp.num_col_ = family.n_subsets
+    lp.num_row_ = family.n_products
+    lp.col_cost_ = family.costs.astype(np.float64)
+    lp.col_lower_ = np.zeros(family.n_subsets)
+    lp.col_upper_ = np.ones(family.n_subsets)
+    lp.row_lower_ = np.ones(family.n_products)
+    lp.row_upper_ = np.ones(family.n_products)
+    lp.integrality_ = [HighsVarType.kInteger] * family.n_subsets
+    lp.a_matrix_.format_ = MatrixFormat.kColwise
+    lp.a_matrix_.num_col_ = family.n_subsets
+    lp.a_matrix_.num_row_ = family.n_products
+    lp.a_matrix_.start_ = family.indptr.astype(np.int32)
+    lp.a_matrix_.index_ = (family.elements - 1).astype(np.int32)
+    lp.a_matrix_.value_ = np.ones(len(family.elements))
+    return lp
+
+
+@dataclass
+class PartitionResult:
+    chosen: np.ndarray  # subset ids of the best partition found
+    cost: int
+    lower_bound: float  # HiGHS dual bound
+    optimal: bool  # False when the time limit stopped HiGHS first
+
+
+def solve_partition_highs(family, time_limit=None, output=True, start=None):
+    """Solves the set-partitioning MIP with HiGHS; returns a PartitionResult.
+
+    A run stopped by the time limit gives the best partition found with the
+    dual bound (optimal=False); RuntimeError is raised when there is none.
+    start is an optional partition (subset ids) that HiGHS gets with
+    setSolution.
+    """
+    highs = Highs()
+    highs.setOptionValue("output_flag", output)
+    if time_limit is not None:
+        highs.setOptionValue("time_limit", float(time_limit))
+    highs.passModel(build_highs_lp(family))
+    if start is not None and len(start):
+        highs.setSolution(len(start), np.asarray(start, dtype=np.int32), np.ones(len(start)))
+    highs.run()
+    status = highs.modelStatusToString(highs.getModelStatus())
+    info = highs.getInfo()
+    if status not in ("Optimal", "Time limit reached") or info.primal_solution_status != 2:
+        raise RuntimeError(f"Model failed to solve: {status}")
+    chosen = np.flatnonzero(np.asarray(highs.getSolution().col_value) > 0.5)
+    return PartitionResult(chosen, int(family.costs[chosen].sum()), info.mip_dual_bound, status == "Optimal")
+
+
+def solve_partition(family, backend="highs", time_limit=None, output=True, start=None):
+    """Solves the set-partitioning MIP and returns the chosen subset ids (sorted int64 array).
+
+    start is an optional partition (subset ids) that HiGHS gets with
+    setSolution. With HiGHS, a run stopped by the time limit returns the
+    best partition found (solve_partition_highs also gives its bound).
+    """
+    if backend == "highs":
+        return solve_partition_highs(family, time_limit, output, start).chosen
+
+    if backend == "mathopt":
+        model, x = build_partition_model(family)
+        params = mathopt.SolveParameters(enable_output=output)
+        if time_limit is not None:
+            params.time_limit = timedelta(seconds=time_limit)
+        result = mathopt.solve(model, mathopt.SolverType.HIGHS, params=params)
+        if result.termination.reason != mathopt.TerminationReason.OPTIMAL:
+            raise RuntimeError(f"Model failed to solve: {result.termination}")
+        return chosen_indices(result, x)
+    if backend == "sifting":
+        result = solve_sifting(ColumnPool.from_family(family), time_limit, output=output)
+        if not result.optimal:
+            raise RuntimeError(f"Sifting stopped with gap: {result.cost} >= {result.lower_bound}")
+        return result.chosen
+    raise ValueError(f"Unknown backend: {backend}")
+
+
+def is_partition(family, chosen):
+    """Whether the subsets `chosen` cover every product exactly once."""
+    chosen = np.asarray(chosen, dtype=np.int64)
+    if len(chosen) and (chosen.min() < 0 or chosen.max() >= family.n_subsets):
+        return False
+    covered = np.concatenate([family.subset(subset) for subset in chosen.tolist()] or [np.zeros(0, np.int64)])
+    return bool(np.array_equal(np.bincount(covered, minlength=family.n_products + 1)[1:],
+                               np.ones(family.n_products, dtype=np.int64)))
+
+
+def canonical_order(family):
+    """Subset ids sorted by (products, cost), with the products of each subset sorted.
+
+    Returns (order, indptr, elements): canonical subset k is subset
+    order[k], and (indptr, elements) are the canonical CSR arrays. Two
+    files that list the same subsets in another order get the same arrays.
+    """
+    lengths = np.diff(family.indptr)
+    owner = np.repeat(np.arange(family.n_subsets), lengths)
+    sorted_elements = family.elements[np.lexsort((family.elements, owner))]
+    padded = np.zeros((family.n_subsets, int(lengths.max(initial=0))), dtype=np.int64)
+    padded[owner, np.arange(len(owner)) - family.indptr[owner]] = sorted_elements
+    order = np.lexsort((family.costs, lengths, *padded.T[::-1]))
+    indptr = np.concatenate([[0], np.cumsum(lengths[order])])
+    elements = np.concatenate([padded[subset, :lengths[subset]] for subset in order.tolist()] or [np.zeros(0)])
+    return order, indptr, elements.astype(np.int64)
+
+
+def solve_partition_cached(family, time_limit=None, output=True, cache=None):
+    """solve_partition with HiGHS through the solution cache (common/solutions.py).
+
+    The key hashes the canonical subsets and costs; the structure key leaves
+    the costs out, so the same family with other costs is a near miss whose
+    stored partition starts HiGHS. A hit is re-verified (a partition with
+    the stored cost) before it is returned.
+    """
+    cache = cache or solutions.default()
+    if cache is None:
+        return solve_partition(family, "highs", time_limit, output)
+    order, indptr, elements = canonical_order(family)
+    structure = solutions.fingerprint("day7", family.n_products, indptr, elements)
+    key = solutions.fingerprint(structure, family.costs[order])
+
+    kind, entry = cache.lookup("day7", key, structure)
+    start = None
+    if entry is not None:
+        canonical = entry["solution"]["chosen"]
+        candidate = np.sort(order[canonical[canonical < family.n_subsets]]) if len(canonical) else canonical
+        feasible = len(canonical) == len(candidate) and is_partition(family, candidate)
+        if kind == "hit" and feasible and family.costs[candidate].sum() == entry["objective"]:
+            cache.count("hit")
+            return candidate
+        start = candidate if feasible else None
+        cache.count("near" if feasible else "miss")
+
+    result = solve_partition_highs(family, time_limit, output, start)
+    rank = np.empty(family.n_subsets, dtype=np.int64)
+    rank[order] = np.arange(family.n_subsets)
+    cache.store("day7", key, structure, result.cost, result.optimal, {"chosen": np.sort(rank[result.chosen])})
+    return result.chosen
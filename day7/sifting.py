@@ -0,0 +1,262 @@
+"""Sifting / column generation for the day7 set partitioning.
+
+Only a small share of the subsets is ever basic in the LP relaxation, so
+the LP is solved over a working set of columns (the restricted master) and
+the rest stays in a ColumnPool, the CSR arrays of all the subsets, which
+read_pool maps from the instance cache without copying:
+
+- the restricted master starts with one artificial column per product
+  (cost big_m, so any working set is feasible) and keeps one Highs object,
+  which re-solves from the previous basis after each addCols;
+- pricing: reduced costs c_j - sum of the row duals of subset j, computed
+  over the pool in batches of `batch` subsets (one bincount per batch), so
+  only a batch of the pool is in memory at a time; the `max_add` most
+  negative columns join the working set and the LP is solved again;
+- when no column prices out, the LP bound is exact. If an artificial is
+  still in use, big_m was too small (or the problem is infeasible): it is
+  multiplied by 10 and the loop goes on;
+- price-and-branch: the artificial columns are fixed to 0 and the working
+  set is made integer and solved as a MIP within the remaining time. While
+  it holds no partition (or none is found within a fifth of the remaining
+  time), the columns with the smallest reduced costs are added, under a
+  threshold that doubles each round. The MIP gives an incumbent
+  `upper`. Every partition costs at least lower + the sum of the reduced
+  costs of its columns, so only the pool columns with rc < upper - lower
+  can be in a better one. They are added (at most max_columns) and the MIP is solved
+  again from the incumbent; if none is missing, the incumbent is optimal.
+
+Peak memory follows the working set (plus one pricing batch), not the
+size of the subset file.
+"""
+import math
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+from highspy import Highs, HighsVarType
+
+from common.instances import load_set_family
+
+
+@dataclass
+class ColumnPool:
+    """All candidate subsets as CSR arrays (products 1-based); they may be read-only memory maps."""
+    n_products: int
+    costs: np.ndarray
+    indptr: np.ndarray
+    elements: np.ndarray
+
+    @property
+    def n_subsets(self):
+        return len(self.costs)
+
+    @classmethod
+    def from_family(cls, family):
+        return cls(family.n_products, family.costs, family.indptr, family.elements)
+
+    def reduced_costs(self, duals, start, stop):
+        """c_j - sum of duals[p] over the products of j, for the subsets start..stop-1."""
+        lo, hi = self.indptr[start], self.indptr[stop]
+        owner = np.repeat(np.arange(stop - start), np.diff(self.indptr[start:stop + 1]))
+        return self.costs[start:stop] - np.bincount(owner, weights=duals[self.elements[lo:hi]],
+                                                     minlength=stop - start)
+
+    def price(self, duals, limit, batch=1 << 16, exclude=None, tolerance=1e-9):
+        """Up to `limit` subsets with the most negative reduced costs, as (ids, reduced costs).
+
+        duals is indexed by product (entry 0 unused); subsets marked in the
+        boolean array `exclude` are skipped. Also returns the sum of all the
+        negative reduced costs, for the Lagrangian bound.
+        """
+        best_ids, best_rc, negative = np.zeros(0, dtype=np.int64), np.zeros(0), 0.0
+        for start in range(0, self.n_subsets, batch):
+            stop = min(start + batch, self.n_subsets)
+            rc = self.reduced_costs(duals, start, stop)
+            if exclude is not None:
+                rc[exclude[start:stop]] = np.inf
+            ids = np.flatnonzero(rc < -tolerance)
+            negative += rc[ids].sum()
+            best_ids = np.concatenate([best_ids, ids + start])
+            best_rc = np.concatenate([best_rc, rc[ids]])
+            if len(best_ids) > limit:
+                keep = np.argpartition(best_rc, limit)[:limit]
+                best_ids, best_rc = best_ids[keep], best_rc[keep]
+        order = np.argsort(best_rc, kind="stable")
+        return best_ids[order], best_rc[order], negative
+
+    def below(self, duals, threshold, batch=1 << 16):
+        """Ids of all the subsets with reduced cost < threshold."""
+        found = [np.flatnonzero(self.reduced_costs(duals, start, min(start + batch, self.n_subsets)) < threshold)
+                 + start for start in range(0, self.n_subsets, batch)]
+        return np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+
+
+def read_pool(file_path):
+    """The ColumnPool of a day7 file, memory-mapped from the instance cache (no inverted index is built)."""
+    return ColumnPool(*load_set_family(file_path, counts=True))
+
+
+@dataclass
+class SiftingResult:
+    chosen: np.ndarray  # subset ids of the best partition (empty if none was found)
+    cost: float
+    lower_bound: float
+    optimal: bool
+    working_set: int  # pool columns in the restricted master at the end
+    elapsed: float
+    history: list = field(default_factory=list)  # (seconds, working set, LP value, Lagrangian bound)
+
+
+class RestrictedMaster:
+    """The LP/MIP over the artificial columns and the working set, in one Highs object."""
+
+    def __init__(self, pool, big_m, output=False):
+        self.pool = pool
+        self.big_m = big_m
+        self.columns = np.zeros(0, dtype=np.int64)  # pool id of each working column
+        self.in_master = np.zeros(pool.n_subsets, dtype=bool)
+        self.highs = Highs()
+        self.highs.setOptionValue("output_flag", output)
+        n = pool.n_products
+        self.highs.addRows(n, np.ones(n), np.ones(n), 0, np.zeros(0, dtype=np.int32),
+                           np.zeros(0, dtype=np.int32), np.zeros(0))
+        self.highs.addCols(n, np.full(n, big_m), np.zeros(n), np.full(n, np.inf), n,
+                           np.arange(n, dtype=np.int32), np.arange(n, dtype=np.int32), np.ones(n))
+
+    def add(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)[~self.in_master[ids]]
+        if len(ids) == 0:
+            return 0
+        lengths = self.pool.indptr[ids + 1] - self.pool.indptr[ids]
+        elements = np.concatenate([self.pool.elements[self.pool.indptr[j]:self.pool.indptr[j + 1]]
+                                   for j in ids.tolist()])
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int32)
+        self.highs.addCols(len(ids), self.pool.costs[ids].astype(np.float64), np.zeros(len(ids)),
+                           np.ones(len(ids)), len(elements), starts, (elements - 1).astype(np.int32),
+                           np.ones(len(elements)))
+        self.columns = np.concatenate([self.columns, ids])
+        self.in_master[ids] = True
+        return len(ids)
+
+    def solve(self, time_limit):
+        self.highs.setOptionValue("time_limit", max(time_limit, 1e-3))
+        self.highs.run()
+        return self.highs.modelStatusToString(self.highs.getModelStatus())
+
+    def duals(self):
+        """Row duals indexed by product (entry 0 unused)."""
+        return np.concatenate([[0.0], np.asarray(self.highs.getSolution().row_dual)])
+
+    def values(self):
+        """(artificial values, working column values)."""
+        values = np.asarray(self.highs.getSolution().col_value)
+        return values[:self.pool.n_products], values[self.pool.n_products:]
+
+    def raise_big_m(self, factor=10.0):
+        self.big_m *= factor
+        n = self.pool.n_products
+        self.highs.changeColsCost(n, np.arange(n, dtype=np.int32), np.full(n, self.big_m))
+
+    def drop_artificials(self):
+        """Fixes the artificial columns to 0 (the MIP phase only accepts true partitions)."""
+        n = self.pool.n_products
+        self.highs.changeColsBounds(n, np.arange(n, dtype=np.int32), np.zeros(n), np.zeros(n))
+
+    def start_from(self, chosen):
+        """Passes the partition `chosen` (pool ids) to the next MIP run as its starting solution."""
+        if len(chosen):
+            positions = np.flatnonzero(np.isin(self.columns, chosen)) + self.pool.n_products
+            self.highs.setSolution(len(positions), positions.astype(np.int32), np.ones(len(positions)))
+
+    def make_integer(self, ids):
+        """Marks the working columns of the pool ids `ids` as integer."""
+        positions = np.flatnonzero(np.isin(self.columns, ids)) + self.pool.n_products
+        self.highs.changeColsIntegrality(len(positions), positions.astype(np.int32),
+                                         np.array([HighsVarType.kInteger] * len(positions)))
+
+
+def solve_sifting(pool, time_limit=None, max_add=None, batch=1 << 16, max_columns=200000, output=True):
+    """Column generation on the LP, then price-and-branch within `time_limit`; returns a SiftingResult.
+
+    max_add (default: the number of products) caps the columns added per
+    pricing round; max_columns caps the working set in the price-and-branch
+    phase (past it, the result is not proven optimal).
+    """
+    start = time.perf_counter()
+    deadline = math.inf if time_limit is None else start + time_limit
+    max_add = max_add or pool.n_products
+    master = RestrictedMaster(pool, big_m=float(np.max(pool.costs)) + 1.0, output=False)
+    history, lower, lp_value = [], -math.inf, math.inf
+
+    # Column generation on the LP relaxation
+    while time.perf_counter() < deadline:
+        status = master.solve(deadline - time.perf_counter())
+        if status != "Optimal":
+            break
+        lp_value = master.highs.getInfo().objective_function_value
+        duals = master.duals()
+        ids, rc, negative = pool.price(duals, max_add, batch, exclude=master.in_master)
+        if master.values()[0].max(initial=0.0) < 1e-9:
+            # Lagrangian bound: each column is at most 1, so LP + sum of negative rc bounds every partition
+            lower = max(lower, lp_value + negative)
+        history.append((time.perf_counter() - start, len(master.columns), lp_value, lower))
+        if output:
+            print(f"sifting: working set {len(master.columns):>8} LP {lp_value:>12.2f} "
+                  f"bound {lower:>12.2f} adding {len(ids):>6} {time.perf_counter() - start:>7.1f}s")
+        if len(ids):
+            master.add(ids)
+        elif master.values()[0].max(initial=0.0) > 1e-9:
+            if master.big_m > 1e6 * (abs(lp_value) + 1.0):
+                raise ValueError("No partition exists: artificial columns stay in the LP optimum.")
+            master.raise_big_m()
+        else:
+            lower = lp_value
+            break
+
+    # Price-and-branch over the working set, without the artificial columns
+    chosen, upper, proven = np.zeros(0, dtype=np.int64), math.inf, False
+    if math.isfinite(lower):
+        master.drop_artificials()
+        master.make_integer(master.columns)
+        threshold = 0.0
+        while time.perf_counter() < deadline:
+            remaining = deadline - time.perf_counter()
+            # Without an incumbent, a working set that hides its partitions gets a slice of the time
+            status = master.solve(remaining if math.isfinite(upper) else min(remaining, max(5.0, 0.2 * remaining)))
+            if master.highs.getInfo().primal_solution_status == 2:
+                candidate = np.sort(master.columns[master.values()[1] > 0.5])
+                if pool.costs[candidate].sum() < upper:
+                    chosen, upper = candidate, float(pool.costs[candidate].sum())
+            if status not in ("Optimal", "Infeasible"):
+                if time.perf_counter() >= deadline:
+                    break
+                if math.isfinite(upper):
+                    master.start_from(chosen)  # the slice found a partition: finish the MIP from it
+                    continue
+            if math.isfinite(upper):
+                # Columns that could still lead to a cheaper partition (integer costs: rc <= upper - 1 - lower)
+                missing = pool.below(duals, upper - 1 - lower + 1e-6, batch)
+                missing = missing[~master.in_master[missing]]
+                if len(missing) == 0:
+                    proven = True
+                    break
+            else:
+                # The working set holds no partition: widen it with the columns of smallest reduced cost
+                missing = np.zeros(0, dtype=np.int64)
+                while len(missing) == 0:
+                    if master.in_master.all():
+                        raise ValueError("No partition exists.")
+                    threshold = max(2 * threshold, 1e-3 * max(abs(lower), 1.0))
+                    missing = pool.below(duals, threshold, batch)
+                    missing = missing[~master.in_master[missing]]
+            if len(master.columns) + len(missing) > max_columns:
+                break
+            if output:
+                print(f"price-and-branch: incumbent {upper:.0f}, adding {len(missing)} columns")
+            master.add(missing)
+            master.make_integer(missing)
+            master.start_from(chosen)
+        if proven:
+            lower = upper
+
+    return SiftingResult(chosen, upper, lower, proven, len(master.columns), time.perf_counter() - start, history)
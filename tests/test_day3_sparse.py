@@ -0,0 +1,28 @@
+import numpy as np
+
+from day3.assignment import solve_jv
+from day3.sparse import candidates_from_dense, solve_sparse_auction, solve_sparsified
+
+
+def test_wide_cost_range_is_feasible():
+    # Prices carried across epsilon phases once tripped a bogus "infeasible" price cap here
+    costs = np.array([[10, 500000], [20, 900000]])
+    result = solve_sparse_auction(candidates_from_dense(costs, k=2))
+    assert result.status == "sparse-optimal"
+    assert result.cost == solve_jv(costs).cost == 500020
+
+
+def test_infeasible_candidates_are_reported():
+    costs = np.array([[0, 1, 9], [0, 1, 9], [0, 1, 9]])
+    assert solve_sparse_auction(candidates_from_dense(costs, k=2)).status == "infeasible"
+
+
+def test_sparsified_matches_dense_optimum():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        n = int(rng.integers(2, 40))
+        costs = rng.integers(0, int(rng.choice([10, 1000, 10 ** 6])), (n, n))
+        costs[:, 0] = 0  # every row prefers the same columns: k=2 is infeasible at first
+        result = solve_sparsified(costs, k=2)
+        assert result.status == "optimal"
+        assert result.cost == solve_jv(costs).cost